@@ -732,6 +732,20 @@ class ApiService {
     };
   }
 
+  /// Transaction metadata sent by the client, plus its Idempotency-Key header
+  Map<String, dynamic>? _starTransactionMetadata(
+      Request request, Map<String, dynamic> payload) {
+    final body = payload['metadata'];
+    final metadata = <String, dynamic>{
+      if (body is Map<String, dynamic>) ...body,
+    };
+    final idempotencyKey = request.headers['idempotency-key'];
+    if (idempotencyKey != null && idempotencyKey.isNotEmpty) {
+      metadata['idempotencyKey'] = idempotencyKey;
+    }
+    return metadata.isEmpty ? null : metadata;
+  }
+
   /// Add stars endpoint
   Future<Response> Function(Request) _handleAddStars() {
     return (Request request) async {
@@ -770,6 +784,7 @@ class ApiService {
           amount: amount,
           reason: reason,
           lessonId: lessonId,
+          metadata: _starTransactionMetadata(request, payload),
         );
 
         if (!success) {
@@ -850,6 +865,7 @@ class ApiService {
           amount: amount,
           reason: reason,
           lessonId: lessonId,
+          metadata: _starTransactionMetadata(request, payload),
         );
 
         if (!success) {
@@ -6,76 +6,534 @@ A command-line interface for interacting with the BijbelQuiz local API.
 """
 
 import argparse
+import asyncio
+import email.parser
+import email.utils
+import gzip
+import hashlib
+import http.client
 import json
+import os
+import queue
 import sys
-import urllib.request
+import threading
 import urllib.parse
-import urllib.error
 import time
 import random
+from collections import deque
 from typing import Optional
 from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from question_bank import QuestionBank, with_options
+
+
+DEFAULT_TIMEOUT = 10.0
+# The app allows 100 requests per minute per IP over a sliding window (/health is exempt)
+RATE_LIMIT_PER_MINUTE = 100
+RATE_LIMIT_BURST = 10
+# Largest limit the transactions endpoint accepts (and the size of the app's ledger)
+MAX_TRANSACTIONS_LIMIT = 1000
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+# Seconds around sending within which a ledger entry without an idempotency key can
+# belong to a sent star operation (covers the request timeout and clock skew)
+RECONCILE_WINDOW = 600
+
+
+class BijbelQuizAPIError(Exception):
+    """An error response from the BijbelQuiz API, or a failure to reach it."""
+
+    def __init__(self, message: str, status: Optional[int] = None, payload: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.payload = payload or {}
+
+
+class APIConnectionError(BijbelQuizAPIError):
+    """The API could not be reached, or the connection failed or timed out.
+
+    request_sent is False when the request certainly never reached the server
+    (connection refused), so even a POST is safe to retry.
+    """
+
+    def __init__(self, message: str, request_sent: bool = True):
+        super().__init__(message)
+        self.request_sent = request_sent
+
+
+class AuthenticationError(BijbelQuizAPIError):
+    """The API key is missing or invalid (HTTP 401/403)."""
+
+
+class RateLimitError(BijbelQuizAPIError):
+    """The server's rate limit was exceeded (HTTP 429)."""
+
+    def __init__(self, message: str, status: Optional[int] = None, payload: Optional[dict] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message, status, payload)
+        self.retry_after = retry_after
+
+
+class ServerError(BijbelQuizAPIError):
+    """The server failed to handle the request (HTTP 5xx)."""
+
+
+def _retry_after(headers, payload: dict) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (seconds or HTTP date) or a retry_after body field."""
+    value = headers.get('Retry-After') if headers is not None else None
+    if value is None:
+        value = payload.get('retry_after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_response(url: str, status: int, reason: str, headers, payload: bytes) -> dict:
+    """Decode a JSON response, raising the matching BijbelQuizAPIError for error statuses."""
+    try:
+        result = json.loads(payload.decode('utf-8')) if payload else {}
+    except ValueError:
+        result = None
+    if status < 400:
+        if result is None:
+            raise BijbelQuizAPIError(f"Invalid JSON response from {url}", status)
+        return result
+
+    error = result if isinstance(result, dict) else {}
+    message = f"HTTP {status}: {error.get('error', reason)}"
+    if status == 429:
+        raise RateLimitError(message, status, error, _retry_after(headers, error))
+    if status in (401, 403):
+        raise AuthenticationError(message, status, error)
+    if status >= 500:
+        raise ServerError(message, status, error)
+    raise BijbelQuizAPIError(message, status, error)
+
+
+def _idempotency_headers(key: Optional[str]) -> Optional[dict]:
+    return {'Idempotency-Key': key} if key else None
+
+
+def _star_payload(amount: int, reason: str, lesson_id: Optional[str], idempotency_key: Optional[str]) -> dict:
+    """Body of a stars/add or stars/spend request; the idempotency key goes in the metadata."""
+    data = {"amount": amount, "reason": reason}
+    if lesson_id:
+        data["lessonId"] = lesson_id
+    if idempotency_key:
+        data["metadata"] = {"idempotencyKey": idempotency_key}
+    return data
+
+
+def transaction_idempotency_key(transaction: dict) -> Optional[str]:
+    """The idempotency key a star transaction was recorded with, if any."""
+    metadata = transaction.get('metadata')
+    return metadata.get('idempotencyKey') if isinstance(metadata, dict) else None
+
+
+def transaction_time(transaction: dict) -> Optional[float]:
+    """Epoch seconds of a star transaction's timestamp; naive timestamps are server local time."""
+    try:
+        return datetime.fromisoformat(str(transaction['timestamp']).replace('Z', '+00:00')).timestamp()
+    except (KeyError, ValueError):
+        return None
+
+
+def _safe_to_resend(method: str) -> bool:
+    """Whether a request may be sent again after its connection dropped mid-exchange.
+
+    The API does not deduplicate on Idempotency-Key, so a POST may already have
+    been applied; StarLedgerQueue reconciles those before sending them again.
+    """
+    return method in IDEMPOTENT_METHODS
+
+
+def transaction_order(transaction_id) -> tuple:
+    """Sort key for star transaction ids, which are millisecond timestamps (newer ids are larger)."""
+    text = str(transaction_id or '')
+    return (1, int(text), '') if text.isdigit() else (0, 0, text)
+
+
+class TokenBucket:
+    """Thread-safe token bucket that paces requests to the server's rate limit.
+
+    reserve() takes a token and returns how long the caller must wait before
+    sending, so the same bucket works for blocking and asyncio callers. The
+    defaults keep any 60 second window at or below RATE_LIMIT_PER_MINUTE.
+    """
+
+    def __init__(self, rate: float = (RATE_LIMIT_PER_MINUTE - RATE_LIMIT_BURST) / 60.0,
+                 capacity: float = RATE_LIMIT_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, limit: int, burst: int = RATE_LIMIT_BURST) -> 'TokenBucket':
+        """A bucket that never exceeds limit requests in any sliding minute."""
+        burst = max(1, min(burst, limit // 2))
+        return cls((limit - burst) / 60.0, burst)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens and return the seconds to wait before using them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def pause(self, seconds: float):
+        """Hold back every caller for at least seconds, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+@dataclass
+class RetryPolicy:
+    """When and how long to back off before retrying a failed request.
+
+    Rate limited requests are always retried, after at least the server's
+    Retry-After. 5xx responses and connection failures are retried for
+    idempotent methods only, since a POST may already have been applied;
+    a POST whose connection was refused never reached the server and is retried.
+    Delays use full-jitter exponential backoff.
+    """
+    max_retries: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(self, method: str, error: BijbelQuizAPIError, attempt: int) -> Optional[float]:
+        """Seconds to wait before retry number attempt + 1, or None to give up."""
+        if attempt >= self.max_retries:
+            return None
+        if isinstance(error, RateLimitError):
+            minimum = error.retry_after or 0.0
+        elif isinstance(error, (ServerError, APIConnectionError)) and method in IDEMPOTENT_METHODS:
+            minimum = 0.0
+        elif isinstance(error, APIConnectionError) and not error.request_sent:
+            minimum = 0.0
+        else:
+            return None
+        return max(minimum, random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+
+# Seconds a cached response stays fresh, per endpoint. Questions are served as a
+# fixed slice of the bundled question set, so they change only with app updates.
+CACHE_TTLS = {
+    'questions': 3600,
+    'settings': 300,
+    'stats': 30,
+    'progress': 30,
+}
+DEFAULT_CACHE_BYTES = 16 * 1024 * 1024
+
+
+def default_cache_dir() -> str:
+    """~/.cache/bijbelquiz, or bijbelquiz under $XDG_CACHE_HOME."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'bijbelquiz')
+
+
+def default_state_dir() -> str:
+    """~/.local/state/bijbelquiz, or bijbelquiz under $XDG_STATE_HOME."""
+    base = os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(base, 'bijbelquiz')
+
+
+class ResponseCache:
+    """On-disk cache of GET responses with per-endpoint TTLs and LRU eviction.
+
+    Entries are JSON files keyed by URL and a hash of the API key, so the key
+    itself is never written to disk. Expired entries that carry an ETag or
+    Last-Modified are revalidated with a conditional request. File modification
+    times record the last access, and the least recently used entries are removed
+    once the cache grows beyond max_bytes.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_CACHE_BYTES,
+                 ttls: Optional[dict] = None):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.ttls = CACHE_TTLS if ttls is None else ttls
+        os.makedirs(self.directory, exist_ok=True)
+
+    def ttl_for(self, endpoint: str) -> Optional[float]:
+        """TTL for an endpoint such as 'questions' or 'stars/balance', None if not cached."""
+        return self.ttls.get(endpoint.strip('/').split('/', 1)[0])
+
+    def _path(self, api_key: Optional[str], url: str) -> str:
+        key_hash = hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()
+        name = hashlib.sha256(f"{key_hash} {url}".encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def get(self, api_key: Optional[str], url: str) -> Optional[dict]:
+        """The stored entry for url, fresh or not, or None."""
+        path = self._path(api_key, url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: dict) -> bool:
+        return entry.get('expires', 0) > time.time()
+
+    @staticmethod
+    def validators(entry: Optional[dict]) -> Optional[dict]:
+        """Conditional request headers for revalidating an expired entry."""
+        if not entry:
+            return None
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers or None
+
+    def store(self, api_key: Optional[str], url: str, data: dict, headers, ttl: float,
+              previous: Optional[dict] = None):
+        """Store a response (or extend a revalidated one) and evict old entries if needed."""
+        previous = previous or {}
+        entry = {
+            'url': url,
+            'expires': time.time() + ttl,
+            'etag': headers.get('ETag') or previous.get('etag'),
+            'last_modified': headers.get('Last-Modified') or previous.get('last_modified'),
+            'data': data,
+        }
+        path = self._path(api_key, url)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith('.json'):
+                    try:
+                        stat = item.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, item.path))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remove every cached response."""
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith('.json'):
+                    try:
+                        os.remove(item.path)
+                    except OSError:
+                        pass
+
+
+class HTTPTransport:
+    """Keep-alive HTTP/HTTPS connections pooled per host, with gzip response decoding.
+
+    Connections are reused across requests instead of opening a new socket per call.
+    An idempotent request (GET, HEAD or OPTIONS) that fails on a reused connection
+    (closed by the server while idle) is resent on a fresh one; other requests may
+    already have been applied, so the error is raised instead.
+    """
+
+    def __init__(self, timeout: Optional[float] = DEFAULT_TIMEOUT, max_idle: int = 4):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        if scheme == 'http':
+            return http.client.HTTPConnection(netloc, timeout=self.timeout)
+        raise ValueError(f"Unsupported URL scheme: {scheme}")
+
+    def _acquire(self, key: tuple) -> tuple:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(*key), False
+
+    def _release(self, key: tuple, connection: http.client.HTTPConnection):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def request(self, method: str, url: str, body: Optional[bytes] = None,
+                headers: Optional[dict] = None) -> tuple:
+        """Send a request and return (status, reason, headers, body) with the body decoded."""
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        headers = dict(headers or {})
+        headers.setdefault('Accept-Encoding', 'gzip')
+
+        while True:
+            connection, reused = self._acquire(key)
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused and _safe_to_resend(method):
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            break
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+
+        if response.getheader('Content-Encoding', '').lower() == 'gzip':
+            data = gzip.decompress(data)
+        return response.status, response.reason, response.headers, data
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
 
 
 class BijbelQuizAPI:
-    """Client for the BijbelQuiz local API."""
+    """Client for the BijbelQuiz local API.
+
+    Requests are paced by rate_limiter (None disables pacing) and failures are
+    retried according to retry. Read endpoints are answered from cache when
+    one is given. Errors raise BijbelQuizAPIError subclasses.
+    """
 
-    def __init__(self, base_url: str = "http://localhost:7777/v1", api_key: Optional[str] = None):
+    def __init__(self, base_url: str = "http://localhost:7777/v1", api_key: Optional[str] = None,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT, transport: Optional[HTTPTransport] = None,
+                 rate_limiter: Optional[TokenBucket] = None, retry: Optional[RetryPolicy] = None,
+                 cache: Optional['ResponseCache'] = None):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
-        self.headers = {"Content-Type": "application/json"}
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
         if api_key:
             self.headers.update({"X-API-Key": api_key})
+        self.transport = transport or HTTPTransport(timeout)
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
+        self.cache = cache
 
-    def _get(self, endpoint: str, params: Optional[dict] = None) -> dict:
-        """Make a GET request to the API."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the pooled connections."""
+        self.transport.close()
+
+    def _send(self, method: str, url: str, body: Optional[bytes], headers: Optional[dict] = None) -> tuple:
+        """Send one request; returns (status, response headers, decoded JSON)."""
+        if headers:
+            headers = {**self.headers, **headers}
+        try:
+            status, reason, response_headers, payload = self.transport.request(method, url, body,
+                                                                               headers or self.headers)
+        except ConnectionRefusedError as e:
+            raise APIConnectionError(f"Connection error: {e}", request_sent=False) from e
+        except (OSError, http.client.HTTPException) as e:
+            raise APIConnectionError(f"Connection error: {e}") from e
+        return status, response_headers, parse_response(url, status, reason, response_headers, payload)
+
+    def _call(self, method: str, endpoint: str, url: str, body: Optional[bytes],
+              headers: Optional[dict] = None) -> tuple:
+        """Send a request, pacing it and retrying transient failures."""
+        attempt = 0
+        while True:
+            if self.rate_limiter and endpoint != 'health':
+                time.sleep(self.rate_limiter.reserve())
+            try:
+                return self._send(method, url, body, headers)
+            except BijbelQuizAPIError as e:
+                delay = self.retry.delay(method, e, attempt)
+                if delay is None:
+                    raise
+                if isinstance(e, RateLimitError) and self.rate_limiter:
+                    self.rate_limiter.pause(delay)
+            attempt += 1
+            time.sleep(delay)
+
+    def _request(self, method: str, endpoint: str, params: Optional[dict] = None,
+                 data: Optional[dict] = None, headers: Optional[dict] = None) -> dict:
+        """Make a request to the API, answering cacheable GETs from the response cache."""
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         if params:
             url += "?" + urllib.parse.urlencode(params)
-        
-        try:
-            request = urllib.request.Request(url, headers=self.headers)
-            with urllib.request.urlopen(request) as response:
-                return json.loads(response.read().decode('utf-8'))
-        except urllib.error.HTTPError as e:
-            print(f"Error: {e}", file=sys.stderr)
-            try:
-                error_data = json.loads(e.read().decode('utf-8'))
-                print(f"API Error: {error_data.get('error', 'Unknown error')}", file=sys.stderr)
-                print(f"Message: {error_data.get('message', '')}", file=sys.stderr)
-            except:
-                print(f"HTTP {e.code}: {e.reason}", file=sys.stderr)
-            sys.exit(1)
-        except urllib.error.URLError as e:
-            print(f"URL Error: {e.reason}", file=sys.stderr)
-            sys.exit(1)
-        except Exception as e:
-            print(f"Unexpected error: {e}", file=sys.stderr)
-            sys.exit(1)
+        body = json.dumps(data).encode('utf-8') if data is not None else None
 
-    def _post(self, endpoint: str, data: dict) -> dict:
+        ttl = self.cache.ttl_for(endpoint) if self.cache is not None and method == 'GET' else None
+        if ttl is None:
+            return self._call(method, endpoint, url, body, headers)[2]
+
+        entry = self.cache.get(self.api_key, url)
+        if entry is not None and ResponseCache.is_fresh(entry):
+            return entry['data']
+        status, headers, result = self._call(method, endpoint, url, body, ResponseCache.validators(entry))
+        if status == 304 and entry is not None:
+            self.cache.store(self.api_key, url, entry['data'], headers, ttl, previous=entry)
+            return entry['data']
+        self.cache.store(self.api_key, url, result, headers, ttl)
+        return result
+
+    def _get(self, endpoint: str, params: Optional[dict] = None) -> dict:
+        """Make a GET request to the API."""
+        return self._request('GET', endpoint, params=params)
+
+    def _post(self, endpoint: str, data: dict, headers: Optional[dict] = None) -> dict:
         """Make a POST request to the API."""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        try:
-            json_data = json.dumps(data).encode('utf-8')
-            request = urllib.request.Request(url, data=json_data, headers=self.headers, method='POST')
-            with urllib.request.urlopen(request) as response:
-                return json.loads(response.read().decode('utf-8'))
-        except urllib.error.HTTPError as e:
-            print(f"Error: {e}", file=sys.stderr)
-            try:
-                error_data = json.loads(e.read().decode('utf-8'))
-                print(f"API Error: {error_data.get('error', 'Unknown error')}", file=sys.stderr)
-                print(f"Message: {error_data.get('message', '')}", file=sys.stderr)
-            except:
-                print(f"HTTP {e.code}: {e.reason}", file=sys.stderr)
-            sys.exit(1)
-        except urllib.error.URLError as e:
-            print(f"URL Error: {e.reason}", file=sys.stderr)
-            sys.exit(1)
-        except Exception as e:
-            print(f"Unexpected error: {e}", file=sys.stderr)
-            sys.exit(1)
+        return self._request('POST', endpoint, data=data, headers=headers)
 
     def health(self) -> dict:
         """Check API health."""
@@ -106,32 +564,499 @@ class BijbelQuizAPI:
         """Get star balance."""
         return self._get("stars/balance")
 
-    def add_stars(self, amount: int, reason: str, lesson_id: Optional[str] = None) -> dict:
+    def add_stars(self, amount: int, reason: str, lesson_id: Optional[str] = None,
+                  idempotency_key: Optional[str] = None) -> dict:
+        """Add stars to balance."""
+        data = _star_payload(amount, reason, lesson_id, idempotency_key)
+        return self._post("stars/add", data, _idempotency_headers(idempotency_key))
+
+    def spend_stars(self, amount: int, reason: str, lesson_id: Optional[str] = None,
+                    idempotency_key: Optional[str] = None) -> dict:
+        """Spend stars from balance."""
+        data = _star_payload(amount, reason, lesson_id, idempotency_key)
+        return self._post("stars/spend", data, _idempotency_headers(idempotency_key))
+
+    def get_star_transactions(self, limit: int = 50, type_filter: Optional[str] = None, lesson_id: Optional[str] = None) -> dict:
+        """Get star transactions."""
+        params = {"limit": limit}
+        if type_filter:
+            params["type"] = type_filter
+        if lesson_id:
+            params["lessonId"] = lesson_id
+        return self._get("stars/transactions", params)
+
+    def iter_star_transaction_pages(self, type_filter: Optional[str] = None, lesson_id: Optional[str] = None,
+                                    page_size: int = MAX_TRANSACTIONS_LIMIT):
+        """Yield pages (lists) of star transactions, newest first.
+
+        Each page after the first asks for transactions before the oldest id seen
+        so far. Servers that ignore the before parameter return the same page
+        again; only transactions older than the cursor are kept, so the walk then
+        stops after one page instead of repeating it. Only the cursor is kept
+        between pages.
+        """
+        page_size = max(1, min(page_size, MAX_TRANSACTIONS_LIMIT))
+        before = None
+        while True:
+            params = {"limit": page_size}
+            if type_filter:
+                params["type"] = type_filter
+            if lesson_id:
+                params["lessonId"] = lesson_id
+            if before is not None:
+                params["before"] = before
+            page = self._get("stars/transactions", params).get("transactions") or []
+            if before is not None:
+                cursor = transaction_order(before)
+                page = [t for t in page if transaction_order(t.get("id")) < cursor]
+            if not page:
+                return
+            yield page
+            if len(page) < page_size or page[-1].get("id") is None:
+                return
+            before = page[-1]["id"]
+
+    def iter_star_transactions(self, type_filter: Optional[str] = None, lesson_id: Optional[str] = None,
+                               page_size: int = MAX_TRANSACTIONS_LIMIT):
+        """Yield star transactions one at a time, newest first (see iter_star_transaction_pages)."""
+        for page in self.iter_star_transaction_pages(type_filter, lesson_id, page_size):
+            yield from page
+
+    def get_star_stats(self) -> dict:
+        """Get star statistics."""
+        return self._get("stars/stats")
+
+
+class AsyncHTTPTransport:
+    """HTTP/1.1 over asyncio streams with keep-alive connections pooled per host.
+
+    At most max_connections requests are in flight at once; further requests wait
+    for a free slot. Response bodies are read by Content-Length, chunked encoding
+    or until close, and gzip bodies are decoded. Like HTTPTransport, only idempotent
+    requests are resent after a reused connection drops.
+    """
+
+    def __init__(self, timeout: Optional[float] = DEFAULT_TIMEOUT, max_connections: int = 8):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._idle = {}
+        self._semaphore = None
+
+    async def _connect(self, key: tuple) -> tuple:
+        scheme, host, port = key
+        if scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported URL scheme: {scheme}")
+        return await asyncio.open_connection(host, port, ssl=scheme == 'https')
+
+    async def _acquire(self, key: tuple) -> tuple:
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return (reader, writer), True
+            writer.close()
+        return await self._connect(key), False
+
+    def _release(self, key: tuple, connection: tuple):
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.max_connections:
+            idle.append(connection)
+        else:
+            connection[1].close()
+
+    @staticmethod
+    async def _read_body(reader: asyncio.StreamReader, headers: http.client.HTTPMessage) -> tuple:
+        """Read a response body; returns (body, connection_reusable)."""
+        if headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0], 16)
+                if size == 0:
+                    # Skip trailers up to the blank line
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return b''.join(chunks), True
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+        length = headers.get('Content-Length')
+        if length is not None:
+            return await reader.readexactly(int(length)), True
+        return await reader.read(), False
+
+    async def _exchange(self, connection: tuple, method: str, target: str, body: Optional[bytes],
+                        headers: dict) -> tuple:
+        reader, writer = connection
+        lines = [f"{method} {target} HTTP/1.1"] + [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + (body or b''))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+        raw_headers = bytearray()
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            raw_headers += line
+        response_headers = email.parser.BytesParser(_class=http.client.HTTPMessage).parsebytes(bytes(raw_headers))
+
+        status = int(status)
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            data, reusable = b'', True
+        else:
+            data, reusable = await self._read_body(reader, response_headers)
+        connection_header = response_headers.get('Connection', '').lower()
+        keep_alive = reusable and connection_header != 'close' and (version == 'HTTP/1.1' or connection_header == 'keep-alive')
+        return status, reason, response_headers, data, keep_alive
+
+    async def request(self, method: str, url: str, body: Optional[bytes] = None,
+                      headers: Optional[dict] = None) -> tuple:
+        """Send a request and return (status, reason, headers, body) with the body decoded."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        request_headers = {"Host": parts.netloc, "Accept-Encoding": "gzip"}
+        request_headers.update(headers or {})
+        request_headers["Content-Length"] = str(len(body or b''))
+
+        async with self._semaphore:
+            while True:
+                connection, reused = await asyncio.wait_for(self._acquire(key), self.timeout)
+                try:
+                    status, reason, response_headers, data, keep_alive = await asyncio.wait_for(
+                        self._exchange(connection, method, target, body, request_headers), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    connection[1].close()
+                    if reused and _safe_to_resend(method):
+                        continue
+                    raise
+                except BaseException:
+                    connection[1].close()
+                    raise
+                break
+
+            if keep_alive:
+                self._release(key, connection)
+            else:
+                connection[1].close()
+
+        if response_headers.get('Content-Encoding', '').lower() == 'gzip':
+            data = gzip.decompress(data)
+        return status, reason, response_headers, data
+
+    async def close(self):
+        """Close all idle connections."""
+        idle, self._idle = self._idle, {}
+        writers = [writer for connections in idle.values() for _, writer in connections]
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+class AsyncBijbelQuizAPI:
+    """Asyncio client for the BijbelQuiz local API.
+
+    Offers the same endpoints as BijbelQuizAPI as coroutines, so many requests can
+    be gathered from one process. Requests share pooled keep-alive connections and
+    at most max_concurrency are in flight at once. Pacing and retries work as in
+    BijbelQuizAPI, and a TokenBucket may be shared with a blocking client.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:7777/v1", api_key: Optional[str] = None,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT, max_concurrency: int = 8,
+                 transport: Optional[AsyncHTTPTransport] = None,
+                 rate_limiter: Optional[TokenBucket] = None, retry: Optional[RetryPolicy] = None):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        if api_key:
+            self.headers.update({"X-API-Key": api_key})
+        self.transport = transport or AsyncHTTPTransport(timeout, max_concurrency)
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the pooled connections."""
+        await self.transport.close()
+
+    async def _send(self, method: str, url: str, body: Optional[bytes]) -> dict:
+        try:
+            status, reason, headers, payload = await self.transport.request(method, url, body, self.headers)
+        except asyncio.TimeoutError:
+            raise APIConnectionError(f"Request timed out: {method} {url}") from None
+        except ConnectionRefusedError as e:
+            raise APIConnectionError(f"Connection error: {e}", request_sent=False) from e
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            raise APIConnectionError(f"Connection error: {e}") from e
+        return parse_response(url, status, reason, headers, payload)
+
+    async def _request(self, method: str, endpoint: str, params: Optional[dict] = None,
+                       data: Optional[dict] = None) -> dict:
+        """Make a request to the API, pacing it and retrying transient failures."""
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        body = json.dumps(data).encode('utf-8') if data is not None else None
+
+        attempt = 0
+        while True:
+            if self.rate_limiter and endpoint != 'health':
+                await asyncio.sleep(self.rate_limiter.reserve())
+            try:
+                return await self._send(method, url, body)
+            except BijbelQuizAPIError as e:
+                delay = self.retry.delay(method, e, attempt)
+                if delay is None:
+                    raise
+                if isinstance(e, RateLimitError) and self.rate_limiter:
+                    self.rate_limiter.pause(delay)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _get(self, endpoint: str, params: Optional[dict] = None) -> dict:
+        """Make a GET request to the API."""
+        return await self._request('GET', endpoint, params=params)
+
+    async def _post(self, endpoint: str, data: dict) -> dict:
+        """Make a POST request to the API."""
+        return await self._request('POST', endpoint, data=data)
+
+    async def health(self) -> dict:
+        """Check API health."""
+        return await self._get("health")
+
+    async def get_questions(self, category: Optional[str] = None, limit: int = 10, difficulty: Optional[int] = None) -> dict:
+        """Get quiz questions."""
+        params = {"limit": limit}
+        if category:
+            params["category"] = category
+        if difficulty:
+            params["difficulty"] = difficulty
+        return await self._get("questions", params)
+
+    async def get_progress(self) -> dict:
+        """Get user progress."""
+        return await self._get("progress")
+
+    async def get_stats(self) -> dict:
+        """Get game statistics."""
+        return await self._get("stats")
+
+    async def get_settings(self) -> dict:
+        """Get app settings."""
+        return await self._get("settings")
+
+    async def get_star_balance(self) -> dict:
+        """Get star balance."""
+        return await self._get("stars/balance")
+
+    async def add_stars(self, amount: int, reason: str, lesson_id: Optional[str] = None) -> dict:
         """Add stars to balance."""
         data = {"amount": amount, "reason": reason}
         if lesson_id:
             data["lessonId"] = lesson_id
-        return self._post("stars/add", data)
+        return await self._post("stars/add", data)
 
-    def spend_stars(self, amount: int, reason: str, lesson_id: Optional[str] = None) -> dict:
+    async def spend_stars(self, amount: int, reason: str, lesson_id: Optional[str] = None) -> dict:
         """Spend stars from balance."""
         data = {"amount": amount, "reason": reason}
         if lesson_id:
             data["lessonId"] = lesson_id
-        return self._post("stars/spend", data)
+        return await self._post("stars/spend", data)
 
-    def get_star_transactions(self, limit: int = 50, type_filter: Optional[str] = None, lesson_id: Optional[str] = None) -> dict:
+    async def get_star_transactions(self, limit: int = 50, type_filter: Optional[str] = None, lesson_id: Optional[str] = None) -> dict:
         """Get star transactions."""
         params = {"limit": limit}
         if type_filter:
             params["type"] = type_filter
         if lesson_id:
             params["lessonId"] = lesson_id
-        return self._get("stars/transactions", params)
+        return await self._get("stars/transactions", params)
 
-    def get_star_stats(self) -> dict:
+    async def get_star_stats(self) -> dict:
         """Get star statistics."""
-        return self._get("stars/stats")
+        return await self._get("stars/stats")
+
+
+class StarLedgerQueue:
+    """Star add/spend operations queued on disk and sent in order with idempotency keys.
+
+    Every operation gets a client-generated key. The API does not deduplicate
+    requests and has no batch endpoint, so the key is sent as an Idempotency-Key
+    header and in the request metadata, and the ledger stores it in the
+    transaction's metadata as idempotencyKey. The reason is sent unchanged.
+    Queued awards with the same reason and lesson id are merged into
+    one request. That only moves stars earlier than the spends queued after
+    them, so no spend that would succeed can fail because of it. Spends are
+    never merged, since the balance check applies to each one.
+
+    The queue is written to a JSON file after every change, and an operation is
+    marked as sent before its request goes out. If the request ends in a
+    timeout, a dropped connection or a server error, the outcome is unknown and
+    flushing stops. The next flush (after a crash too) first looks the sent
+    operations up in the transaction history, and only resends those that are
+    not recorded. App versions that do not store the key in the metadata are
+    handled by matching on type, amount, reason, lesson id and time instead.
+    """
+
+    def __init__(self, api: BijbelQuizAPI, path: Optional[str] = None):
+        self.api = api
+        if path is None:
+            scope = hashlib.sha256(f"{api.base_url} {api.api_key or ''}".encode('utf-8')).hexdigest()[:16]
+            path = os.path.join(default_state_dir(), f"pending-stars-{scope}.json")
+        self.path = path
+        self.pending = self._load()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def _load(self) -> list:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)['pending']
+        except FileNotFoundError:
+            return []
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Corrupt pending star ledger {self.path}: {e}") from e
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'base_url': self.api.base_url, 'pending': self.pending}, f, ensure_ascii=False, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def _queue(self, operation: str, amount: int, reason: str, lesson_id: Optional[str]) -> str:
+        if amount <= 0:
+            raise ValueError("amount must be positive")
+        with self._lock:
+            if operation == 'add':
+                for op in self.pending:
+                    if (op['op'] == 'add' and not op['sent'] and op['reason'] == reason
+                            and op['lessonId'] == lesson_id):
+                        op['amount'] += amount
+                        op['merged'] += 1
+                        self._save()
+                        return op['key']
+            key = os.urandom(6).hex()
+            self.pending.append({'key': key, 'op': operation, 'amount': amount, 'reason': reason,
+                                 'lessonId': lesson_id, 'merged': 1, 'sent': False, 'queued': time.time()})
+            self._save()
+            return key
+
+    def add(self, amount: int, reason: str, lesson_id: Optional[str] = None) -> str:
+        """Queue an award; returns its idempotency key."""
+        return self._queue('add', amount, reason, lesson_id)
+
+    def spend(self, amount: int, reason: str, lesson_id: Optional[str] = None) -> str:
+        """Queue a spend; returns its idempotency key."""
+        return self._queue('spend', amount, reason, lesson_id)
+
+    @staticmethod
+    def _matches(op: dict, transaction: dict) -> bool:
+        """Whether a ledger entry without an idempotency key looks like the sent operation op."""
+        recorded_at = transaction_time(transaction)
+        return (transaction.get('type') == ('earned' if op['op'] == 'add' else 'spent')
+                and abs(transaction.get('amount') or 0) == op['amount']
+                and transaction.get('reason') == op['reason']
+                and (transaction.get('lessonId') or None) == op['lessonId']
+                and recorded_at is not None
+                and abs(recorded_at - op.get('sentAt', op['queued'])) <= RECONCILE_WINDOW)
+
+    def _reconcile(self) -> int:
+        """Drop sent operations that the ledger already records; returns how many were dropped.
+
+        Entries are matched on the idempotency key in their metadata. Entries
+        without one (from servers that do not store it) match a sent operation
+        with the same type, amount, reason and lesson id recorded within
+        RECONCILE_WINDOW seconds of sending it. Each entry matches one operation
+        at most. When in doubt an operation counts as recorded, since resending
+        it could apply it twice.
+        """
+        sent = [op for op in self.pending if op['sent']]
+        by_key = {op['key']: op for op in sent}
+        oldest = min(op.get('sentAt', op['queued']) for op in sent) - RECONCILE_WINDOW
+        recorded = set()
+        for transaction in self.api.iter_star_transactions():
+            key = transaction_idempotency_key(transaction)
+            if key is not None:
+                op = by_key.get(key)
+            else:
+                op = next((op for op in sent if id(op) not in recorded and self._matches(op, transaction)), None)
+            if op is not None:
+                recorded.add(id(op))
+                if len(recorded) == len(sent):
+                    break
+            recorded_at = transaction_time(transaction)
+            if recorded_at is not None and recorded_at < oldest:
+                # Newest first, so no older entry can belong to the sent operations
+                break
+        self.pending = [op for op in self.pending if id(op) not in recorded]
+        for op in self.pending:
+            op['sent'] = False
+        self._save()
+        return len(recorded)
+
+    def flush(self) -> dict:
+        """Send the queued operations in order.
+
+        Returns a summary with the requests made, operations applied, operations
+        found already recorded, rejected operations (dropped, for example a spend
+        beyond the balance), the last balance, what is still pending and, when
+        flushing stopped early, the error.
+        """
+        summary = {'requests': 0, 'applied': 0, 'reconciled': 0, 'rejected': [], 'balance': None,
+                   'pending': 0, 'error': None}
+        with self._lock:
+            try:
+                if any(op['sent'] for op in self.pending):
+                    summary['reconciled'] = self._reconcile()
+                while self.pending:
+                    op = self.pending[0]
+                    op['sent'] = True
+                    op['sentAt'] = time.time()
+                    self._save()
+                    send = self.api.add_stars if op['op'] == 'add' else self.api.spend_stars
+                    try:
+                        summary['requests'] += 1
+                        result = send(op['amount'], op['reason'], op['lessonId'], idempotency_key=op['key'])
+                    except (AuthenticationError, RateLimitError):
+                        op['sent'] = False
+                        raise
+                    except APIConnectionError as e:
+                        op['sent'] = e.request_sent
+                        raise
+                    except ServerError:
+                        raise
+                    except BijbelQuizAPIError as e:
+                        summary['rejected'].append({**op, 'error': str(e)})
+                    else:
+                        summary['applied'] += op['merged']
+                        summary['balance'] = result.get('balance', summary['balance'])
+                    self.pending.pop(0)
+                    self._save()
+            except BijbelQuizAPIError as e:
+                summary['error'] = str(e)
+                self._save()
+            summary['pending'] = len(self.pending)
+        return summary
 
 
 @dataclass
@@ -146,13 +1071,170 @@ class QuizQuestion:
     biblicalReference: str
     allOptions: list
     correctAnswerIndex: int
+    id: str = ""
+
+
+def question_key(question: dict) -> str:
+    """Identity of a question for deduplication.
+
+    The API does not return question ids, so questions are identified by their
+    id when present and otherwise by question text and correct answer.
+    """
+    if question.get('id'):
+        return str(question['id'])
+    return f"{question.get('question', '')}\x00{question.get('correctAnswer', '')}"
+
+
+class QuestionPrefetcher:
+    """Keeps a queue of upcoming questions filled from the API in a background thread.
+
+    The API has no offset parameter and always returns the first matching
+    questions, so new questions are found by querying again per category: without
+    a category filter, every category seen on a fetched question is queried in
+    turn. Questions are deduplicated with question_key. Once every source is used
+    up, or num_questions have been loaded for a game of fixed length, the queue
+    ends; with endless=True the questions seen so far are reshuffled and played
+    again.
+    """
+
+    def __init__(self, api: BijbelQuizAPI, category: Optional[str] = None, difficulty: Optional[int] = None,
+                 batch_size: int = 50, low_water: int = 10, endless: bool = False,
+                 num_questions: Optional[int] = None):
+        self.api = api
+        self.category = category
+        self.difficulty = difficulty
+        self.batch_size = max(1, min(batch_size, 50))
+        self.endless = endless
+        self.num_questions = None if endless else num_questions
+        self.low_water = low_water if self.num_questions is None else min(low_water, self.num_questions)
+        self.loaded = 0
+        self.rounds = 1
+        self.error = None
+        self._queue = queue.Queue()
+        self._seen = {}
+        self._sources = deque([category])
+        self._queried = {category}
+        self._wanted = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="question-prefetch", daemon=True)
+
+    def start(self):
+        self._wanted.set()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wanted.set()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """The next question, waiting for the prefetcher if needed; None when there are no more."""
+        if self._queue.qsize() <= self.low_water:
+            self._wanted.set()
+        item = self._queue.get(timeout=timeout)
+        if item is None:
+            self._queue.put(None)
+        return item
+
+    def _fetch_next(self) -> int:
+        """Query the next source and queue its unseen questions; returns how many were new."""
+        source = self._sources.popleft()
+        result = self.api.get_questions(category=source, limit=self.batch_size, difficulty=self.difficulty)
+        new = 0
+        for question in result.get('questions') or []:
+            if source is None or self.category is None:
+                for category in question.get('categories') or []:
+                    if category not in self._queried:
+                        self._queried.add(category)
+                        self._sources.append(category)
+            key = question_key(question)
+            if key in self._seen:
+                continue
+            self._seen[key] = question
+            self._queue.put(question)
+            new += 1
+        self.loaded += new
+        return new
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                if self._queue.qsize() > self.low_water:
+                    # Clear before re-checking so a get() in between is not missed
+                    self._wanted.clear()
+                    if self._queue.qsize() > self.low_water:
+                        self._wanted.wait()
+                    continue
+
+                if self.num_questions is not None and self.loaded >= self.num_questions:
+                    break
+                if self._sources:
+                    self._fetch_next()
+                elif self.endless and self._seen:
+                    replay = list(self._seen.values())
+                    random.shuffle(replay)
+                    for question in replay:
+                        self._queue.put(question)
+                    self.rounds += 1
+                else:
+                    break
+        except Exception as e:
+            self.error = e
+        self._queue.put(None)
+
+
+class OfflineQuestionSource:
+    """Questions drawn from a local QuestionBank, for games without the API.
+
+    The matching positions come from the bank's category/difficulty index and
+    are shuffled once, so drawing a question is a constant-time pop. With
+    endless=True the questions are reshuffled once all have been played. Offers
+    the same get/stop interface as QuestionPrefetcher.
+    """
+
+    def __init__(self, bank: QuestionBank, category: Optional[str] = None, difficulty: Optional[int] = None,
+                 endless: bool = False, rng: Optional[random.Random] = None):
+        self.bank = bank
+        self.category = category
+        self.difficulty = difficulty
+        self.endless = endless
+        self.rounds = 1
+        self.error = None
+        self._rng = rng or random.Random()
+        self._positions = self._shuffled()
+        self.loaded = len(self._positions)
+
+    def _shuffled(self) -> list:
+        positions = list(self.bank.select(self.category, self.difficulty))
+        self._rng.shuffle(positions)
+        return positions
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """The next question; None when there are no more."""
+        if not self._positions:
+            if not self.endless or not self.loaded:
+                return None
+            self._positions = self._shuffled()
+            self.rounds += 1
+        return with_options(self.bank.questions[self._positions.pop()], self._rng)
 
 
 class QuizGame:
-    """Interactive quiz game."""
+    """Interactive quiz game. Without an api, stars are not awarded (offline play).
+
+    With a ledger, the award is queued there and flushed, so an award that
+    fails is kept and retried later instead of being lost or sent twice.
+    """
     
-    def __init__(self, api: BijbelQuizAPI):
+    def __init__(self, api: Optional[BijbelQuizAPI] = None, ledger: Optional[StarLedgerQueue] = None):
         self.api = api
+        self.ledger = ledger
         self.score = 0
         self.total_questions = 0
         self.correct_answers = 0
@@ -214,20 +1296,9 @@ class QuizGame:
             
         return question
         
-    def play_round(self, question_data: dict) -> bool:
-        """Play a single question round."""
-        question = self.display_question(question_data)
-        
-        # Get user choice
-        valid_choices = [str(i) for i in range(1, len(question.allOptions) + 1)]
-        choice = self.get_user_input(f"\nEnter your choice (1-{len(question.allOptions)}): ", valid_choices)
-        
-        user_answer_index = int(choice) - 1
-        user_answer = question.allOptions[user_answer_index]
-        correct_answer = question.correctAnswer
-        
-        # Check if answer is correct
-        is_correct = user_answer_index == question.correctAnswerIndex
+    def score_answer(self, question: QuizQuestion, answer_index: int) -> tuple:
+        """Record an answer; returns (is_correct, points, stars earned)."""
+        is_correct = answer_index == question.correctAnswerIndex
         
         # Convert difficulty to int to avoid string multiplication error
         difficulty = int(question.difficulty) if isinstance(question.difficulty, str) else question.difficulty
@@ -242,6 +1313,25 @@ class QuizGame:
             self.correct_answers += 1
             self.score += points
             self.stars_earned += stars_earned
+        return is_correct, points, stars_earned
+    
+    def award_reason(self) -> str:
+        """Reason recorded with the stars awarded for the game."""
+        return f"Quiz game completed - {self.correct_answers}/{self.total_questions} correct"
+        
+    def play_round(self, question_data: dict) -> bool:
+        """Play a single question round."""
+        question = self.display_question(question_data)
+        
+        # Get user choice
+        valid_choices = [str(i) for i in range(1, len(question.allOptions) + 1)]
+        choice = self.get_user_input(f"\nEnter your choice (1-{len(question.allOptions)}): ", valid_choices)
+        
+        user_answer_index = int(choice) - 1
+        user_answer = question.allOptions[user_answer_index]
+        correct_answer = question.correctAnswer
+        
+        is_correct, points, stars_earned = self.score_answer(question, user_answer_index)
             
         # Show result
         self.clear_screen()
@@ -279,12 +1369,24 @@ class QuizGame:
         print(f"   • Stars earned: {self.stars_earned}")
         
         # Award stars via API
-        if self.stars_earned > 0:
+        reason = self.award_reason()
+        if self.stars_earned > 0 and self.api is None:
+            print("   • Offline game: stars are not added to your balance")
+        elif self.stars_earned > 0 and self.ledger is not None:
+            try:
+                self.ledger.add(self.stars_earned, reason)
+                summary = self.ledger.flush()
+            except (OSError, ValueError) as e:
+                print(f"   • Warning: Could not award stars - {e}")
+            else:
+                if summary['error']:
+                    print(f"   • Warning: Could not award stars - {summary['error']}")
+                    print(f"   • {summary['pending']} star operation(s) saved; run 'stars flush' to retry")
+                elif summary['balance'] is not None:
+                    print(f"   • New star balance: {summary['balance']}")
+        elif self.stars_earned > 0:
             try:
-                result = self.api.add_stars(
-                    self.stars_earned,
-                    f"Quiz game completed - {self.correct_answers}/{self.total_questions} correct"
-                )
+                result = self.api.add_stars(self.stars_earned, reason)
                 if result.get('success'):
                     print(f"   • New star balance: {result.get('balance', 'Unknown')}")
                 else:
@@ -294,8 +1396,23 @@ class QuizGame:
                 
         print("\nThank you for playing! 🙏")
         
-    def start(self, category: str = None, difficulty: int = None, num_questions: int = 10):
-        """Start the quiz game."""
+    def start(self, category: str = None, difficulty: int = None, num_questions: int = 10, endless: bool = False,
+              bank: Optional[QuestionBank] = None):
+        """Start the quiz game.
+        
+        Questions are prefetched in the background while the player answers, so
+        games are not limited to one API batch. With a bank, questions come from
+        the local question files instead of the API. With endless=True the game
+        runs until the player stops.
+        """
+        if bank is not None:
+            source = OfflineQuestionSource(bank, category, difficulty, endless=endless)
+        else:
+            batch_size = 50 if endless else min(num_questions, 50)
+            source = QuestionPrefetcher(self.api, category, difficulty, batch_size=batch_size, endless=endless,
+                                        num_questions=num_questions)
+        source.start()
+        
         print("Starting BijbelQuiz game...")
         print("Press Ctrl+C at any time to quit.")
         time.sleep(2)
@@ -303,29 +1420,46 @@ class QuizGame:
         self.start_time = time.time()
         
         try:
-            # Get questions from API
             print("Loading questions...")
-            result = self.api.get_questions(category=category, limit=num_questions, difficulty=difficulty)
+            question_data = source.get()
             
-            if 'questions' not in result or not result['questions']:
-                print("❌ No questions available. Please check your API connection and try again.")
+            if question_data is None:
+                if source.error:
+                    print(f"❌ Could not load questions: {source.error}")
+                else:
+                    print("❌ No questions available. Please check your filters and API connection and try again.")
                 return
                 
-            questions = result['questions']
-            print(f"✅ Loaded {len(questions)} questions!")
+            if endless:
+                print("✅ Endless mode: questions keep coming until you stop!")
+            else:
+                print(f"✅ Loaded {min(source.loaded, num_questions)} questions!")
             time.sleep(1)
             
-            # Play each question
-            for i, question_data in enumerate(questions, 1):
-                if not self.play_round(question_data):
+            # Play questions as they arrive from the question source
+            while question_data is not None:
+                rounds = source.rounds
+                correct = self.play_round(question_data)
+                if not endless and self.total_questions >= num_questions:
+                    break
+                    
+                question_data = source.get()
+                if question_data is not None and source.rounds > rounds:
+                    print("\n🔁 You've seen every available question, starting a new round!")
+                    time.sleep(1)
+                    
+                if not correct and question_data is not None:
                     # Allow user to continue or quit on wrong answer
-                    if i < len(questions):
-                        continue_game = self.get_user_input(
-                            "\nContinue playing? (y/n): ", ['y', 'n', 'yes', 'no']
-                        )
-                        if continue_game in ['n', 'no']:
-                            break
-                            
+                    continue_game = self.get_user_input(
+                        "\nContinue playing? (y/n): ", ['y', 'n', 'yes', 'no']
+                    )
+                    if continue_game in ['n', 'no']:
+                        break
+                        
+            if source.error:
+                print(f"\n⚠️ Stopped early, could not load more questions: {source.error}")
+                time.sleep(2)
+                
             # End game
             self.end_game()
             
@@ -335,6 +1469,361 @@ class QuizGame:
         except Exception as e:
             print(f"\n❌ Error during game: {e}")
             print("Please check your API connection and try again.")
+        finally:
+            source.stop()
+
+
+# Requests the bench command can send. The star add/spend endpoints change the
+# ledger (one star per request) and are only used when named in --mix.
+BENCH_ENDPOINTS = {
+    'health': lambda api: api.health(),
+    'questions': lambda api: api.get_questions(limit=10),
+    'progress': lambda api: api.get_progress(),
+    'stats': lambda api: api.get_stats(),
+    'settings': lambda api: api.get_settings(),
+    'stars/balance': lambda api: api.get_star_balance(),
+    'stars/transactions': lambda api: api.get_star_transactions(limit=50),
+    'stars/stats': lambda api: api.get_star_stats(),
+    'stars/add': lambda api: api.add_stars(1, "bench"),
+    'stars/spend': lambda api: api.spend_stars(1, "bench"),
+}
+DEFAULT_BENCH_MIX = "health=1,questions=4,stats=1,settings=1,stars/balance=2,stars/transactions=1"
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+def parse_mix(text: str) -> dict:
+    """Parse 'health=1,questions=4' into {'health': 1.0, 'questions': 4.0}."""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in BENCH_ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name} (choose from {', '.join(BENCH_ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+        if mix[name] <= 0:
+            raise ValueError(f"Weight for {name} must be positive")
+    return mix
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-q * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(samples: list, elapsed: float) -> dict:
+    """Counts, throughput, percentiles and histogram for (latency, outcome) samples."""
+    latencies = sorted(latency * 1000 for latency, _ in samples)
+    outcomes = {}
+    for _, outcome in samples:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    histogram = {}
+    index = 0
+    for bound in LATENCY_BUCKETS_MS + (float('inf'),):
+        count = 0
+        while index < len(latencies) and latencies[index] <= bound:
+            count += 1
+            index += 1
+        histogram[f"<={bound:g}" if bound != float('inf') else f">{LATENCY_BUCKETS_MS[-1]}"] = count
+    total = len(samples)
+    return {
+        'requests': total,
+        'ok': outcomes.get('ok', 0),
+        'rate_limited': outcomes.get('429', 0),
+        'errors': total - outcomes.get('ok', 0) - outcomes.get('429', 0),
+        'error_rate': (total - outcomes.get('ok', 0) - outcomes.get('429', 0)) / total if total else 0.0,
+        'rate_limited_rate': outcomes.get('429', 0) / total if total else 0.0,
+        'throughput': total / elapsed if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1] if latencies else 0.0,
+            'mean': sum(latencies) / total if total else 0.0,
+        },
+        'outcomes': outcomes,
+        'histogram_ms': histogram,
+    }
+
+
+async def run_bench(api: AsyncBijbelQuizAPI, mix: dict, rate: float, duration: float, seed: Optional[int] = None) -> dict:
+    """Drive the API open-loop at rate requests/s for duration seconds.
+
+    Request i is scheduled at start + i / rate whether or not earlier requests have
+    finished, and its latency is measured from that scheduled time. Time spent
+    waiting for a free connection therefore counts, so a slow server can't hide
+    its queueing by slowing down the load generator (coordinated omission).
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}
+    loop = asyncio.get_running_loop()
+
+    async def one(name: str, scheduled: float):
+        try:
+            await BENCH_ENDPOINTS[name](api)
+            outcome = 'ok'
+        except RateLimitError:
+            outcome = '429'
+        except APIConnectionError:
+            outcome = 'connection'
+        except BijbelQuizAPIError as e:
+            outcome = str(e.status or 'error')
+        samples[name].append((loop.time() - scheduled, outcome))
+
+    tasks = []
+    total = max(1, int(rate * duration))
+    start = loop.time()
+    for i in range(total):
+        scheduled = start + i / rate
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one(rng.choices(names, weights)[0], scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    report = {
+        'target_rate': rate,
+        'duration': duration,
+        'elapsed': elapsed,
+        'concurrency': api.transport.max_connections,
+        'mix': mix,
+        'endpoints': {name: summarize_latencies(samples[name], elapsed) for name in names if samples[name]},
+        'total': summarize_latencies([sample for name in names for sample in samples[name]], elapsed),
+    }
+    return report
+
+
+def print_bench_report(report: dict, file=None):
+    """Print a bench report as a table."""
+    file = file or sys.stdout
+    print(f"Target {report['target_rate']:g} req/s for {report['duration']:g}s at concurrency "
+          f"{report['concurrency']}, finished in {report['elapsed']:.1f}s", file=file)
+    print_latency_table(report, file)
+
+
+def print_latency_table(report: dict, file=None):
+    """Print the per-endpoint latency table and histogram of a bench or simulation report."""
+    file = file or sys.stdout
+    header = f"{'Endpoint':<20} {'Reqs':>7} {'Req/s':>8} {'Err%':>6} {'429%':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    print(header, file=file)
+    print("-" * len(header), file=file)
+    rows = list(report['endpoints'].items()) + [('TOTAL', report['total'])]
+    for name, stats in rows:
+        latency = stats['latency_ms']
+        print(f"{name:<20} {stats['requests']:>7} {stats['throughput']:>8.1f} {stats['error_rate'] * 100:>6.1f} "
+              f"{stats['rate_limited_rate'] * 100:>6.1f} {latency['p50']:>8.1f} {latency['p90']:>8.1f} "
+              f"{latency['p99']:>8.1f} {latency['max']:>8.1f}", file=file)
+    print("\nLatency histogram (all requests):", file=file)
+    histogram = report['total']['histogram_ms']
+    peak = max(histogram.values()) or 1
+    for bucket, count in histogram.items():
+        print(f"  {bucket + ' ms':>10} {count:>7} {'#' * round(40 * count / peak)}", file=file)
+
+
+THINK_TIME_DISTRIBUTIONS = ('exponential', 'uniform', 'fixed')
+
+
+class SimulatedPlayer(QuizGame):
+    """A headless QuizGame session for load tests.
+
+    Plays one game through the async client: questions are fetched like the
+    game does, each answer is right with probability accuracy after a sampled
+    think time, and the stars are awarded with add_stars at the end (directly,
+    not through a StarLedgerQueue). Nothing is printed and there are no UI
+    pauses; record(endpoint, latency, outcome) receives every request.
+    """
+    
+    def __init__(self, api: AsyncBijbelQuizAPI, record, rng: random.Random, accuracy: float = 0.7,
+                 think_time: float = 2.0, think_distribution: str = 'exponential',
+                 category: Optional[str] = None, difficulty: Optional[int] = None):
+        super().__init__(api)
+        self.record = record
+        self.rng = rng
+        self.accuracy = accuracy
+        self.think_time = think_time
+        self.think_distribution = think_distribution
+        self.category = category
+        self.difficulty = difficulty
+        
+    def think(self) -> float:
+        """Seconds the player takes to answer."""
+        if self.think_time <= 0 or self.think_distribution == 'fixed':
+            return max(0.0, self.think_time)
+        if self.think_distribution == 'uniform':
+            return self.rng.uniform(0, 2 * self.think_time)
+        return self.rng.expovariate(1 / self.think_time)
+    
+    def choose(self, question: QuizQuestion) -> int:
+        """The index of the player's answer."""
+        if self.rng.random() < self.accuracy or len(question.allOptions) < 2:
+            return question.correctAnswerIndex
+        wrong = [i for i in range(len(question.allOptions)) if i != question.correctAnswerIndex]
+        return self.rng.choice(wrong)
+    
+    async def _timed(self, endpoint: str, request):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            result = await request
+        except RateLimitError:
+            self.record(endpoint, loop.time() - started, '429')
+            raise
+        except APIConnectionError:
+            self.record(endpoint, loop.time() - started, 'connection')
+            raise
+        except BijbelQuizAPIError as e:
+            self.record(endpoint, loop.time() - started, str(e.status or 'error'))
+            raise
+        self.record(endpoint, loop.time() - started, 'ok')
+        return result
+    
+    async def play(self, num_questions: int, deadline: float) -> str:
+        """Play one game; returns 'completed', 'abandoned' (deadline reached) or 'failed'."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self.total_questions < num_questions:
+                batch = min(num_questions - self.total_questions, 50)
+                result = await self._timed('questions', self.api.get_questions(self.category, batch, self.difficulty))
+                questions = result.get('questions') or []
+                if not questions:
+                    break
+                for question_data in questions[:batch]:
+                    think, remaining = self.think(), deadline - loop.time()
+                    if think >= remaining:
+                        # Still thinking at the deadline: stop there instead of overshooting it
+                        await asyncio.sleep(max(remaining, 0.0))
+                        return 'abandoned'
+                    await asyncio.sleep(think)
+                    question = QuizQuestion(**question_data)
+                    self.score_answer(question, self.choose(question))
+            if self.stars_earned > 0:
+                await self._timed('stars/add', self.api.add_stars(self.stars_earned, self.award_reason()))
+        except BijbelQuizAPIError:
+            return 'failed'
+        return 'completed' if self.total_questions else 'failed'
+
+
+async def run_simulation(api: AsyncBijbelQuizAPI, players: int, duration: float, num_questions: int = 10,
+                         accuracy: float = 0.7, think_time: float = 2.0, think_distribution: str = 'exponential',
+                         category: Optional[str] = None, difficulty: Optional[int] = None,
+                         seed: Optional[int] = None) -> dict:
+    """Run players concurrent SimulatedPlayers for duration seconds and aggregate the results.
+
+    Each player plays game after game until the deadline; a game still running
+    then is abandoned. Players start at random offsets within one think time so
+    they do not all fetch questions at once.
+    """
+    rng = random.Random(seed)
+    samples = {}
+    sessions = {'completed': 0, 'abandoned': 0, 'failed': 0}
+    totals = {'questions_answered': 0, 'correct_answers': 0, 'stars_awarded': 0}
+    loop = asyncio.get_running_loop()
+
+    def record(endpoint: str, latency: float, outcome: str):
+        samples.setdefault(endpoint, []).append((latency, outcome))
+
+    async def pause(seconds: float):
+        """Sleep, but never past the deadline."""
+        await asyncio.sleep(max(0.0, min(seconds, deadline - loop.time())))
+
+    async def player(player_rng: random.Random):
+        await pause(player_rng.uniform(0, think_time))
+        while loop.time() < deadline:
+            game = SimulatedPlayer(api, record, player_rng, accuracy, think_time, think_distribution,
+                                   category, difficulty)
+            outcome = await game.play(num_questions, deadline)
+            sessions[outcome] += 1
+            totals['questions_answered'] += game.total_questions
+            totals['correct_answers'] += game.correct_answers
+            if outcome == 'completed':
+                totals['stars_awarded'] += game.stars_earned
+            elif outcome == 'failed':
+                # Back off for a think time before starting over, like a player retrying
+                await pause(max(think_time, 0.1))
+
+    start = loop.time()
+    deadline = start + duration
+    await asyncio.gather(*(player(random.Random(rng.random())) for _ in range(players)))
+    elapsed = loop.time() - start
+
+    answered = totals['questions_answered']
+    return {
+        'players': players,
+        'duration': duration,
+        'elapsed': elapsed,
+        'questions_per_game': num_questions,
+        'accuracy_target': accuracy,
+        'think_time': think_time,
+        'think_distribution': think_distribution,
+        'sessions': sessions,
+        'games_per_minute': sessions['completed'] * 60 / elapsed if elapsed > 0 else 0.0,
+        'answers_per_second': answered / elapsed if elapsed > 0 else 0.0,
+        'accuracy': totals['correct_answers'] / answered if answered else 0.0,
+        **totals,
+        'endpoints': {name: summarize_latencies(samples[name], elapsed) for name in sorted(samples)},
+        'total': summarize_latencies([sample for name in samples for sample in samples[name]], elapsed),
+    }
+
+
+def print_simulation_report(report: dict, file=None):
+    """Print a simulation report: game totals, then the latency table."""
+    file = file or sys.stdout
+    sessions = report['sessions']
+    print(f"{report['players']} players for {report['duration']:g}s ({report['questions_per_game']} questions "
+          f"per game, {report['think_distribution']} think time {report['think_time']:g}s), "
+          f"finished in {report['elapsed']:.1f}s", file=file)
+    print(f"Games: {sessions['completed']} completed, {sessions['abandoned']} abandoned at the end, "
+          f"{sessions['failed']} failed ({report['games_per_minute']:.1f} completed/min)", file=file)
+    print(f"Answers: {report['questions_answered']} ({report['answers_per_second']:.1f}/s), "
+          f"accuracy {report['accuracy'] * 100:.1f}%, {report['stars_awarded']} stars awarded\n", file=file)
+    print_latency_table(report, file)
+
+
+# Read endpoints that make up a device snapshot, by their key in the snapshot document
+SNAPSHOT_ENDPOINTS = {
+    'health': lambda api: api.health(),
+    'progress': lambda api: api.get_progress(),
+    'stats': lambda api: api.get_stats(),
+    'settings': lambda api: api.get_settings(),
+    'stars_balance': lambda api: api.get_star_balance(),
+    'stars_stats': lambda api: api.get_star_stats(),
+}
+
+
+async def take_snapshot(api: AsyncBijbelQuizAPI, endpoints: Optional[list] = None) -> dict:
+    """Fetch the read endpoints concurrently and merge them into one timestamped document.
+
+    Each endpoint's response is stored under its key, with request durations
+    under timings_ms. An endpoint that fails gets an error entry and is listed
+    under failed instead of failing the whole snapshot.
+    """
+    names = endpoints or list(SNAPSHOT_ENDPOINTS)
+    loop = asyncio.get_running_loop()
+
+    async def fetch(name: str) -> tuple:
+        started = loop.time()
+        try:
+            result, ok = await SNAPSHOT_ENDPOINTS[name](api), True
+        except BijbelQuizAPIError as e:
+            result, ok = {'error': str(e), 'status': e.status}, False
+        return name, result, (loop.time() - started) * 1000, ok
+
+    taken_at = datetime.now(timezone.utc).isoformat()
+    start = loop.time()
+    results = await asyncio.gather(*(fetch(name) for name in names))
+    snapshot = {'timestamp': taken_at, 'base_url': api.base_url,
+                'elapsed_ms': (loop.time() - start) * 1000, 'timings_ms': {}, 'failed': []}
+    for name, result, elapsed_ms, ok in results:
+        snapshot[name] = result
+        snapshot['timings_ms'][name] = elapsed_ms
+        if not ok:
+            snapshot['failed'].append(name)
+    return snapshot
 
 
 def print_json(data: dict):
@@ -342,10 +1831,145 @@ def print_json(data: dict):
     print(json.dumps(data, indent=2, ensure_ascii=False))
 
 
+def write_transactions(pages, output_format: str = "ndjson", file=None) -> int:
+    """Write pages of transactions as they arrive, as NDJSON lines or one streamed JSON document.
+
+    Output is flushed after every page, so readers see each page as soon as it
+    is fetched. Returns the number of transactions written.
+    """
+    file = file or sys.stdout
+    count = 0
+    if output_format == "json":
+        file.write('{\n  "transactions": [')
+    for page in pages:
+        for transaction in page:
+            line = json.dumps(transaction, ensure_ascii=False)
+            if output_format == "json":
+                file.write(("," if count else "") + "\n    " + line)
+            else:
+                file.write(line + "\n")
+            count += 1
+        file.flush()
+    if output_format == "json":
+        file.write(("\n  " if count else "") + f'],\n  "count": {count}\n}}\n')
+    file.flush()
+    return count
+
+
+def stream_transactions(api: BijbelQuizAPI, args):
+    """Run stars transactions with --all or --format ndjson, stopping quietly when the reader goes away."""
+    if args.all:
+        pages = api.iter_star_transaction_pages(args.type, args.lesson_id, args.page_size)
+    else:
+        pages = [api.get_star_transactions(args.limit, args.type, args.lesson_id).get("transactions") or []]
+    try:
+        write_transactions(pages, args.format)
+    except BrokenPipeError:
+        # The reader (e.g. head) has gone; send the rest, including the flush at exit, to /dev/null
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def run_bench_command(args):
+    """Run the bench subcommand: no pacing or retries, so the raw server behaviour is measured."""
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.rate <= 0 or args.duration <= 0 or args.concurrency < 1:
+        print("Error: --rate, --duration and --concurrency must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    async def bench():
+        async with AsyncBijbelQuizAPI(args.url, args.api_key, timeout=args.timeout,
+                                      max_concurrency=args.concurrency,
+                                      retry=RetryPolicy(max_retries=0)) as api:
+            return await run_bench(api, mix, args.rate, args.duration, args.seed)
+
+    try:
+        report = asyncio.run(bench())
+    except KeyboardInterrupt:
+        print("\nBenchmark cancelled", file=sys.stderr)
+        sys.exit(1)
+
+    print_bench_report(report, sys.stderr if args.json == '-' else sys.stdout)
+    if args.json == '-':
+        print_json(report)
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+def run_simulate_command(args):
+    """Run the simulate subcommand: no pacing or retries, so the raw server behaviour is measured."""
+    if args.players < 1 or args.duration <= 0 or args.questions < 1:
+        print("Error: --players, --duration and --questions must be positive", file=sys.stderr)
+        sys.exit(1)
+    if not 0 <= args.accuracy <= 1 or args.think_time < 0:
+        print("Error: --accuracy must be between 0 and 1 and --think-time must not be negative", file=sys.stderr)
+        sys.exit(1)
+
+    async def simulate():
+        async with AsyncBijbelQuizAPI(args.url, args.api_key, timeout=args.timeout,
+                                      max_concurrency=args.concurrency or args.players,
+                                      retry=RetryPolicy(max_retries=0)) as api:
+            return await run_simulation(api, args.players, args.duration, args.questions, args.accuracy,
+                                        args.think_time, args.think_dist, args.category, args.difficulty,
+                                        args.seed)
+
+    try:
+        report = asyncio.run(simulate())
+    except KeyboardInterrupt:
+        print("\nSimulation cancelled", file=sys.stderr)
+        sys.exit(1)
+
+    print_simulation_report(report, sys.stderr if args.json == '-' else sys.stdout)
+    if args.json == '-':
+        print_json(report)
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+def run_snapshot_command(args):
+    """Run the snapshot subcommand; exits with status 1 when any endpoint failed."""
+    rate_limiter = TokenBucket.per_minute(args.rate_limit) if args.rate_limit > 0 else None
+
+    async def snapshot():
+        async with AsyncBijbelQuizAPI(args.url, args.api_key, timeout=args.timeout,
+                                      max_concurrency=len(SNAPSHOT_ENDPOINTS), rate_limiter=rate_limiter,
+                                      retry=RetryPolicy(max_retries=args.max_retries)) as api:
+            return await take_snapshot(api, args.endpoints)
+
+    try:
+        result = asyncio.run(snapshot())
+    except KeyboardInterrupt:
+        print("\nSnapshot cancelled", file=sys.stderr)
+        sys.exit(1)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    else:
+        print_json(result)
+    if result['failed']:
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(description="BijbelQuiz API CLI")
     parser.add_argument("--url", default="http://localhost:7777/v1", help="API base URL")
-    parser.add_argument("--api-key", required=True, help="API key for authentication")
+    parser.add_argument("--api-key", help="API key for authentication (not needed for game --offline)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Connect and read timeout in seconds (default: {DEFAULT_TIMEOUT:g})")
+    parser.add_argument("--rate-limit", type=int, default=RATE_LIMIT_PER_MINUTE,
+                        help=f"Max requests per minute sent to the API, 0 to disable (default: {RATE_LIMIT_PER_MINUTE})")
+    parser.add_argument("--max-retries", type=int, default=RetryPolicy.max_retries,
+                        help=f"Retries for rate limited or failed requests (default: {RetryPolicy.max_retries})")
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument("--cache", dest="cache", action="store_true", default=None,
+                             help="Cache read responses under ~/.cache/bijbelquiz (or set BIJBELQUIZ_CACHE=1)")
+    cache_group.add_argument("--no-cache", dest="cache", action="store_false",
+                             help="Always fetch from the API, even if BIJBELQUIZ_CACHE is set")
 
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
@@ -369,10 +1993,46 @@ def main():
     game_parser.add_argument("--category", help="Filter by category")
     game_parser.add_argument("--difficulty", type=int, choices=range(1, 6), help="Difficulty level (1-5)")
     game_parser.add_argument("--questions", type=int, default=10, help="Number of questions to play (default: 10)")
+    game_parser.add_argument("--endless", action="store_true", help="Keep playing until you quit (ignores --questions)")
+    game_parser.add_argument("--offline", action="store_true", help="Play from the bundled question files, without the API")
+    game_parser.add_argument("--lang", choices=["nl", "en"], default="nl", help="Question language for --offline (default: nl)")
 
     # Settings command
     subparsers.add_parser("settings", help="Get app settings")
 
+    # Bench command
+    bench_parser = subparsers.add_parser("bench", help="Load test the API and report latency percentiles")
+    bench_parser.add_argument("--rate", type=float, default=20.0, help="Requests per second to send (default: 20)")
+    bench_parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run (default: 10)")
+    bench_parser.add_argument("--concurrency", type=int, default=8, help="Max requests in flight (default: 8)")
+    bench_parser.add_argument("--mix", default=DEFAULT_BENCH_MIX,
+                              help=f"Weighted endpoint mix (default: {DEFAULT_BENCH_MIX}); "
+                                   f"endpoints: {', '.join(BENCH_ENDPOINTS)}")
+    bench_parser.add_argument("--seed", type=int, help="Random seed for the endpoint sequence")
+    bench_parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON to FILE ('-' for stdout)")
+
+    # Snapshot command
+    snapshot_parser = subparsers.add_parser("snapshot", help="Fetch all read endpoints at once into one JSON document")
+    snapshot_parser.add_argument("--endpoints", nargs="+", choices=list(SNAPSHOT_ENDPOINTS),
+                                 help="Only these endpoints (default: all)")
+    snapshot_parser.add_argument("--output", "-o", metavar="FILE", help="Write the snapshot to FILE instead of stdout")
+
+    # Simulate command
+    simulate_parser = subparsers.add_parser("simulate", help="Load test with concurrent synthetic quiz players")
+    simulate_parser.add_argument("--players", type=int, default=10, help="Concurrent players (default: 10)")
+    simulate_parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run (default: 30)")
+    simulate_parser.add_argument("--questions", type=int, default=10, help="Questions per game (default: 10)")
+    simulate_parser.add_argument("--accuracy", type=float, default=0.7, help="Chance of a correct answer (default: 0.7)")
+    simulate_parser.add_argument("--think-time", type=float, default=2.0,
+                                 help="Mean seconds to answer a question (default: 2, 0 for none)")
+    simulate_parser.add_argument("--think-dist", choices=THINK_TIME_DISTRIBUTIONS, default="exponential",
+                                 help="Think time distribution (default: exponential)")
+    simulate_parser.add_argument("--category", help="Question category")
+    simulate_parser.add_argument("--difficulty", type=int, choices=[1, 2, 3, 4, 5], help="Difficulty level")
+    simulate_parser.add_argument("--concurrency", type=int, help="Max requests in flight (default: one per player)")
+    simulate_parser.add_argument("--seed", type=int, help="Random seed for answers and think times")
+    simulate_parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON to FILE ('-' for stdout)")
+
     # Stars subcommands
     stars_parser = subparsers.add_parser("stars", help="Star management commands")
     stars_subparsers = stars_parser.add_subparsers(dest="stars_command", help="Star commands")
@@ -385,29 +2045,73 @@ def main():
     add_parser.add_argument("amount", type=int, help="Amount of stars to add")
     add_parser.add_argument("reason", help="Reason for adding stars")
     add_parser.add_argument("--lesson-id", help="Lesson ID")
+    add_parser.add_argument("--queue", action="store_true", help="Only queue the award; send it with 'stars flush'")
 
     # Stars spend
     spend_parser = stars_subparsers.add_parser("spend", help="Spend stars")
     spend_parser.add_argument("amount", type=int, help="Amount of stars to spend")
     spend_parser.add_argument("reason", help="Reason for spending stars")
     spend_parser.add_argument("--lesson-id", help="Lesson ID")
+    spend_parser.add_argument("--queue", action="store_true", help="Only queue the spend; send it with 'stars flush'")
 
     # Stars transactions
     transactions_parser = stars_subparsers.add_parser("transactions", help="Get star transactions")
     transactions_parser.add_argument("--limit", type=int, default=50, help="Number of transactions")
     transactions_parser.add_argument("--type", choices=["earned", "spent", "lesson_reward", "refund"], help="Filter by transaction type")
     transactions_parser.add_argument("--lesson-id", help="Filter by lesson ID")
+    transactions_parser.add_argument("--all", action="store_true", help="Fetch the whole ledger page by page (ignores --limit)")
+    transactions_parser.add_argument("--page-size", type=int, default=MAX_TRANSACTIONS_LIMIT,
+                                     help=f"Transactions per request with --all (default: {MAX_TRANSACTIONS_LIMIT})")
+    transactions_parser.add_argument("--format", choices=["json", "ndjson"], default="json",
+                                     help="Output format; ndjson writes one transaction per line (default: json)")
 
     # Stars stats
     stars_subparsers.add_parser("stats", help="Get star statistics")
 
+    # Stars queue
+    stars_subparsers.add_parser("flush", help="Send queued star operations (and retry unconfirmed ones)")
+    stars_subparsers.add_parser("pending", help="Show queued star operations")
+
     args = parser.parse_args()
 
     if not args.command:
         parser.print_help()
         sys.exit(1)
 
-    api = BijbelQuizAPI(args.url, args.api_key)
+    if args.command == "game" and args.offline:
+        try:
+            bank = QuestionBank.load(args.lang)
+        except (OSError, ValueError) as e:
+            print(f"Error: could not load the {args.lang} question file: {e}", file=sys.stderr)
+            sys.exit(1)
+        QuizGame().start(category=args.category, difficulty=args.difficulty, num_questions=args.questions,
+                         endless=args.endless, bank=bank)
+        return
+
+    if not args.api_key:
+        parser.error("--api-key is required")
+
+    if args.command == "bench":
+        run_bench_command(args)
+        return
+
+    if args.command == "simulate":
+        run_simulate_command(args)
+        return
+
+    if args.command == "snapshot":
+        run_snapshot_command(args)
+        return
+
+    rate_limiter = TokenBucket.per_minute(args.rate_limit) if args.rate_limit > 0 else None
+    use_cache = args.cache if args.cache is not None else os.environ.get('BIJBELQUIZ_CACHE', '') not in ('', '0')
+    try:
+        cache = ResponseCache(os.environ.get('BIJBELQUIZ_CACHE_DIR')) if use_cache else None
+    except OSError as e:
+        print(f"Warning: response cache disabled ({e})", file=sys.stderr)
+        cache = None
+    api = BijbelQuizAPI(args.url, args.api_key, timeout=args.timeout, rate_limiter=rate_limiter,
+                        retry=RetryPolicy(max_retries=args.max_retries), cache=cache)
 
     try:
         if args.command == "health":
@@ -427,11 +2131,12 @@ def main():
             print_json(result)
 
         elif args.command == "game":
-            game = QuizGame(api)
+            game = QuizGame(api, StarLedgerQueue(api))
             game.start(
                 category=args.category,
                 difficulty=args.difficulty,
-                num_questions=args.questions
+                num_questions=args.questions,
+                endless=args.endless
             )
 
         elif args.command == "settings":
@@ -443,6 +2148,12 @@ def main():
                 result = api.get_star_balance()
                 print_json(result)
 
+            elif args.stars_command in ("add", "spend") and args.queue:
+                ledger = StarLedgerQueue(api)
+                queue_operation = ledger.add if args.stars_command == "add" else ledger.spend
+                key = queue_operation(args.amount, args.reason, args.lesson_id)
+                print_json({"queued": key, "pending": len(ledger)})
+
             elif args.stars_command == "add":
                 result = api.add_stars(args.amount, args.reason, args.lesson_id)
                 print_json(result)
@@ -451,9 +2162,22 @@ def main():
                 result = api.spend_stars(args.amount, args.reason, args.lesson_id)
                 print_json(result)
 
+            elif args.stars_command == "flush":
+                summary = StarLedgerQueue(api).flush()
+                print_json(summary)
+                if summary['error']:
+                    sys.exit(1)
+
+            elif args.stars_command == "pending":
+                ledger = StarLedgerQueue(api)
+                print_json({"pending": ledger.pending, "count": len(ledger), "file": ledger.path})
+
             elif args.stars_command == "transactions":
-                result = api.get_star_transactions(args.limit, args.type, args.lesson_id)
-                print_json(result)
+                if args.all or args.format == "ndjson":
+                    stream_transactions(api, args)
+                else:
+                    result = api.get_star_transactions(args.limit, args.type, args.lesson_id)
+                    print_json(result)
 
             elif args.stars_command == "stats":
                 result = api.get_star_stats()
@@ -465,9 +2189,20 @@ def main():
         else:
             parser.print_help()
 
+    except BijbelQuizAPIError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if e.payload.get('message'):
+            print(f"Message: {e.payload['message']}", file=sys.stderr)
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        # Reading or writing the pending star ledger
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
     except KeyboardInterrupt:
         print("\nOperation cancelled", file=sys.stderr)
         sys.exit(1)
+    finally:
+        api.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+BijbelQuiz mock API server
+
+A stand-in for the app's local API that serves the /v1 endpoints from
+docs/API.md using the bundled question assets. Lets the CLI, scripts and load
+tests run without a phone. Star balance and transactions are kept in memory,
+and the app's rate limit of 100 requests per minute per IP is enforced unless
+disabled.
+
+Usage:
+    python mock_server.py --port 7777 --api-key bq_mock
+    python mock_server.py --lang en --rate-limit 0 --stars 500
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from question_bank import QuestionBank, with_options
+
+API_VERSION = 'v1'
+DEFAULT_API_KEY = 'bq_mock'
+RATE_LIMIT_PER_MINUTE = 100
+RATE_LIMIT_WINDOW = 60.0
+MAX_PAYLOAD_BYTES = 1024 * 1024
+MAX_TRANSACTIONS = 1000
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+class SlidingWindowRateLimiter:
+    """Per-client request log over a sliding window, as the app's middleware does."""
+
+    def __init__(self, limit: int = RATE_LIMIT_PER_MINUTE, window: float = RATE_LIMIT_WINDOW):
+        self.limit = limit
+        self.window = window
+        self._log = {}
+        self._lock = threading.Lock()
+
+    def allow(self, client: str) -> bool:
+        """Record a request from client; False when it is over the limit."""
+        now = time.monotonic()
+        with self._lock:
+            log = self._log.setdefault(client, deque())
+            while log and now - log[0] > self.window:
+                log.popleft()
+            if len(log) >= self.limit:
+                return False
+            log.append(now)
+            return True
+
+
+class StarLedger:
+    """In-memory star balance and transaction history, newest first."""
+
+    def __init__(self, balance: int = 0):
+        self.balance = balance
+        self.total_earned = 0
+        self.total_spent = 0
+        self.transactions = deque(maxlen=MAX_TRANSACTIONS)
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def _record(self, transaction_type: str, amount: int, reason: str, lesson_id: Optional[str],
+                metadata: Optional[dict]):
+        # Millisecond ids like the app, kept unique when several land in one millisecond
+        self._last_id = max(self._last_id + 1, int(time.time() * 1000))
+        self.transactions.appendleft({
+            'id': str(self._last_id),
+            'timestamp': _now(),
+            'type': transaction_type,
+            'amount': amount,
+            'reason': reason,
+            'lessonId': lesson_id,
+            'metadata': metadata,
+        })
+
+    def add(self, amount: int, reason: str, lesson_id: Optional[str] = None, metadata: Optional[dict] = None) -> int:
+        with self._lock:
+            self.balance += amount
+            self.total_earned += amount
+            self._record('earned', amount, reason, lesson_id, metadata)
+            return self.balance
+
+    def spend(self, amount: int, reason: str, lesson_id: Optional[str] = None,
+              metadata: Optional[dict] = None) -> Optional[int]:
+        """Spend stars; returns the new balance, or None when the balance is too low."""
+        with self._lock:
+            if self.balance < amount:
+                return None
+            self.balance -= amount
+            self.total_spent += amount
+            self._record('spent', -amount, reason, lesson_id, metadata)
+            return self.balance
+
+    def query(self, limit: int, type_filter: Optional[str] = None, lesson_id: Optional[str] = None,
+              before: Optional[int] = None) -> list:
+        with self._lock:
+            transactions = list(self.transactions)
+        if before is not None:
+            # Newest first with increasing ids, so skip the prefix at or after the cursor
+            start = next((i for i, t in enumerate(transactions) if int(t['id']) < before), len(transactions))
+            transactions = transactions[start:]
+        if type_filter:
+            transactions = [t for t in transactions if t['type'] == type_filter]
+        elif lesson_id:
+            transactions = [t for t in transactions if t['lessonId'] == lesson_id]
+        return transactions[:limit]
+
+    def stats(self) -> dict:
+        with self._lock:
+            transactions = list(self.transactions)
+            balance, earned, spent = self.balance, self.total_earned, self.total_spent
+        now = datetime.now()
+
+        def since(delta):
+            cutoff = (now - delta).isoformat()
+            return sum(1 for t in transactions if t['timestamp'] > cutoff)
+
+        return {
+            'totalTransactions': len(transactions),
+            'currentBalance': balance,
+            'totalEarned': earned,
+            'totalSpent': spent,
+            'netTotal': earned - spent,
+            'transactionsLast24h': since(timedelta(hours=24)),
+            'transactionsLast7d': since(timedelta(days=7)),
+            'transactionsLast30d': since(timedelta(days=30)),
+            'averageTransactionAmount': (sum(abs(t['amount']) for t in transactions) / len(transactions)
+                                         if transactions else 0),
+        }
+
+
+class MockState:
+    """Everything the mock API serves: questions, star ledger and fixed profile data."""
+
+    def __init__(self, bank: QuestionBank, stars: int = 0):
+        self.bank = bank
+        self.ledger = StarLedger(stars)
+        self.progress = {
+            'unlockedCount': 5,
+            'bestStarsByLesson': {'lesson_1': 3, 'lesson_2': 2, 'lesson_3': 3, 'lesson_4': 1, 'lesson_5': 2},
+        }
+        self.stats = {'score': 1250, 'currentStreak': 7, 'longestStreak': 15, 'incorrectAnswers': 23}
+        self.settings = {
+            'themeMode': 'dark',
+            'gameSpeed': 'medium',
+            'mute': False,
+            'analyticsEnabled': True,
+            'notificationEnabled': True,
+        }
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    """Routes /v1 requests to the mock endpoints."""
+
+    protocol_version = 'HTTP/1.1'
+    # Buffer the response so headers and body go out in one write; with unbuffered
+    # writes, keep-alive clients stall on delayed ACKs
+    wbufsize = -1
+    server_version = 'BijbelQuiz-API'
+
+    def version_string(self):
+        return self.server_version
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # Responses
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if self.server.gzip and len(payload) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            payload = gzip.compress(payload, compresslevel=5)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('X-Content-Type-Options', 'nosniff')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status: int, error: str, message: str, **extra):
+        self._send_json(status, {'error': error, 'message': message, 'timestamp': _now(), **extra})
+
+    def _ok(self, body: dict, started: float):
+        body['timestamp'] = _now()
+        body['processing_time_ms'] = int((time.perf_counter() - started) * 1000)
+        self._send_json(200, body)
+
+    # Request handling
+
+    def _authorized(self) -> bool:
+        auth = self.headers.get('Authorization', '')
+        key = auth[7:] if auth.startswith('Bearer ') else self.headers.get('X-API-Key')
+        return key == self.server.api_key
+
+    def _dispatch(self, method: str):
+        started = time.perf_counter()
+        parts = urlsplit(self.path)
+        path = unquote(parts.path).rstrip('/')
+        query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        prefix = f"/{API_VERSION}/"
+        route = path[len(prefix):] if path.startswith(prefix) else None
+
+        body = None
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_PAYLOAD_BYTES:
+            self.close_connection = True
+            return self._error(413, 'Payload too large', 'Request body must be at most 1MB')
+        if length:
+            body = self.rfile.read(length)
+
+        # Rate limiting runs before authentication, as in the app's middleware pipeline
+        if route != 'health':
+            if self.server.rate_limiter is not None:
+                if not self.server.rate_limiter.allow(self.client_address[0]):
+                    return self._send_json(429, {
+                        'error': 'Rate limit exceeded',
+                        'message': f'Too many requests. Maximum {self.server.rate_limiter.limit} requests per minute allowed.',
+                        'retry_after': int(RATE_LIMIT_WINDOW),
+                        'timestamp': _now(),
+                    }, {'Retry-After': str(int(RATE_LIMIT_WINDOW)), 'X-RateLimit-Limit': str(self.server.rate_limiter.limit),
+                        'X-RateLimit-Remaining': '0'})
+            if not self._authorized():
+                return self._error(403, 'Invalid or missing API key',
+                                   'Please provide a valid API key via Authorization header (Bearer token) '
+                                   'or X-API-Key header')
+
+        handler = None
+        args = ()
+        if route is not None:
+            handler = ROUTES.get((method, route))
+            if handler is None and method == 'GET' and route.startswith('questions/'):
+                handler, args = MockAPIHandler.get_questions_by_category, (route[len('questions/'):],)
+        if handler is None:
+            return self._error(404, 'Not found', f'No endpoint for {method} {parts.path}')
+
+        try:
+            if method == 'POST':
+                try:
+                    payload = json.loads(body or b'{}')
+                except ValueError:
+                    return self._error(400, 'Invalid JSON', 'Request body must be a JSON object')
+                if not isinstance(payload, dict):
+                    return self._error(400, 'Invalid JSON', 'Request body must be a JSON object')
+                handler(self, payload, started)
+            else:
+                handler(self, query, started, *args)
+        except Exception as e:
+            self._error(500, 'Internal server error', str(e))
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    # Endpoints
+
+    def health(self, query: dict, started: float):
+        self._send_json(200, {'status': 'healthy', 'timestamp': _now(), 'service': 'BijbelQuiz API',
+                              'version': API_VERSION, 'uptime': 'running'})
+
+    def _questions(self, query: dict, started: float, category: Optional[str]):
+        try:
+            limit = int(query.get('limit', '10'))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= 50:
+            return self._error(400, 'Invalid limit parameter', 'Limit must be a number between 1 and 50',
+                               valid_range='1-50')
+        difficulty = query.get('difficulty') or None
+        if difficulty is not None and difficulty not in ('1', '2', '3', '4', '5'):
+            return self._error(400, 'Invalid difficulty parameter', 'Difficulty must be a number between 1 and 5',
+                               valid_values=['1', '2', '3', '4', '5'])
+
+        questions = self.server.state.bank.first(category, int(difficulty) if difficulty else None, limit)
+        self._ok({
+            'questions': [with_options(question) for question in questions],
+            'count': len(questions),
+            'category': category,
+            'difficulty': difficulty,
+        }, started)
+
+    def get_questions(self, query: dict, started: float):
+        self._questions(query, started, query.get('category') or None)
+
+    def get_questions_by_category(self, query: dict, started: float, category: str):
+        self._questions(query, started, category)
+
+    def get_progress(self, query: dict, started: float):
+        self._ok(dict(self.server.state.progress), started)
+
+    def get_stats(self, query: dict, started: float):
+        self._ok(dict(self.server.state.stats), started)
+
+    def get_settings(self, query: dict, started: float):
+        self._ok(dict(self.server.state.settings), started)
+
+    def get_star_balance(self, query: dict, started: float):
+        self._ok({'balance': self.server.state.ledger.balance}, started)
+
+    def _validate_star_payload(self, payload: dict) -> bool:
+        amount = payload.get('amount')
+        if not isinstance(amount, int) or isinstance(amount, bool) or amount <= 0:
+            self._error(400, 'Invalid amount', 'Amount must be a positive integer')
+            return False
+        if not isinstance(payload.get('reason'), str) or not payload['reason']:
+            self._error(400, 'Invalid reason', 'Reason is required and cannot be empty')
+            return False
+        return True
+
+    def _transaction_metadata(self, payload: dict) -> Optional[dict]:
+        """Client metadata for a star transaction, plus its Idempotency-Key header, like the app."""
+        metadata = dict(payload['metadata']) if isinstance(payload.get('metadata'), dict) else {}
+        if self.headers.get('Idempotency-Key'):
+            metadata['idempotencyKey'] = self.headers['Idempotency-Key']
+        return metadata or None
+
+    def add_stars(self, payload: dict, started: float):
+        if not self._validate_star_payload(payload):
+            return
+        balance = self.server.state.ledger.add(payload['amount'], payload['reason'], payload.get('lessonId'),
+                                               self._transaction_metadata(payload))
+        self._ok({'success': True, 'balance': balance, 'amount_added': payload['amount'],
+                  'reason': payload['reason']}, started)
+
+    def spend_stars(self, payload: dict, started: float):
+        if not self._validate_star_payload(payload):
+            return
+        ledger = self.server.state.ledger
+        balance = ledger.spend(payload['amount'], payload['reason'], payload.get('lessonId'),
+                               self._transaction_metadata(payload))
+        if balance is None:
+            return self._error(400, 'Insufficient stars', 'Not enough stars in balance for this transaction',
+                               current_balance=ledger.balance, requested_amount=payload['amount'])
+        self._ok({'success': True, 'balance': balance, 'amount_spent': payload['amount'],
+                  'reason': payload['reason']}, started)
+
+    def get_star_transactions(self, query: dict, started: float):
+        try:
+            limit = int(query.get('limit', '50'))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_TRANSACTIONS:
+            return self._error(400, 'Invalid limit parameter', 'Limit must be a number between 1 and 1000',
+                               valid_range='1-1000')
+        type_filter = query.get('type') or None
+        lesson_id = query.get('lessonId') or None
+        # Cursor for paging through the ledger (an extension; the app ignores it)
+        before = query.get('before')
+        if before is not None and not before.isdigit():
+            return self._error(400, 'Invalid before parameter', 'before must be a transaction id')
+        transactions = self.server.state.ledger.query(limit, type_filter, lesson_id,
+                                                      int(before) if before is not None else None)
+        self._ok({'transactions': transactions, 'count': len(transactions),
+                  'type_filter': type_filter, 'lesson_filter': lesson_id}, started)
+
+    def get_star_stats(self, query: dict, started: float):
+        self._ok({'stats': self.server.state.ledger.stats()}, started)
+
+
+ROUTES = {
+    ('GET', 'health'): MockAPIHandler.health,
+    ('GET', 'questions'): MockAPIHandler.get_questions,
+    ('GET', 'progress'): MockAPIHandler.get_progress,
+    ('GET', 'stats'): MockAPIHandler.get_stats,
+    ('GET', 'settings'): MockAPIHandler.get_settings,
+    ('GET', 'stars/balance'): MockAPIHandler.get_star_balance,
+    ('POST', 'stars/add'): MockAPIHandler.add_stars,
+    ('POST', 'stars/spend'): MockAPIHandler.spend_stars,
+    ('GET', 'stars/transactions'): MockAPIHandler.get_star_transactions,
+    ('GET', 'stars/stats'): MockAPIHandler.get_star_stats,
+}
+
+
+class MockAPIServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the mock state, API key and rate limiter."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: tuple, state: MockState, api_key: str = DEFAULT_API_KEY,
+                 rate_limit: int = RATE_LIMIT_PER_MINUTE, use_gzip: bool = False, verbose: bool = False):
+        super().__init__(address, MockAPIHandler)
+        self.state = state
+        self.api_key = api_key
+        self.rate_limiter = SlidingWindowRateLimiter(rate_limit) if rate_limit > 0 else None
+        self.gzip = use_gzip
+        self.verbose = verbose
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock BijbelQuiz local API serving the bundled questions")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=7777, help="Port to listen on (default: 7777)")
+    parser.add_argument("--api-key", default=DEFAULT_API_KEY, help=f"API key clients must send (default: {DEFAULT_API_KEY})")
+    parser.add_argument("--lang", choices=["nl", "en"], default="nl", help="Question set to serve (default: nl)")
+    parser.add_argument("--questions-file", help="Serve questions from this file instead of the bundled assets")
+    parser.add_argument("--stars", type=int, default=0, help="Starting star balance (default: 0)")
+    parser.add_argument("--rate-limit", type=int, default=RATE_LIMIT_PER_MINUTE,
+                        help=f"Requests per minute per IP, 0 to disable (default: {RATE_LIMIT_PER_MINUTE})")
+    parser.add_argument("--gzip", action="store_true", help="Gzip responses over 1KB for clients that accept it")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    args = parser.parse_args()
+
+    try:
+        bank = QuestionBank.load(args.lang, args.questions_file)
+    except (OSError, ValueError) as e:
+        print(f"Error: could not load questions: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        server = MockAPIServer((args.host, args.port), MockState(bank, args.stars), args.api_key,
+                               args.rate_limit, args.gzip, args.verbose)
+    except OSError as e:
+        print(f"Error: could not listen on {args.host}:{args.port}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    limit = f"{args.rate_limit} requests/minute" if args.rate_limit > 0 else "no rate limit"
+    print(f"Mock BijbelQuiz API on http://{args.host}:{args.port}/{API_VERSION} "
+          f"({len(bank)} {args.lang} questions, {len(bank.by_category)} categories, {limit}, API key {args.api_key})",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped", file=sys.stderr)
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+BijbelQuiz question bank from the app's bundled question assets.
+
+Loads app/assets/questions-nl-sv.json (Dutch field names) or questions-en.json
+(English field names), normalises both into the question shape returned by the
+local API and indexes the questions by category and difficulty.
+"""
+
+import json
+import os
+import random
+from typing import Optional
+
+ASSETS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app', 'assets'))
+QUESTION_FILES = {
+    'nl': 'questions-nl-sv.json',
+    'en': 'questions-en.json',
+}
+# Dutch asset field names and their API equivalents
+FIELD_ALIASES = {
+    'vraag': 'question',
+    'juisteAntwoord': 'correctAnswer',
+    'fouteAntwoorden': 'incorrectAnswers',
+    'moeilijkheidsgraad': 'difficulty',
+}
+QUESTION_TYPES = ('mc', 'fitb', 'tf')
+# Opposites for true/false questions stored without incorrect answers (as the app does)
+TRUE_FALSE_OPPOSITES = {
+    'waar': 'Niet waar',
+    'niet waar': 'Waar',
+    'true': 'False',
+    'false': 'True',
+}
+
+
+def normalize_question(record: dict) -> Optional[dict]:
+    """Convert an asset record (Dutch or English field names) to the API question shape.
+
+    Returns None for records the app would reject (no question text, correct
+    answer or incorrect answers).
+    """
+    record = {FIELD_ALIASES.get(key, key): value for key, value in record.items()}
+    question = str(record.get('question') or '').strip()
+    correct = str(record.get('correctAnswer') or '').strip()
+    question_type = record.get('type') if record.get('type') in QUESTION_TYPES else 'mc'
+
+    incorrect = [str(answer) for answer in record.get('incorrectAnswers') or [] if str(answer)]
+    if not incorrect and question_type == 'tf':
+        incorrect = [TRUE_FALSE_OPPOSITES.get(correct.lower(), 'Niet waar')]
+    if not question or not correct or not incorrect:
+        return None
+
+    try:
+        difficulty = int(record.get('difficulty') or 1)
+    except (TypeError, ValueError):
+        difficulty = 1
+    return {
+        'id': str(record.get('id') or ''),
+        'question': question,
+        'correctAnswer': correct,
+        'incorrectAnswers': incorrect,
+        'difficulty': difficulty,
+        'type': question_type,
+        'categories': [str(category) for category in record.get('categories') or []],
+        'biblicalReference': record.get('biblicalReference'),
+    }
+
+
+def with_options(question: dict, rng: Optional[random.Random] = None) -> dict:
+    """The question with shuffled allOptions and correctAnswerIndex, like the API returns it."""
+    options = question['incorrectAnswers'] + [question['correctAnswer']]
+    (rng or random).shuffle(options)
+    return {**question, 'allOptions': options, 'correctAnswerIndex': options.index(question['correctAnswer'])}
+
+
+class QuestionBank:
+    """Normalised questions with indexes by category, difficulty and both.
+
+    select() returns the positions of the matching questions from a prebuilt
+    index, so filtering costs a dictionary lookup instead of a scan.
+    """
+
+    def __init__(self, questions: list, language: Optional[str] = None):
+        self.questions = questions
+        self.language = language
+        self.by_category = {}
+        self.by_difficulty = {}
+        self.by_category_difficulty = {}
+        for position, question in enumerate(questions):
+            difficulty = question['difficulty']
+            self.by_difficulty.setdefault(difficulty, []).append(position)
+            for category in dict.fromkeys(question['categories']):
+                self.by_category.setdefault(category, []).append(position)
+                self.by_category_difficulty.setdefault((category, difficulty), []).append(position)
+        self.all_positions = list(range(len(questions)))
+
+    @classmethod
+    def load(cls, language: str = 'nl', path: Optional[str] = None) -> 'QuestionBank':
+        """Load the bundled questions for a language, or a question file at path."""
+        if path is None:
+            if language not in QUESTION_FILES:
+                raise ValueError(f"Unknown language: {language} (choose from {', '.join(QUESTION_FILES)})")
+            path = os.path.join(ASSETS_DIR, QUESTION_FILES[language])
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        questions = [question for question in map(normalize_question, records) if question is not None]
+        return cls(questions, language)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    @property
+    def categories(self) -> list:
+        """Categories sorted by number of questions, largest first."""
+        return sorted(self.by_category, key=lambda category: (-len(self.by_category[category]), category))
+
+    def select(self, category: Optional[str] = None, difficulty: Optional[int] = None) -> list:
+        """Positions of the questions matching the filters, in asset order (do not modify)."""
+        if category and difficulty:
+            return self.by_category_difficulty.get((category, difficulty), [])
+        if category:
+            return self.by_category.get(category, [])
+        if difficulty:
+            return self.by_difficulty.get(difficulty, [])
+        return self.all_positions
+
+    def first(self, category: Optional[str] = None, difficulty: Optional[int] = None, limit: int = 10) -> list:
+        """The first limit matching questions, in asset order."""
+        return [self.questions[position] for position in self.select(category, difficulty)[:limit]]
@@ -0,0 +1,192 @@
+import socket
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from bijbelquiz_cli import BijbelQuizAPI, APIConnectionError, HTTPTransport, RECONCILE_WINDOW, StarLedgerQueue
+
+
+def read_method(connection):
+    """Read one HTTP request from a socket; returns its method, or None once the client hung up"""
+    data = b''
+    while b'\r\n\r\n' not in data:
+        chunk = connection.recv(65536)
+        if not chunk:
+            return None
+        data += chunk
+    head, body = data.split(b'\r\n\r\n', 1)
+    length = next((int(line.split(b':', 1)[1]) for line in head.split(b'\r\n')
+                   if line.lower().startswith(b'content-length:')), 0)
+    while len(body) < length:
+        body += connection.recv(65536)
+    return head.split(b' ', 1)[0].decode()
+
+
+@pytest.fixture
+def dropping_server():
+    """Answers the first request on each connection with keep-alive, then drops the connection"""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+    requests = []
+
+    def serve():
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                return
+            with connection:
+                requests.append(read_method(connection))
+                connection.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                                   b"Content-Length: 2\r\nConnection: keep-alive\r\n\r\n{}")
+                method = read_method(connection)
+                if method:
+                    requests.append(method)
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield f"http://127.0.0.1:{server.getsockname()[1]}", requests
+    server.close()
+
+
+def test_get_is_resent_after_a_reused_connection_drops(dropping_server):
+    url, requests = dropping_server
+    transport = HTTPTransport(timeout=5)
+    assert transport.request('GET', url + '/a')[0] == 200
+    assert transport.request('GET', url + '/b')[0] == 200
+    assert requests == ['GET', 'GET', 'GET']
+
+
+@pytest.mark.parametrize('headers', [{}, {'Idempotency-Key': 'abc'}])
+def test_post_is_not_resent_after_a_reused_connection_drops(dropping_server, headers):
+    url, requests = dropping_server
+    transport = HTTPTransport(timeout=5)
+    transport.request('POST', url + '/a', b'{}', headers)
+    with pytest.raises(ConnectionError):
+        transport.request('POST', url + '/b', b'{}', headers)
+    assert requests == ['POST', 'POST']
+
+
+def test_client_reports_a_dropped_post_as_sent_connection_error(dropping_server):
+    url, _ = dropping_server
+    api = BijbelQuizAPI(url, 'key')
+    api.add_stars(1, 'first')
+    with pytest.raises(APIConnectionError) as error:
+        api.add_stars(1, 'second', idempotency_key='abc')
+    assert error.value.request_sent
+
+
+class FakeLedgerAPI:
+    """Records star calls and serves a transaction history, newest first"""
+
+    base_url = 'http://ledger.test/v1'
+
+    def __init__(self, transactions=(), fail_with=None):
+        self.transactions = list(transactions)
+        self.fail_with = fail_with
+        self.calls = []
+        self.on_send = None
+
+    def iter_star_transactions(self):
+        return iter(self.transactions)
+
+    def _send(self, op, amount, reason, lesson_id=None, idempotency_key=None):
+        if self.on_send:
+            self.on_send()
+        self.calls.append((op, amount, reason, lesson_id, idempotency_key))
+        if self.fail_with:
+            raise self.fail_with
+        return {'success': True, 'balance': 100}
+
+    def add_stars(self, *args, **kwargs):
+        return self._send('add', *args, **kwargs)
+
+    def spend_stars(self, *args, **kwargs):
+        return self._send('spend', *args, **kwargs)
+
+
+def transaction(type_, amount, reason, key=None, lesson_id=None, at=None):
+    return {'id': '1', 'timestamp': datetime.fromtimestamp(at or time.time()).isoformat(), 'type': type_,
+            'amount': amount, 'reason': reason, 'lessonId': lesson_id,
+            'metadata': {'idempotencyKey': key} if key else None}
+
+
+def sent_queue(tmp_path, api, *operations):
+    """A queue whose operations were marked sent by a flush that never heard back"""
+    queue = StarLedgerQueue(api, str(tmp_path / 'pending.json'))
+    for operation, amount, reason in operations:
+        getattr(queue, operation)(amount, reason)
+    for op in queue.pending:
+        op['sent'] = True
+        op['sentAt'] = time.time()
+    return queue
+
+
+def test_flush_marks_an_operation_sent_on_disk_before_posting(tmp_path):
+    api = FakeLedgerAPI()
+    queue = StarLedgerQueue(api, str(tmp_path / 'pending.json'))
+    key = queue.add(5, 'Lesson done', 'lesson_1')
+    queue.spend(2, 'Hint')
+
+    seen = []
+    api.on_send = lambda: seen.append([op['sent'] for op in StarLedgerQueue(api, queue.path).pending])
+    summary = queue.flush()
+
+    assert seen == [[True, False], [True]]
+    assert api.calls == [('add', 5, 'Lesson done', 'lesson_1', key), ('spend', 2, 'Hint', None, api.calls[1][4])]
+    assert summary['applied'] == 2 and summary['pending'] == 0
+    assert len(StarLedgerQueue(api, queue.path)) == 0
+
+
+def test_unknown_outcome_keeps_the_operation_sent_and_stops_flushing(tmp_path):
+    api = FakeLedgerAPI(fail_with=APIConnectionError('timed out'))
+    queue = StarLedgerQueue(api, str(tmp_path / 'pending.json'))
+    queue.add(5, 'Lesson done')
+    queue.add(1, 'Other')
+
+    summary = queue.flush()
+
+    assert len(api.calls) == 1
+    assert summary['error'] == 'timed out' and summary['pending'] == 2
+    assert [op['sent'] for op in StarLedgerQueue(api, queue.path).pending] == [True, False]
+
+
+def test_reconcile_drops_operations_recorded_under_their_key(tmp_path):
+    api = FakeLedgerAPI()
+    queue = sent_queue(tmp_path, api, ('add', 5, 'Lesson done'), ('spend', 2, 'Hint'))
+    recorded, lost = queue.pending
+    api.transactions = [transaction('earned', 5, 'Lesson done', key=recorded['key'])]
+
+    summary = queue.flush()
+
+    assert summary['reconciled'] == 1
+    assert api.calls == [('spend', 2, 'Hint', None, lost['key'])]
+
+
+def test_reconcile_matches_entries_without_keys_by_content_and_time(tmp_path):
+    # Servers that do not store the key: same type, amount, reason and lesson id around the send
+    api = FakeLedgerAPI()
+    queue = sent_queue(tmp_path, api, ('add', 5, 'Lesson done'), ('add', 3, 'Bonus'), ('spend', 4, 'Hint'))
+    api.transactions = [
+        transaction('earned', 5, 'Lesson done'),
+        transaction('earned', 4, 'Hint'),
+        transaction('earned', 3, 'Bonus', at=time.time() - 2 * RECONCILE_WINDOW),
+    ]
+
+    summary = queue.flush()
+
+    assert summary['reconciled'] == 1
+    assert [call[:3] for call in api.calls] == [('add', 3, 'Bonus'), ('spend', 4, 'Hint')]
+
+
+def test_one_ledger_entry_reconciles_one_operation(tmp_path):
+    api = FakeLedgerAPI()
+    queue = sent_queue(tmp_path, api, ('spend', 2, 'Hint'), ('spend', 2, 'Hint'))
+    api.transactions = [transaction('spent', -2, 'Hint')]
+
+    summary = queue.flush()
+
+    assert summary['reconciled'] == 1
+    assert [call[:3] for call in api.calls] == [('spend', 2, 'Hint')]
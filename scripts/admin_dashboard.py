@@ -3,23 +3,53 @@ Modern Admin Dashboard for BijbelQuiz
 Combines tracking data analysis and error reporting in a single modern interface
 """
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, scrolledtext, messagebox, filedialog
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 import json
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import matplotlib.dates as mdates
 from supabase import create_client, Client
 import os
 from dotenv import load_dotenv
 from dateutil import parser
 import re
+import threading
 from typing import List, Dict, Any, Optional
 
+from tracking_analytics import (SessionIndex, RetentionCohorts, UserSketches, filter_events,
+                                precision_for_error, daily_event_counts, TrackingAggregates,
+                                iter_supabase_pages, iter_page_frames, DEFAULT_RECENT_ROWS, aggregate_parallel, session_summary_parallel,
+                                default_workers, UserIndex, user_timeline, top_rows, ErrorSpikeDetector,
+                                ReleaseHealth, load_question_bank, fetch_question_bank, question_problems,
+                                question_problem_heatmap, QUESTION_BANK_PATH)
+from feature_charts import draw_feature_figure, draw_time_series, FEATURE_FIGURE_SIZE
+from export_tracking_data import export_chunks, frame_chunks, supabase_chunks, ExportProgress, EXPORT_FORMATS
+
 
 class ModernAdminDashboard:
+    FEATURE_HEADINGS = {
+        'Feature': 'Feature',
+        'UsageCount': 'Total Usage',
+        'UniqueUsers': 'Unique Users',
+        'LastUsed': 'Last Used',
+    }
+    FEATURES_PAGE_SIZE = 50
+    QUESTION_PROBLEM_COLUMNS = {
+        'question_id': 'ID',
+        'question': 'Question',
+        'category': 'Category',
+        'difficulty': 'Difficulty',
+        'reports': 'Reports',
+        'reporters': 'Users',
+        'report_share': '% of Reports',
+        'last_reported': 'Last Reported',
+    }
+    
     def __init__(self, root):
         self.root = root
         
@@ -34,8 +64,43 @@ class ModernAdminDashboard:
         
         # Data
         self.df = None
+        self.session_index = None
+        self.user_index = None
+        self.error_df = None
+        self.error_user_index = None
+        self.user_sketches = None
+        self.daily_counts = None
+        self.time_series_state = None
+        self.feature_stats = None
+        self.features_sort = ('UsageCount', True)
+        self.features_limit = self.FEATURES_PAGE_SIZE
+        self.hll_precision = precision_for_error(float(os.getenv('HLL_RELATIVE_ERROR', '0.01')))
+        
+        # Out-of-core mode: above this many events the history is folded chunk by chunk
+        # and only the newest TRACKING_RECENT_ROWS events are kept as raw rows
+        self.aggregates = None
+        self.max_in_memory_rows = int(os.getenv('TRACKING_MAX_IN_MEMORY_ROWS', '1000000'))
+        self.chunk_rows = int(os.getenv('TRACKING_CHUNK_ROWS', '100000'))
+        self.recent_rows = int(os.getenv('TRACKING_RECENT_ROWS', str(DEFAULT_RECENT_ROWS)))
+        
+        # Loads of at least PARALLEL_MIN_ROWS events are aggregated across a process pool
+        self.analytics_workers = default_workers()
+        self.parallel_min_rows = int(os.getenv('PARALLEL_MIN_ROWS', '200000'))
         self.current_error_id = None
         
+        # Error spike detection, baselines updated from new error reports only
+        self.error_spike_detector = None
+        self.error_spike_job = None
+        self.error_spike_interval_ms = int(os.getenv('ERROR_SPIKE_INTERVAL_SECONDS', '60')) * 1000
+        # Release health is polled off the Tk thread; the first poll reads only the warmup days
+        self.release_health = None
+        self.release_health_busy = False
+        self.release_health_warmup = timedelta(days=int(os.getenv('RELEASE_HEALTH_WARMUP_DAYS', '7')))
+        self.question_bank = None
+        self.question_problems_df = None
+        self.question_problems_sort = ('reports', True)
+        self.question_problems_figure = None
+        
         self.setup_ui()
     
     def initialize_supabase(self):
@@ -95,7 +160,12 @@ class ModernAdminDashboard:
         
         # Add tabs
         self.setup_tracking_tab()
+        self.setup_sessions_tab()
+        self.setup_user_timeline_tab()
+        self.setup_retention_tab()
         self.setup_errors_tab()
+        self.setup_release_health_tab()
+        self.setup_question_problems_tab()
         self.setup_store_tab()
         self.setup_messages_tab()
         
@@ -148,6 +218,9 @@ class ModernAdminDashboard:
         tb.Button(controls_frame, text="Apply Filters", 
                  command=self.apply_tracking_filters, bootstyle=INFO).pack(side=tk.LEFT, padx=(20, 5))
         
+        tb.Button(controls_frame, text="Export Data", 
+                 command=self.export_tracking_data, bootstyle=SECONDARY).pack(side=tk.LEFT, padx=5)
+        
         # Split tracking frame into two main sections
         data_frame = tb.Frame(tracking_frame)
         data_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -168,11 +241,9 @@ class ModernAdminDashboard:
                                         columns=("Feature", "UsageCount", "UniqueUsers", "LastUsed"), 
                                         show="headings", height=15, bootstyle="primary")
         
-        # Configure columns
-        self.features_tree.heading("Feature", text="Feature")
-        self.features_tree.heading("UsageCount", text="Total Usage")
-        self.features_tree.heading("UniqueUsers", text="Unique Users")
-        self.features_tree.heading("LastUsed", text="Last Used")
+        # Configure columns (click a heading to sort by it)
+        for column, text in self.FEATURE_HEADINGS.items():
+            self.features_tree.heading(column, text=text, command=lambda c=column: self.sort_features_overview(c))
         
         # Set column widths
         self.features_tree.column("Feature", width=200, minwidth=150)
@@ -196,6 +267,15 @@ class ModernAdminDashboard:
         # Bind selection event for features
         self.features_tree.bind("<<TreeviewSelect>>", self.on_feature_select)
         
+        # Top-K footer
+        features_footer = tb.Frame(features_frame)
+        features_footer.pack(fill=tk.X, pady=(5, 0))
+        
+        self.features_count_var = tk.StringVar()
+        tb.Label(features_footer, textvariable=self.features_count_var).pack(side=tk.LEFT, padx=5)
+        tb.Button(features_footer, text="Show More", 
+                 command=self.show_more_features, bootstyle=SECONDARY).pack(side=tk.RIGHT, padx=5)
+        
         # Create the old treeview (for backward compatibility with some methods)
         # This will be hidden but still available for methods that reference it
         old_tree_frame = tb.Frame(features_frame)
@@ -259,6 +339,383 @@ class ModernAdminDashboard:
         
         self.viz_canvas.bind("<MouseWheel>", _on_mousewheel)
     
+    def setup_sessions_tab(self):
+        """Setup the sessions and funnel analysis tab"""
+        sessions_frame = tb.Frame(self.notebook)
+        self.notebook.add(sessions_frame, text="Sessions & Funnels")
+        
+        # Controls frame
+        controls_frame = tb.Labelframe(sessions_frame, text="Session Controls", padding=10)
+        controls_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        tb.Button(controls_frame, text="Analyze Sessions", 
+                 command=self.analyze_sessions, bootstyle=SUCCESS).pack(side=tk.LEFT, padx=5)
+        
+        tb.Label(controls_frame, text="Funnel Steps:").pack(side=tk.LEFT, padx=(20, 5))
+        self.funnel_steps_var = tk.StringVar()
+        tb.Entry(controls_frame, textvariable=self.funnel_steps_var, width=60, bootstyle="secondary").pack(side=tk.LEFT, padx=5)
+        tb.Label(controls_frame, text="(event or screen names, separated by ,)", font=("TkDefaultFont", 8)).pack(side=tk.LEFT, padx=5)
+        
+        tb.Button(controls_frame, text="Compute Funnel", 
+                 command=self.compute_funnel, bootstyle=INFO).pack(side=tk.LEFT, padx=(20, 5))
+        
+        # Split into session summary (left) and funnel (right)
+        sessions_data_frame = tb.Frame(sessions_frame)
+        sessions_data_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        summary_frame = tb.Labelframe(sessions_data_frame, text="Session Summary", padding=10)
+        summary_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        
+        self.sessions_text = scrolledtext.ScrolledText(summary_frame, wrap=tk.WORD)
+        self.sessions_text.pack(fill=tk.BOTH, expand=True)
+        
+        funnel_frame = tb.Labelframe(sessions_data_frame, text="Funnel", padding=10)
+        funnel_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        
+        self.funnel_tree = tb.Treeview(funnel_frame,
+                                      columns=("Step", "Sessions", "FromStart", "FromPrevious", "MedianTime"),
+                                      show="headings", height=10, bootstyle="primary")
+        
+        self.funnel_tree.heading("Step", text="Step")
+        self.funnel_tree.heading("Sessions", text="Sessions")
+        self.funnel_tree.heading("FromStart", text="% of Start")
+        self.funnel_tree.heading("FromPrevious", text="% of Previous")
+        self.funnel_tree.heading("MedianTime", text="Median Time From Previous")
+        
+        self.funnel_tree.column("Step", width=200, minwidth=150)
+        self.funnel_tree.column("Sessions", width=100, minwidth=80)
+        self.funnel_tree.column("FromStart", width=100, minwidth=80)
+        self.funnel_tree.column("FromPrevious", width=100, minwidth=80)
+        self.funnel_tree.column("MedianTime", width=180, minwidth=120)
+        
+        self.funnel_tree.pack(fill=tk.BOTH, expand=True)
+    
+    def setup_user_timeline_tab(self):
+        """Setup the per-user timeline drilldown tab"""
+        self.timeline_frame = tb.Frame(self.notebook)
+        self.notebook.add(self.timeline_frame, text="User Timeline")
+        
+        # Controls frame
+        controls_frame = tb.Labelframe(self.timeline_frame, text="User Lookup", padding=10)
+        controls_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        tb.Label(controls_frame, text="User ID:").pack(side=tk.LEFT, padx=(0, 5))
+        self.timeline_user_var = tk.StringVar()
+        self.timeline_user_combo = tb.Combobox(controls_frame, textvariable=self.timeline_user_var,
+                                               width=40, bootstyle="secondary")
+        self.timeline_user_combo.pack(side=tk.LEFT, padx=5)
+        self.timeline_user_combo.bind('<KeyRelease>', self.update_timeline_user_suggestions)
+        self.timeline_user_combo.bind('<Return>', lambda e: self.show_user_timeline())
+        self.timeline_user_combo.bind('<<ComboboxSelected>>', lambda e: self.show_user_timeline())
+        
+        tb.Button(controls_frame, text="Show Timeline", 
+                 command=self.show_user_timeline, bootstyle=SUCCESS).pack(side=tk.LEFT, padx=5)
+        tb.Button(controls_frame, text="Reload Error Reports", 
+                 command=self.load_error_frame, bootstyle=SECONDARY).pack(side=tk.LEFT, padx=5)
+        
+        self.timeline_summary_var = tk.StringVar()
+        tb.Label(controls_frame, textvariable=self.timeline_summary_var).pack(side=tk.LEFT, padx=(20, 5))
+        
+        # Timeline treeview
+        timeline_tree_frame = tb.Frame(self.timeline_frame)
+        timeline_tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.timeline_tree = tb.Treeview(timeline_tree_frame,
+                                        columns=("Timestamp", "Source", "Type", "Name", "Details"),
+                                        show="headings", height=20, bootstyle="primary")
+        
+        self.timeline_tree.heading("Timestamp", text="Timestamp")
+        self.timeline_tree.heading("Source", text="Source")
+        self.timeline_tree.heading("Type", text="Type")
+        self.timeline_tree.heading("Name", text="Event / Question")
+        self.timeline_tree.heading("Details", text="Details")
+        
+        self.timeline_tree.column("Timestamp", width=160, minwidth=140)
+        self.timeline_tree.column("Source", width=70, minwidth=60)
+        self.timeline_tree.column("Type", width=160, minwidth=100)
+        self.timeline_tree.column("Name", width=180, minwidth=100)
+        self.timeline_tree.column("Details", width=500, minwidth=200)
+        self.timeline_tree.tag_configure('error', foreground='red')
+        
+        timeline_scrollbar = tb.Scrollbar(timeline_tree_frame, orient=tk.VERTICAL, 
+                                         command=self.timeline_tree.yview, bootstyle="round")
+        self.timeline_tree.configure(yscrollcommand=timeline_scrollbar.set)
+        
+        self.timeline_tree.grid(row=0, column=0, sticky="nsew")
+        timeline_scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        timeline_tree_frame.grid_rowconfigure(0, weight=1)
+        timeline_tree_frame.grid_columnconfigure(0, weight=1)
+    
+    def load_error_frame(self):
+        """Load all error reports into memory and index them by user"""
+        if not self.supabase_client:
+            messagebox.showerror("Error", "Not connected to Supabase. Please check your credentials.")
+            return False
+        
+        try:
+            rows = []
+            for page in iter_supabase_pages(self.supabase_client, 'error_reports'):
+                rows.extend(page)
+                self.status_var.set(f"Loading error reports... {len(rows)}")
+                self.root.update_idletasks()
+            
+            self.error_df = pd.DataFrame(rows)
+            if not self.error_df.empty:
+                self.error_df['timestamp'] = pd.to_datetime(self.error_df['timestamp'])
+                self.error_user_index = UserIndex(self.error_df)
+            else:
+                self.error_user_index = None
+            
+            self.status_var.set(f"Indexed {len(self.error_df)} error reports by user")
+            return True
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load error reports: {str(e)}")
+            return False
+    
+    def update_timeline_user_suggestions(self, event=None):
+        """Offer user IDs starting with the typed prefix"""
+        prefix = self.timeline_user_var.get().strip()
+        if len(prefix) < 2:
+            return
+        suggestions = set()
+        for index in (self.user_index, self.error_user_index):
+            if index is not None:
+                suggestions.update(index.matching(prefix))
+        self.timeline_user_combo['values'] = sorted(suggestions)[:20]
+    
+    def show_user_timeline(self, user_id=None):
+        """Show one user's tracking events and error reports in chronological order"""
+        user_id = (user_id or self.timeline_user_var.get()).strip()
+        if not user_id:
+            messagebox.showwarning("Warning", "Please enter a user ID")
+            return
+        
+        # Error reports are loaded and indexed on the first lookup only
+        if self.error_df is None and not self.load_error_frame():
+            return
+        
+        timeline = user_timeline(user_id, self.df, self.user_index, self.error_df, self.error_user_index)
+        
+        for item in self.timeline_tree.get_children():
+            self.timeline_tree.delete(item)
+        
+        for row in timeline.itertuples(index=False):
+            details = str(row.details) if row.details is not None and not pd.isna(row.details) else ''
+            if len(details) > 200:
+                details = details[:200] + "..."
+            self.timeline_tree.insert('', 'end', values=(
+                row.timestamp.strftime('%Y-%m-%d %H:%M:%S') if pd.notna(row.timestamp) else 'N/A',
+                row.source,
+                row.type,
+                row.name if row.name is not None and not pd.isna(row.name) else '',
+                details
+            ), tags=('error',) if row.source == 'error' else ())
+        
+        n_errors = int((timeline['source'] == 'error').sum())
+        self.timeline_summary_var.set(f"{len(timeline) - n_errors} events, {n_errors} error reports")
+        self.status_var.set(f"Timeline for user {user_id}: {len(timeline)} entries")
+    
+    def open_error_user_timeline(self, event=None):
+        """Open the timeline of the user of the selected error report"""
+        selection = self.error_tree.selection()
+        if not selection:
+            return
+        user_id = str(self.error_tree.item(selection[0])['values'][2])
+        if not user_id:
+            return
+        self.timeline_user_var.set(user_id)
+        self.notebook.select(self.timeline_frame)
+        self.show_user_timeline(user_id)
+    
+    def set_tracking_data(self, df, aggregates=None):
+        """Replace the loaded tracking data and drop the indexes built from the previous data"""
+        self.df = df
+        self.aggregates = aggregates
+        self.session_index = None
+        self.user_index = UserIndex(df) if not df.empty else None
+    
+    def get_session_index(self):
+        """Get the session index for the current tracking filters, building it if needed"""
+        if self.session_index is None:
+            filtered_df = self.get_filtered_tracking_data()
+            if filtered_df.empty:
+                return None
+            self.session_index = SessionIndex(filtered_df)
+        return self.session_index
+    
+    def analyze_sessions(self):
+        """Sessionize the filtered tracking data and show summary statistics"""
+        if self.df is None or self.df.empty:
+            messagebox.showwarning("Warning", "Please load tracking data first")
+            return
+        
+        filtered_df = self.get_filtered_tracking_data()
+        if self.session_index is None and len(filtered_df) >= self.parallel_min_rows and self.analytics_workers > 1:
+            sessions = session_summary_parallel(filtered_df, self.analytics_workers)
+        else:
+            session_index = self.get_session_index()
+            sessions = session_index.summary() if session_index is not None else pd.DataFrame()
+        if sessions.empty:
+            self.sessions_text.delete(1.0, tk.END)
+            self.sessions_text.insert(tk.END, "No events with a session ID found for the current filters")
+            return
+        
+        stats = []
+        stats.append(f"Sessions: {len(sessions)}")
+        stats.append(f"Events in sessions: {int(sessions['event_count'].sum())}")
+        stats.append(f"Unique users: {sessions['user_id'].nunique()}")
+        stats.append(f"Average events per session: {sessions['event_count'].mean():.2f}")
+        stats.append(f"Median session length: {sessions['duration_seconds'].median():.1f} seconds")
+        stats.append(f"Average session length: {sessions['duration_seconds'].mean():.1f} seconds")
+        stats.append(f"Longest session: {sessions['duration_seconds'].max():.1f} seconds")
+        
+        stats.append("\nTop Entry Screens:")
+        for screen, count in sessions['entry_screen'].value_counts().head(10).items():
+            stats.append(f"  {screen}: {count}")
+        
+        stats.append("\nTop Exit Screens:")
+        for screen, count in sessions['exit_screen'].value_counts().head(10).items():
+            stats.append(f"  {screen}: {count}")
+        
+        if 'platform' in sessions:
+            stats.append("\nSessions per Platform:")
+            for platform, count in sessions['platform'].value_counts().items():
+                stats.append(f"  {platform}: {count}")
+        
+        self.sessions_text.delete(1.0, tk.END)
+        self.sessions_text.insert(tk.END, "\n".join(stats))
+        
+        self.status_var.set(f"Analyzed {len(sessions)} sessions")
+    
+    def compute_funnel(self):
+        """Compute the ordered funnel for the entered steps"""
+        if self.df is None or self.df.empty:
+            messagebox.showwarning("Warning", "Please load tracking data first")
+            return
+        
+        steps = [step.strip() for step in self.funnel_steps_var.get().split(',') if step.strip()]
+        if not steps:
+            messagebox.showwarning("Warning", "Please enter at least one funnel step")
+            return
+        
+        session_index = self.get_session_index()
+        if session_index is None:
+            return
+        
+        funnel = session_index.funnel(steps)
+        
+        for item in self.funnel_tree.get_children():
+            self.funnel_tree.delete(item)
+        
+        for _, row in funnel.iterrows():
+            median_time = row['MedianSecondsFromPrevious']
+            self.funnel_tree.insert('', 'end', values=(
+                row['Step'],
+                row['Sessions'],
+                f"{row['FromStart']:.1f}%",
+                f"{row['FromPrevious']:.1f}%",
+                f"{median_time:.1f}s" if pd.notna(median_time) else '-'
+            ))
+        
+        self.status_var.set(f"Computed funnel over {len(session_index)} sessions")
+    
+    def setup_retention_tab(self):
+        """Setup the retention cohort analysis tab"""
+        retention_frame = tb.Frame(self.notebook)
+        self.notebook.add(retention_frame, text="Retention")
+        
+        # Controls frame
+        controls_frame = tb.Labelframe(retention_frame, text="Cohort Controls", padding=10)
+        controls_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        tb.Button(controls_frame, text="Build Cohorts", 
+                 command=self.build_retention_cohorts, bootstyle=SUCCESS).pack(side=tk.LEFT, padx=5)
+        
+        tb.Label(controls_frame, text="Platform:").pack(side=tk.LEFT, padx=(20, 5))
+        self.retention_platform_var = tk.StringVar(value='All')
+        self.retention_platform_combo = tb.Combobox(controls_frame, textvariable=self.retention_platform_var, 
+                                                   state="readonly", width=15, bootstyle="secondary", values=['All'])
+        self.retention_platform_combo.pack(side=tk.LEFT, padx=5)
+        
+        tb.Label(controls_frame, text="App Version:").pack(side=tk.LEFT, padx=(10, 5))
+        self.retention_version_var = tk.StringVar(value='All')
+        self.retention_version_combo = tb.Combobox(controls_frame, textvariable=self.retention_version_var, 
+                                                  state="readonly", width=15, bootstyle="secondary", values=['All'])
+        self.retention_version_combo.pack(side=tk.LEFT, padx=5)
+        
+        tb.Label(controls_frame, text="Max Weeks:").pack(side=tk.LEFT, padx=(10, 5))
+        self.retention_weeks_var = tk.IntVar(value=12)
+        tb.Spinbox(controls_frame, from_=1, to=104, textvariable=self.retention_weeks_var, 
+                  width=5, bootstyle="secondary").pack(side=tk.LEFT, padx=5)
+        
+        # Heatmap frame
+        self.retention_viz_frame = tb.Labelframe(retention_frame, text="Weekly Retention", padding=10)
+        self.retention_viz_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.retention_figure = None
+    
+    def build_retention_cohorts(self):
+        """Compute the retention cohort matrix and render it as a heatmap"""
+        if self.df is None or self.df.empty:
+            messagebox.showwarning("Warning", "Please load tracking data first")
+            return
+        
+        platform, version = self.retention_platform_var.get(), self.retention_version_var.get()
+        if self.aggregates is not None:
+            cohorts = self.aggregates.retention(platform, version)
+            empty = cohorts.empty
+        else:
+            events = filter_events(self.df, platform, version)
+            empty = events.empty
+        if empty:
+            messagebox.showinfo("Info", "No tracking data for the selected platform and app version")
+            return
+        
+        try:
+            max_weeks = int(self.retention_weeks_var.get())
+        except (tk.TclError, ValueError):
+            max_weeks = 12
+        
+        if self.aggregates is None:
+            cohorts = RetentionCohorts.from_frame(events)
+        sizes, retention = cohorts.matrix(max_weeks=max_weeks)
+        
+        # Clear any existing heatmap
+        for widget in self.retention_viz_frame.winfo_children():
+            widget.destroy()
+        if self.retention_figure is not None:
+            plt.close(self.retention_figure)
+        
+        fig, ax = plt.subplots(figsize=(10, max(3, 0.35 * len(retention) + 1.5)))
+        self.retention_figure = fig
+        
+        image = ax.imshow(retention.to_numpy() * 100, aspect='auto', cmap='YlGnBu', vmin=0, vmax=100)
+        ax.set_title('Retention by First-Seen Week (% of cohort active in week W+k)')
+        ax.set_xlabel('Weeks since first seen')
+        ax.set_ylabel('Cohort (week, users)')
+        ax.set_xticks(range(len(retention.columns)))
+        ax.set_xticklabels(retention.columns)
+        ax.set_yticks(range(len(retention.index)))
+        ax.set_yticklabels([f"{cohort.strftime('%Y-%m-%d')} ({sizes[cohort]})" for cohort in retention.index])
+        
+        # Annotate cells when the grid is small enough to read
+        if retention.size <= 400:
+            for (row, col), value in np.ndenumerate(retention.to_numpy()):
+                if not np.isnan(value):
+                    ax.text(col, row, f"{value * 100:.0f}", ha='center', va='center', fontsize=7)
+        
+        fig.colorbar(image, ax=ax, label='% retained')
+        plt.tight_layout()
+        
+        retention_canvas = FigureCanvasTkAgg(fig, master=self.retention_viz_frame)
+        retention_canvas.draw()
+        retention_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Store reference to canvas to prevent garbage collection
+        self.retention_canvas = retention_canvas
+        
+        self.status_var.set(f"Built {len(retention)} weekly cohorts covering {int(sizes.sum())} users")
+    
     def setup_errors_tab(self):
         """Setup the error reporting tab"""
         # Main error frame
@@ -356,6 +813,7 @@ class ModernAdminDashboard:
         
         # Bind selection event
         self.error_tree.bind('<<TreeviewSelect>>', self.on_error_select)
+        self.error_tree.bind('<Double-1>', self.open_error_user_timeline)
         
         # Bind mouse hover event to show full error message
         self.error_tree.bind('<Motion>', self.on_error_hover)
@@ -370,6 +828,393 @@ class ModernAdminDashboard:
         
         self.error_details_text = scrolledtext.ScrolledText(error_details_frame, wrap=tk.WORD, font=("TkDefaultFont", 10))
         self.error_details_text.pack(fill=tk.BOTH, expand=True)
+        
+        # Error spike panel
+        spikes_frame = tb.Labelframe(right_error_frame, text="Error Spikes (per app version and type)", padding=10)
+        spikes_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        
+        spikes_controls = tb.Frame(spikes_frame)
+        spikes_controls.pack(fill=tk.X, pady=(0, 5))
+        
+        tb.Button(spikes_controls, text="Check Now", 
+                 command=self.check_error_spikes, bootstyle=WARNING).pack(side=tk.LEFT, padx=5)
+        
+        self.error_spike_auto_var = tk.BooleanVar(value=False)
+        tb.Checkbutton(spikes_controls, text="Check every minute", variable=self.error_spike_auto_var,
+                      command=self.toggle_error_spike_monitor, bootstyle="round-toggle").pack(side=tk.LEFT, padx=10)
+        
+        tb.Label(spikes_controls, text="Z-Score:").pack(side=tk.LEFT, padx=(10, 5))
+        self.error_spike_z_var = tk.DoubleVar(value=3.0)
+        tb.Spinbox(spikes_controls, from_=1.0, to=10.0, increment=0.5, textvariable=self.error_spike_z_var,
+                   width=5, bootstyle="secondary").pack(side=tk.LEFT, padx=5)
+        
+        self.spikes_tree = tb.Treeview(spikes_frame,
+                                      columns=("Version", "Type", "Window", "Count", "Baseline", "ZScore"),
+                                      show="headings", height=6, bootstyle="warning")
+        
+        self.spikes_tree.heading("Version", text="App Version")
+        self.spikes_tree.heading("Type", text="Error Type")
+        self.spikes_tree.heading("Window", text="Window Start")
+        self.spikes_tree.heading("Count", text="Count")
+        self.spikes_tree.heading("Baseline", text="Baseline")
+        self.spikes_tree.heading("ZScore", text="Z-Score")
+        
+        self.spikes_tree.column("Version", width=80)
+        self.spikes_tree.column("Type", width=160)
+        self.spikes_tree.column("Window", width=120)
+        self.spikes_tree.column("Count", width=60)
+        self.spikes_tree.column("Baseline", width=70)
+        self.spikes_tree.column("ZScore", width=70)
+        self.spikes_tree.tag_configure('spike', foreground='red')
+        
+        self.spikes_tree.pack(fill=tk.BOTH, expand=True)
+    
+    def setup_release_health_tab(self):
+        """Setup the release health tab with error rates per release"""
+        health_frame = tb.Frame(self.notebook)
+        self.notebook.add(health_frame, text="Release Health")
+        
+        # Controls frame
+        controls_frame = tb.Labelframe(health_frame, text="Release Health Controls", padding=10)
+        controls_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        tb.Button(controls_frame, text="Refresh", 
+                 command=self.refresh_release_health, bootstyle=SUCCESS).pack(side=tk.LEFT, padx=5)
+        tb.Label(controls_frame, text=f"The first refresh reads the last {self.release_health_warmup.days} days, "
+                                      "later ones only events and error reports added since",
+                 font=("TkDefaultFont", 8)).pack(side=tk.LEFT, padx=10)
+        
+        # Release health table
+        health_tree_frame = tb.Frame(health_frame)
+        health_tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        columns = ("Version", "Build", "Platform", "Sessions", "Users", "Errors",
+                   "ErrorsPerSession", "ErrorsPerUser", "UsersWithErrors")
+        self.health_tree = tb.Treeview(health_tree_frame, columns=columns, show="headings",
+                                      height=20, bootstyle="primary")
+        
+        self.health_tree.heading("Version", text="App Version")
+        self.health_tree.heading("Build", text="Build")
+        self.health_tree.heading("Platform", text="Platform")
+        self.health_tree.heading("Sessions", text="Sessions (~)")
+        self.health_tree.heading("Users", text="Users (~)")
+        self.health_tree.heading("Errors", text="Errors")
+        self.health_tree.heading("ErrorsPerSession", text="Errors / Session")
+        self.health_tree.heading("ErrorsPerUser", text="Errors / User")
+        self.health_tree.heading("UsersWithErrors", text="% Users With Errors")
+        
+        for column in columns:
+            self.health_tree.column(column, width=110, minwidth=80)
+        
+        health_scrollbar = tb.Scrollbar(health_tree_frame, orient=tk.VERTICAL, 
+                                       command=self.health_tree.yview, bootstyle="round")
+        self.health_tree.configure(yscrollcommand=health_scrollbar.set)
+        
+        self.health_tree.grid(row=0, column=0, sticky="nsew")
+        health_scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        health_tree_frame.grid_rowconfigure(0, weight=1)
+        health_tree_frame.grid_columnconfigure(0, weight=1)
+    
+    def refresh_release_health(self):
+        """Update release health with new rows and show errors per session and per user"""
+        if not self.supabase_client:
+            messagebox.showerror("Error", "Not connected to Supabase. Please check your credentials.")
+            return
+        
+        if self.release_health_busy:
+            return
+        if self.release_health is None:
+            self.release_health = ReleaseHealth()
+        
+        self.release_health_busy = True
+        self.status_var.set("Updating release health...")
+        threading.Thread(target=self.poll_release_health, daemon=True).start()
+    
+    def poll_release_health(self):
+        """Worker thread: read new rows into the release health and hand the table to the Tk thread"""
+        try:
+            self.release_health.poll(self.supabase_client, warmup=self.release_health_warmup)
+            table, error = self.release_health.table(), None
+        except Exception as e:
+            table, error = None, e
+        self.root.after(0, self.show_release_health, table, error)
+    
+    def show_release_health(self, table, error=None):
+        """Fill the release health table (runs on the Tk thread)"""
+        self.release_health_busy = False
+        if error is not None:
+            self.status_var.set("Release health update failed")
+            messagebox.showerror("Error", f"Failed to update release health: {str(error)}")
+            return
+        
+        for item in self.health_tree.get_children():
+            self.health_tree.delete(item)
+        
+        def rate(value, digits=3):
+            return f"{value:.{digits}f}" if pd.notna(value) else 'N/A'
+        
+        for row in table.itertuples(index=False):
+            self.health_tree.insert('', 'end', values=(
+                row.app_version,
+                row.build_number,
+                row.platform,
+                row.sessions,
+                row.users,
+                row.errors,
+                rate(row.errors_per_session),
+                rate(row.errors_per_user),
+                rate(row.users_with_errors_pct, 1)
+            ))
+        
+        self.status_var.set(f"Release health updated for {len(table)} releases")
+    
+    def setup_question_problems_tab(self):
+        """Setup the tab ranking questions by error reports"""
+        problems_frame = tb.Frame(self.notebook)
+        self.notebook.add(problems_frame, text="Question Problems")
+        
+        # Controls frame
+        controls_frame = tb.Labelframe(problems_frame, text="Question Problem Controls", padding=10)
+        controls_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        tb.Button(controls_frame, text="Analyze Reports", 
+                 command=self.analyze_question_problems, bootstyle=SUCCESS).pack(side=tk.LEFT, padx=5)
+        
+        tb.Label(controls_frame, text="Category:").pack(side=tk.LEFT, padx=(20, 5))
+        self.problem_category_var = tk.StringVar(value='All')
+        self.problem_category_combo = tb.Combobox(controls_frame, textvariable=self.problem_category_var,
+                                                  state="readonly", width=20, bootstyle="secondary")
+        self.problem_category_combo.pack(side=tk.LEFT, padx=5)
+        self.problem_category_combo.bind('<<ComboboxSelected>>', lambda e: self.render_question_problems())
+        
+        tb.Label(controls_frame, text="Difficulty:").pack(side=tk.LEFT, padx=(10, 5))
+        self.problem_difficulty_var = tk.StringVar(value='All')
+        self.problem_difficulty_combo = tb.Combobox(controls_frame, textvariable=self.problem_difficulty_var,
+                                                    state="readonly", width=8, bootstyle="secondary")
+        self.problem_difficulty_combo.pack(side=tk.LEFT, padx=5)
+        self.problem_difficulty_combo.bind('<<ComboboxSelected>>', lambda e: self.render_question_problems())
+        
+        tb.Label(controls_frame, text="Search:").pack(side=tk.LEFT, padx=(10, 5))
+        self.problem_search_var = tk.StringVar()
+        problem_search_entry = tb.Entry(controls_frame, textvariable=self.problem_search_var, width=25, bootstyle="secondary")
+        problem_search_entry.pack(side=tk.LEFT, padx=5)
+        problem_search_entry.bind('<KeyRelease>', lambda e: self.render_question_problems())
+        
+        # Split into ranked questions (left) and heatmap (right)
+        problems_data_frame = tb.Frame(problems_frame)
+        problems_data_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        list_frame = tb.Labelframe(problems_data_frame, text="Most Reported Questions", padding=10)
+        list_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        
+        problems_tree_frame = tb.Frame(list_frame)
+        problems_tree_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.problems_tree = tb.Treeview(problems_tree_frame, columns=tuple(self.QUESTION_PROBLEM_COLUMNS),
+                                        show="headings", height=20, bootstyle="primary")
+        for column, text in self.QUESTION_PROBLEM_COLUMNS.items():
+            self.problems_tree.heading(column, text=text, command=lambda c=column: self.sort_question_problems(c))
+            self.problems_tree.column(column, width=300 if column == 'question' else 90, minwidth=60)
+        
+        problems_scrollbar = tb.Scrollbar(problems_tree_frame, orient=tk.VERTICAL, 
+                                         command=self.problems_tree.yview, bootstyle="round")
+        self.problems_tree.configure(yscrollcommand=problems_scrollbar.set)
+        
+        self.problems_tree.grid(row=0, column=0, sticky="nsew")
+        problems_scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        problems_tree_frame.grid_rowconfigure(0, weight=1)
+        problems_tree_frame.grid_columnconfigure(0, weight=1)
+        
+        self.problems_count_var = tk.StringVar()
+        tb.Label(list_frame, textvariable=self.problems_count_var).pack(fill=tk.X, pady=(5, 0))
+        
+        self.problems_viz_frame = tb.Labelframe(problems_data_frame, text="Reports by Category and Difficulty", padding=10)
+        self.problems_viz_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
+    
+    def get_question_bank(self):
+        """Load the question bank once, from the app's JSON asset or the questions table"""
+        if self.question_bank is None:
+            path = os.getenv('QUESTIONS_JSON', QUESTION_BANK_PATH)
+            if os.path.exists(path):
+                self.question_bank = load_question_bank(path)
+            elif self.supabase_client:
+                self.question_bank = fetch_question_bank(self.supabase_client)
+        return self.question_bank
+    
+    def analyze_question_problems(self):
+        """Aggregate error reports per question and join them with the question bank"""
+        if self.error_df is None and not self.load_error_frame():
+            return
+        
+        try:
+            bank = self.get_question_bank()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load the question bank: {str(e)}")
+            return
+        if bank is None:
+            messagebox.showerror("Error", "Question bank not found. Set QUESTIONS_JSON or connect to Supabase.")
+            return
+        
+        if self.error_df.empty or 'question_id' not in self.error_df:
+            self.question_problems_df = None
+        else:
+            self.question_problems_df = question_problems(self.error_df, bank)
+        
+        problems = self.question_problems_df
+        categories = [] if problems is None else sorted({c for cs in problems['categories'] for c in cs})
+        difficulties = [] if problems is None else sorted(problems['difficulty'].dropna().astype(int).unique())
+        self.problem_category_combo['values'] = ['All'] + categories
+        self.problem_category_combo.set('All')
+        self.problem_difficulty_combo['values'] = ['All'] + [str(d) for d in difficulties]
+        self.problem_difficulty_combo.set('All')
+        
+        self.render_question_problems()
+        self.draw_question_problem_heatmap()
+        
+        n_questions = 0 if problems is None else len(problems)
+        self.status_var.set(f"{n_questions} questions have error reports ({len(bank)} questions in bank)")
+    
+    def get_filtered_question_problems(self):
+        """Question problems matching the category, difficulty and search filters"""
+        problems = self.question_problems_df
+        if problems is None:
+            return None
+        
+        category = self.problem_category_var.get()
+        if category and category != 'All':
+            problems = problems[problems['categories'].map(lambda categories: category in categories)]
+        
+        difficulty = self.problem_difficulty_var.get()
+        if difficulty and difficulty != 'All':
+            problems = problems[problems['difficulty'] == int(difficulty)]
+        
+        search = self.problem_search_var.get().strip().lower()
+        if search:
+            matches = problems['question'].fillna('').str.lower().str.contains(search, regex=False)
+            problems = problems[matches | problems.index.str.contains(search, regex=False)]
+        return problems
+    
+    def render_question_problems(self):
+        """Show the top filtered questions in the current sort order"""
+        for item in self.problems_tree.get_children():
+            self.problems_tree.delete(item)
+        
+        problems = self.get_filtered_question_problems()
+        if problems is None:
+            self.problems_count_var.set("No question-level error reports")
+            return
+        
+        column, descending = self.question_problems_sort
+        rows = top_rows(problems.reset_index(), column, self.FEATURES_PAGE_SIZE * 4, descending)
+        for row in rows.itertuples(index=False):
+            question = row.question if isinstance(row.question, str) else '(not in question bank)'
+            self.problems_tree.insert('', 'end', values=(
+                row.question_id,
+                question[:120],
+                row.category,
+                int(row.difficulty) if pd.notna(row.difficulty) else '',
+                row.reports,
+                row.reporters,
+                f"{row.report_share:.1f}",
+                row.last_reported.strftime('%Y-%m-%d %H:%M') if pd.notna(row.last_reported) else 'N/A'
+            ))
+        
+        self.problems_count_var.set(f"Showing {len(rows)} of {len(problems)} reported questions")
+    
+    def sort_question_problems(self, column):
+        """Sort the question problems by a column, toggling direction on repeated clicks"""
+        current, descending = self.question_problems_sort
+        text_columns = ('question_id', 'question', 'category')
+        self.question_problems_sort = (column, not descending if column == current else column not in text_columns)
+        self.render_question_problems()
+    
+    def draw_question_problem_heatmap(self):
+        """Render report counts per category and difficulty as a heatmap"""
+        for widget in self.problems_viz_frame.winfo_children():
+            widget.destroy()
+        if self.question_problems_figure is not None:
+            plt.close(self.question_problems_figure)
+            self.question_problems_figure = None
+        
+        heatmap = question_problem_heatmap(self.question_problems_df) if self.question_problems_df is not None else pd.DataFrame()
+        if heatmap.empty:
+            tb.Label(self.problems_viz_frame, text="No reports on questions with a known difficulty").pack(pady=20)
+            return
+        
+        fig, ax = plt.subplots(figsize=(6, max(3, 0.3 * len(heatmap) + 1.5)))
+        self.question_problems_figure = fig
+        
+        image = ax.imshow(heatmap.to_numpy(), aspect='auto', cmap='OrRd')
+        ax.set_xlabel('Difficulty')
+        ax.set_ylabel('Category')
+        ax.set_xticks(range(len(heatmap.columns)))
+        ax.set_xticklabels(heatmap.columns)
+        ax.set_yticks(range(len(heatmap.index)))
+        ax.set_yticklabels(heatmap.index)
+        fig.colorbar(image, ax=ax, label='Error reports')
+        fig.tight_layout()
+        
+        problems_canvas = FigureCanvasTkAgg(fig, master=self.problems_viz_frame)
+        problems_canvas.draw()
+        problems_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def check_error_spikes(self):
+        """Update the error spike baselines with new error reports and show the top buckets"""
+        if not self.supabase_client:
+            messagebox.showerror("Error", "Not connected to Supabase. Please check your credentials.")
+            return
+        
+        if self.error_spike_detector is None:
+            self.error_spike_detector = ErrorSpikeDetector()
+        try:
+            self.error_spike_detector.z_threshold = float(self.error_spike_z_var.get())
+        except (tk.TclError, ValueError):
+            pass
+        
+        try:
+            self.error_spike_detector.poll(self.supabase_client)
+        except Exception as e:
+            self.status_var.set(f"Error spike check failed: {str(e)}")
+            return
+        
+        for item in self.spikes_tree.get_children():
+            self.spikes_tree.delete(item)
+        
+        scores = self.error_spike_detector.scores()
+        for row in scores.head(20).itertuples(index=False):
+            self.spikes_tree.insert('', 'end', values=(
+                row.app_version,
+                row.error_type,
+                row.window_start.strftime('%Y-%m-%d %H:%M'),
+                row.count,
+                f"{row.baseline:.1f}",
+                f"{row.z_score:.1f}"
+            ), tags=('spike',) if row.spike else ())
+        
+        n_spikes = int(scores['spike'].sum())
+        if n_spikes:
+            status = f"{n_spikes} error spike(s) detected"
+        else:
+            status = f"No error spikes ({len(scores)} buckets checked)"
+        late_rows = self.error_spike_detector.late_rows
+        if late_rows:
+            status += f", {late_rows} late error report(s) not counted"
+        self.status_var.set(status)
+    
+    def toggle_error_spike_monitor(self):
+        """Start or stop the periodic error spike check"""
+        if self.error_spike_job is not None:
+            self.root.after_cancel(self.error_spike_job)
+            self.error_spike_job = None
+        if self.error_spike_auto_var.get():
+            self.run_error_spike_monitor()
+    
+    def run_error_spike_monitor(self):
+        """Check for error spikes and schedule the next check"""
+        self.check_error_spikes()
+        self.error_spike_job = self.root.after(self.error_spike_interval_ms, self.run_error_spike_monitor)
     
     def load_tracking_data(self):
         """Load tracking data from Supabase"""
@@ -378,18 +1223,40 @@ class ModernAdminDashboard:
             return
         
         try:
+            # Histories too large for one DataFrame are aggregated chunk by chunk
+            total = self.supabase_client.table('tracking_events').select('id', count='exact').limit(1).execute().count
+            if total and total > self.max_in_memory_rows:
+                self.load_tracking_data_chunked(total)
+                return
+            
             # Load data from Supabase
             response = self.supabase_client.table('tracking_events').select('*').order('timestamp', desc=True).execute()
             
             # Convert to DataFrame
-            self.df = pd.DataFrame(response.data)
+            df = pd.DataFrame(response.data)
             
-            if self.df.empty:
+            if df.empty:
+                self.set_tracking_data(df)
                 messagebox.showinfo("Info", "No tracking data found in Supabase")
                 return
             
             # Format timestamp
-            self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            
+            if len(df) >= self.parallel_min_rows and self.analytics_workers > 1:
+                # Counts, sketches and cohorts built on time partitions across cores
+                self.status_var.set(f"Aggregating {len(df)} events on {self.analytics_workers} cores...")
+                self.root.update_idletasks()
+                self.set_tracking_data(df, aggregate_parallel(df, self.hll_precision, self.analytics_workers))
+                self.user_sketches = self.aggregates.sketches
+                self.daily_counts = self.aggregates.daily_counts()
+            else:
+                self.set_tracking_data(df)
+                # Build distinct-user sketches once per load
+                self.user_sketches = UserSketches.from_frame(self.df, self.hll_precision)
+                
+                # Precompute daily counts so charts can re-aggregate at any resolution
+                self.daily_counts = daily_event_counts(self.df)
             
             # Update filter options
             self.update_tracking_filter_options()
@@ -398,11 +1265,32 @@ class ModernAdminDashboard:
             self.display_tracking_records()
             self.display_features_overview()
             
-            self.status_var.set(f"Loaded {len(self.df)} tracking records from Supabase")
+            self.status_var.set(f"Loaded {len(self.df)} tracking records from Supabase ({self.format_active_users()})")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load data from Supabase: {str(e)}")
     
+    def load_tracking_data_chunked(self, total):
+        """Fold the full tracking history into running aggregates, keeping only recent rows"""
+        aggregates = TrackingAggregates(self.hll_precision, self.recent_rows)
+        pages = iter_supabase_pages(self.supabase_client, 'tracking_events')
+        for chunk in iter_page_frames(pages, self.chunk_rows):
+            chunk['timestamp'] = pd.to_datetime(chunk['timestamp'])
+            aggregates.add(chunk)
+            self.status_var.set(f"Aggregating tracking data... {aggregates.rows}/{total} events")
+            self.root.update_idletasks()
+        
+        self.set_tracking_data(aggregates.recent, aggregates)
+        self.user_sketches = aggregates.sketches
+        self.daily_counts = aggregates.daily_counts()
+        
+        self.update_tracking_filter_options()
+        self.display_tracking_records()
+        self.display_features_overview()
+        
+        self.status_var.set(f"Aggregated {aggregates.rows} tracking events, latest {len(self.df)} kept for "
+                            f"drilldown ({self.format_active_users()})")
+    
     def load_error_reports(self, event=None):
         """Load error reports from Supabase with optional filtering"""
         if not self.supabase_client:
@@ -464,48 +1352,128 @@ class ModernAdminDashboard:
         if self.df is None or self.df.empty:
             return
         
+        if self.aggregates is not None:
+            options = self.aggregates.options()
+        else:
+            options = {
+                'features': sorted(self.df['event_name'].dropna().unique()),
+                'actions': sorted(self.df['event_type'].dropna().unique()),
+                'platforms': sorted(self.df['platform'].dropna().unique()),
+                'app_versions': sorted(self.df['app_version'].dropna().unique()),
+            }
+        
         # Update feature combo
-        features = sorted(self.df['event_name'].dropna().unique())
+        features = options['features']
         self.feature_combo['values'] = ['All'] + list(features)
         self.feature_combo.set('All')
         
         # Update action combo
-        actions = sorted(self.df['event_type'].dropna().unique())
+        actions = options['actions']
         self.action_combo['values'] = ['All'] + list(actions)
         self.action_combo.set('All')
+        
+        # Update retention combos
+        platforms = options['platforms']
+        self.retention_platform_combo['values'] = ['All'] + list(platforms)
+        self.retention_platform_combo.set('All')
+        
+        versions = options['app_versions']
+        self.retention_version_combo['values'] = ['All'] + list(versions)
+        self.retention_version_combo.set('All')
     
     def display_features_overview(self):
         """Display features overview in the treeview"""
-        # Clear existing records
-        for item in self.features_tree.get_children():
-            self.features_tree.delete(item)
+        self.feature_stats = None
+        self.features_limit = self.FEATURES_PAGE_SIZE
         
         if self.df is None or self.df.empty:
+            self.render_features_overview()
             return
         
         # Get filtered data for overview
         filtered_df = self.get_filtered_tracking_data()
         
-        # Group by features and calculate statistics
-        feature_stats = filtered_df.groupby('event_name').agg({
-            'id': 'count',  # Total usage count
-            'user_id': 'nunique',  # Unique users
-            'timestamp': 'max'  # Last used
-        }).reset_index()
+        # Sketches are keyed by feature/action/day/platform, so the action filter
+        # narrows the unique user estimate the same way it narrows the counts
+        action = self.action_var.get()
+        actions = [action] if action and action != 'All' else None
+        if self.aggregates is not None:
+            # Counts come from the prebuilt aggregates, which also cover rows no longer in memory
+            start, end = self.get_tracking_date_range()
+            overview = self.aggregates.feature_overview(self.feature_var.get(), action, start, end)
+            feature_stats = overview.reset_index()
+            reach = self.user_sketches.reach_by_feature(start=start, end=end, features=feature_stats['event_name'],
+                                                        actions=actions)
+            feature_stats.insert(2, 'user_id', feature_stats['event_name'].map(reach).fillna(0).astype(int))
+        elif self.user_sketches is not None:
+            feature_stats = filtered_df.groupby('event_name').agg({
+                'id': 'count',  # Total usage count
+                'timestamp': 'max'  # Last used
+            }).reset_index()
+            start, end = self.get_tracking_date_range()
+            reach = self.user_sketches.reach_by_feature(start=start, end=end, features=feature_stats['event_name'],
+                                                        actions=actions)
+            feature_stats.insert(2, 'user_id', feature_stats['event_name'].map(reach).fillna(0).astype(int))
+        else:
+            # Group by features and calculate statistics
+            feature_stats = filtered_df.groupby('event_name').agg({
+                'id': 'count',  # Total usage count
+                'user_id': 'nunique',  # Unique users
+                'timestamp': 'max'  # Last used
+            }).reset_index()
         
         # Rename columns for clarity
         feature_stats.columns = ['Feature', 'UsageCount', 'UniqueUsers', 'LastUsed']
         
-        # Insert records into features tree
-        for _, row in feature_stats.iterrows():
-            values = [
-                row['Feature'],
-                row['UsageCount'],
-                row['UniqueUsers'],
-                row['LastUsed'].strftime('%Y-%m-%d %H:%M:%S') if pd.notna(row['LastUsed']) else 'N/A'
-            ]
-            
-            self.features_tree.insert('', 'end', values=values)
+        # Cache the aggregate; sorting and paging re-rank it without regrouping
+        self.feature_stats = feature_stats
+        self.render_features_overview()
+    
+    def render_features_overview(self):
+        """Show the top rows of the cached feature stats, reusing existing tree rows"""
+        column, descending = self.features_sort
+        for name, text in self.FEATURE_HEADINGS.items():
+            arrow = (' \u25bc' if descending else ' \u25b2') if name == column else ''
+            self.features_tree.heading(name, text=text + arrow)
+        
+        if self.feature_stats is None:
+            rows = pd.DataFrame(columns=list(self.FEATURE_HEADINGS))
+        else:
+            rows = top_rows(self.feature_stats, column, self.features_limit, descending)
+        
+        values = [
+            (feature, usage, users, last_used.strftime('%Y-%m-%d %H:%M:%S') if pd.notna(last_used) else 'N/A')
+            for feature, usage, users, last_used in zip(rows['Feature'], rows['UsageCount'],
+                                                        rows['UniqueUsers'], rows['LastUsed'])
+        ]
+        
+        # Update rows in place and only insert or delete the difference
+        items = self.features_tree.get_children()
+        if self.features_tree.selection():
+            self.features_tree.selection_remove(self.features_tree.selection())
+        for item, row_values in zip(items, values):
+            self.features_tree.item(item, values=row_values)
+        if len(items) > len(values):
+            self.features_tree.delete(*items[len(values):])
+        for row_values in values[len(items):]:
+            self.features_tree.insert('', 'end', values=row_values)
+        
+        total = 0 if self.feature_stats is None else len(self.feature_stats)
+        self.features_count_var.set(f"Showing {len(values)} of {total} features")
+    
+    def sort_features_overview(self, column):
+        """Sort the features overview by a column, toggling direction on repeated clicks"""
+        current, descending = self.features_sort
+        # Text sorts A-Z first, numbers and dates largest first
+        self.features_sort = (column, not descending if column == current else column != 'Feature')
+        self.render_features_overview()
+    
+    def show_more_features(self):
+        """Show the next page of features in the overview"""
+        if self.feature_stats is None or self.features_limit >= len(self.feature_stats):
+            return
+        self.features_limit += self.FEATURES_PAGE_SIZE
+        self.render_features_overview()
     
     def display_tracking_records(self):
         """Display detailed tracking records in the old records treeview"""
@@ -534,29 +1502,26 @@ class ModernAdminDashboard:
             
             self.tree.insert('', 'end', values=values)
     
-    def get_filtered_tracking_data(self):
-        """Get tracking data based on current filters"""
-        if self.df is None or self.df.empty:
-            return pd.DataFrame()
-        
-        filtered_df = self.df.copy()
+    def get_tracking_filter_mask(self):
+        """Boolean mask over self.df for the current filters"""
+        mask = pd.Series(True, index=self.df.index)
         
         # Apply feature filter
         feature = self.feature_var.get()
         if feature and feature != 'All':
-            filtered_df = filtered_df[filtered_df['event_name'] == feature]
+            mask &= self.df['event_name'] == feature
         
         # Apply action filter
         action = self.action_var.get()
         if action and action != 'All':
-            filtered_df = filtered_df[filtered_df['event_type'] == action]
+            mask &= self.df['event_type'] == action
         
         # Apply date filter
         date_from = self.date_from_var.get()
         if date_from:
             try:
                 date_from_dt = datetime.strptime(date_from, '%Y-%m-%d')
-                filtered_df = filtered_df[filtered_df['timestamp'] >= date_from_dt]
+                mask &= self.df['timestamp'] >= date_from_dt
             except ValueError:
                 pass
         
@@ -564,17 +1529,90 @@ class ModernAdminDashboard:
         if date_to:
             try:
                 date_to_dt = datetime.strptime(date_to, '%Y-%m-%d')
-                filtered_df = filtered_df[filtered_df['timestamp'] <= date_to_dt]
+                mask &= self.df['timestamp'] <= date_to_dt
             except ValueError:
                 pass
         
-        return filtered_df
+        return mask
+    
+    def get_filtered_tracking_data(self):
+        """Get tracking data based on current filters"""
+        if self.df is None or self.df.empty:
+            return pd.DataFrame()
+        
+        return self.df[self.get_tracking_filter_mask()]
+    
+    def get_tracking_date_range(self):
+        """Get the (start, end) dates of the current date filters, None where unset"""
+        bounds = []
+        for value in (self.date_from_var.get(), self.date_to_var.get()):
+            try:
+                bounds.append(datetime.strptime(value, '%Y-%m-%d') if value else None)
+            except ValueError:
+                bounds.append(None)
+        return tuple(bounds)
+    
+    def format_unique_users(self, feature_df, feature_name):
+        """Unique users of a feature, estimated from the sketches when available"""
+        if self.user_sketches is None:
+            return str(feature_df['user_id'].nunique())
+        estimate = self.user_sketches.count(features=[feature_name])
+        return f"~{estimate} (\u00b1{self.user_sketches.relative_error * 100:.1f}%)"
+    
+    def format_active_users(self, features=None):
+        """DAU/WAU/MAU ending at the most recent day with data"""
+        if self.user_sketches is None or self.user_sketches.keys.empty:
+            return "DAU/WAU/MAU unavailable"
+        end = self.user_sketches.keys['day'].max() + timedelta(days=1)
+        counts = [self.user_sketches.count(features=features, start=end - timedelta(days=days), end=end)
+                  for days in (1, 7, 30)]
+        return f"DAU ~{counts[0]}, WAU ~{counts[1]}, MAU ~{counts[2]}"
     
     def apply_tracking_filters(self):
         """Apply filters to tracking data"""
+        self.session_index = None
         self.display_tracking_records()
         self.display_features_overview()
     
+    def export_tracking_data(self):
+        """Stream the filtered tracking data to CSV, NDJSON or Parquet"""
+        path = filedialog.asksaveasfilename(
+            title="Export Tracking Data",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("NDJSON", "*.ndjson"), ("Parquet", "*.parquet")]
+        )
+        if not path:
+            return
+        
+        fmt = next((name for name, ext in EXPORT_FORMATS.items() if path.lower().endswith(ext)), 'csv')
+        
+        def report(progress):
+            self.status_var.set(f"Exporting... {progress}")
+            self.root.update_idletasks()
+        
+        # After an out-of-core load self.df holds only the newest rows, so the export
+        # has to read the full history from Supabase like when nothing is loaded
+        loaded = self.df is not None and not self.df.empty
+        truncated = self.aggregates is not None and loaded and len(self.df) < self.aggregates.rows
+        try:
+            if loaded and not truncated:
+                # Slice the loaded frame by mask positions instead of copying the selection
+                chunks = frame_chunks(self.df, self.get_tracking_filter_mask().to_numpy())
+            elif self.supabase_client:
+                # Page through Supabase with the same filters
+                start, end = self.get_tracking_date_range()
+                filters = {'event_name': self.feature_var.get(), 'event_type': self.action_var.get()}
+                chunks = supabase_chunks(self.supabase_client, filters, start,
+                                         end + timedelta(days=1) if end else None)
+            else:
+                messagebox.showerror("Error", "Not connected to Supabase. Please check your credentials.")
+                return
+            
+            progress = export_chunks(chunks, path, fmt, ExportProgress(report))
+            self.status_var.set(f"Exported {progress} to {os.path.basename(path)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export tracking data: {str(e)}")
+    
     def on_feature_select(self, event):
         """Handle feature selection in the features treeview"""
         selection = self.features_tree.selection()
@@ -598,7 +1636,8 @@ class ModernAdminDashboard:
         # Display simplified detailed information about this feature
         details = f"Feature: {feature_name}\n"
         details += f"Total Usage: {len(feature_df)} events\n"
-        details += f"Unique Users: {feature_df['user_id'].nunique()}\n"
+        details += f"Unique Users: {self.format_unique_users(feature_df, feature_name)}\n"
+        details += f"Active Users: {self.format_active_users([feature_name])}\n"
         details += f"Date Range: {feature_df['timestamp'].min()} to {feature_df['timestamp'].max()}\n"
         details += f"First Used: {feature_df['timestamp'].min()}\n"
         details += f"Last Used: {feature_df['timestamp'].max()}\n"
@@ -610,7 +1649,7 @@ class ModernAdminDashboard:
         stats = []
         stats.append(f"Feature: {feature_name}")
         stats.append(f"Total Events: {len(feature_df)}")
-        stats.append(f"Unique Users: {feature_df['user_id'].nunique()}")
+        stats.append(f"Unique Users: {self.format_unique_users(feature_df, feature_name)}")
         stats.append(f"Date Range: {feature_df['timestamp'].min()} to {feature_df['timestamp'].max()}")
         
         # Actions breakdown
@@ -741,7 +1780,7 @@ class ModernAdminDashboard:
         stats = []
         stats.append(f"Feature: {feature_name}")
         stats.append(f"Total Events: {len(feature_df)}")
-        stats.append(f"Unique Users: {feature_df['user_id'].nunique()}")
+        stats.append(f"Unique Users: {self.format_unique_users(feature_df, feature_name)}")
         stats.append(f"Date Range: {feature_df['timestamp'].min()} to {feature_df['timestamp'].max()}")
         
         # Actions breakdown
@@ -819,70 +1858,25 @@ class ModernAdminDashboard:
         for widget in self.viz_frame.winfo_children():
             widget.destroy()
         
-        # Calculate the number of subplots to determine figure size
-        n_plots = 4
-        fig, axes = plt.subplots(n_plots, 1, figsize=(10, 4*n_plots))
-        fig.suptitle(f'Feature Usage Analysis: {feature_name}', fontsize=14)
-        
-        # Make sure axes is always a list, even if there's only one subplot
-        if n_plots == 1:
-            axes = [axes]
-        
-        # Plot 1: Event types over time
-        event_counts = feature_df.groupby([feature_df['timestamp'].dt.date, 'event_type']).size().unstack(fill_value=0)
-        if not event_counts.empty:
-            event_counts.plot(kind='bar', ax=axes[0], width=0.8)
-            axes[0].set_title('Event Types Over Time')
-            axes[0].set_xlabel('Date')
-            axes[0].set_ylabel('Event Count')
-            axes[0].tick_params(axis='x', rotation=45)
-        else:
-            axes[0].text(0.5, 0.5, 'No data available', horizontalalignment='center', 
-                          verticalalignment='center', transform=axes[0].transAxes)
-            axes[0].set_title('Event Types Over Time')
-        
-        # Plot 2: Platform distribution
-        platform_counts = feature_df['platform'].value_counts()
-        if not platform_counts.empty and len(platform_counts) > 0:
-            axes[1].pie(platform_counts.values, labels=platform_counts.index, autopct='%1.1f%%')
-            axes[1].set_title('Platform Distribution')
-        else:
-            axes[1].text(0.5, 0.5, 'No platform data', horizontalalignment='center', 
-                          verticalalignment='center', transform=axes[1].transAxes)
-            axes[1].set_title('Platform Distribution')
-        
-        # Plot 3: Daily activity pattern
-        daily_counts = feature_df.groupby(feature_df['timestamp'].dt.date).size()
-        if not daily_counts.empty:
-            axes[2].plot(daily_counts.index, daily_counts.values, marker='o')
-            axes[2].set_title('Daily Activity Trend')
-            axes[2].set_xlabel('Date')
-            axes[2].set_ylabel('Event Count')
-            axes[2].tick_params(axis='x', rotation=45)
-        else:
-            axes[2].text(0.5, 0.5, 'No daily data', horizontalalignment='center', 
-                          verticalalignment='center', transform=axes[2].transAxes)
-            axes[2].set_title('Daily Activity Trend')
-        
-        # Plot 4: App version distribution
-        version_counts = feature_df['app_version'].value_counts()
-        if not version_counts.empty and len(version_counts) > 0:
-            axes[3].bar(version_counts.index, version_counts.values)
-            axes[3].set_title('App Version Distribution')
-            axes[3].set_xlabel('App Version')
-            axes[3].set_ylabel('Event Count')
-            axes[3].tick_params(axis='x', rotation=45)
-        else:
-            axes[3].text(0.5, 0.5, 'No version data', horizontalalignment='center', 
-                          verticalalignment='center', transform=axes[3].transAxes)
-            axes[3].set_title('App Version Distribution')
-        
-        # Adjust layout to prevent overlap
-        plt.tight_layout()
-        
-        # Embed the plot in the dashboard frame
+        # Time-series panels are drawn from the precomputed daily counts
+        try:
+            feature_daily = self.daily_counts.xs(feature_name) if self.daily_counts is not None else None
+        except KeyError:
+            feature_daily = None
+        
+        fig = plt.figure(figsize=FEATURE_FIGURE_SIZE)
+        self.time_series_state = draw_feature_figure(fig, feature_name, feature_daily,
+                                                     feature_df['platform'].value_counts(),
+                                                     feature_df['app_version'].value_counts())
+        if self.time_series_state is not None:
+            self.time_series_state['events_ax'].callbacks.connect('xlim_changed', self.on_time_range_changed)
+        
+        # Embed the plot in the dashboard frame, with a toolbar for zoom/pan
         figure_canvas = FigureCanvasTkAgg(fig, master=self.viz_frame)
         figure_canvas.draw()
+        toolbar = NavigationToolbar2Tk(figure_canvas, self.viz_frame, pack_toolbar=False)
+        toolbar.update()
+        toolbar.pack(side=tk.TOP, fill=tk.X)
         figure_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Store reference to canvas to prevent garbage collection
@@ -898,6 +1892,25 @@ class ModernAdminDashboard:
         if not self.viz_scrollbar.winfo_ismapped():
             self.viz_scrollbar.pack(side="right", fill="y")
     
+    def draw_time_series(self, start, end):
+        """Draw the event type bars and activity trend for [start, end] from the daily counts"""
+        draw_time_series(self.time_series_state, start, end)
+    
+    def on_time_range_changed(self, ax):
+        """Re-aggregate the time-series panels when the visible range is zoomed or panned"""
+        state = self.time_series_state
+        if state is None or ax is not state['events_ax']:
+            return
+        
+        low, high = ax.get_xlim()
+        start = pd.Timestamp(mdates.num2date(low)).tz_convert(None).normalize()
+        end = pd.Timestamp(mdates.num2date(high)).tz_convert(None).normalize()
+        if state['range'] == (start, end):
+            return
+        
+        self.draw_time_series(start, end)
+        ax.figure.canvas.draw_idle()
+    
     def on_error_select(self, event):
         """Handle error selection in the treeview"""
         selection = self.error_tree.selection()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark serial vs process-pool aggregation of tracking events
+
+Generates a synthetic tracking_events frame and times the dashboard's serial
+pandas groupby against aggregate_parallel() for increasing worker counts, then
+reports the best measured speedup. Each row shows the worker count requested and
+the number of processes actually used; on a single core, or for too few rows, the
+parallel paths run in process, and such a run says nothing about the speedup on
+more cores.
+
+Usage:
+    python benchmark_aggregation.py --rows 2000000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from tracking_analytics import (aggregate_parallel, daily_event_counts, RetentionCohorts, UserSketches,
+                                parallel_workers, session_summary_parallel, SessionIndex, DEFAULT_HLL_PRECISION)
+
+
+def synthetic_events(rows, users=50_000, features=200, days=180, seed=0):
+    """Random tracking events with the columns the dashboard aggregates"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2025-01-01', tz='UTC').value
+    timestamps = np.sort(rng.integers(start, start + days * 86_400 * 10**9, rows))
+    user_ids = rng.integers(0, users, rows)
+    return pd.DataFrame({
+        'id': np.arange(rows).astype(str),
+        'user_id': np.char.add('user-', user_ids.astype(str)),
+        'event_name': np.char.add('feature_', rng.zipf(1.5, rows).clip(max=features).astype(str)),
+        'event_type': rng.choice(['open', 'tap', 'complete'], rows),
+        'timestamp': pd.to_datetime(timestamps, utc=True),
+        'platform': rng.choice(['android', 'ios', 'web'], rows),
+        'app_version': rng.choice(['1.0.0', '1.1.0', '1.2.0'], rows),
+        'session_id': np.char.add(np.char.add('s', user_ids.astype(str)), (timestamps // (3600 * 10**9)).astype(str)),
+    })
+
+
+def serial_aggregate(df, precision):
+    """The serial groupbys run on load: features overview, daily counts, sketches and cohorts"""
+    df.groupby('event_name').agg({'id': 'count', 'user_id': 'nunique', 'timestamp': 'max'})
+    daily_event_counts(df)
+    UserSketches.from_frame(df, precision)
+    RetentionCohorts.from_frame(df).matrix()
+
+
+def parallel_aggregate(df, precision, workers):
+    aggregates = aggregate_parallel(df, precision, workers)
+    aggregates.feature_overview()
+    aggregates.daily_counts()
+    aggregates.retention().matrix()
+
+
+def timed(func, *args, repeat=3):
+    """Best wall-clock time of several runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label, serial, rows, timings):
+    """Print a serial vs parallel table and return the speedup per worker count"""
+    print(f"\n{label:<12} {'Workers':>7} {'Used':>5} {'Seconds':>9} {'Rows/s':>12} {'Speedup':>8}")
+    print(f"{'serial':<12} {1:>7} {1:>5} {serial:>9.2f} {rows / serial:>12,.0f} {1:>7.2f}x")
+    speedups = {}
+    for workers, elapsed in timings:
+        used = parallel_workers(rows, workers)
+        speedups[workers, used] = serial / elapsed
+        print(f"{'parallel':<12} {workers:>7} {used:>5} {elapsed:>9.2f} {rows / elapsed:>12,.0f} "
+              f"{speedups[workers, used]:>7.2f}x")
+    return speedups
+
+
+def summarise(label, speedups):
+    """One line with the best measured speedup and the processes it used, flagging unverified claims"""
+    (workers, used), best = max(speedups.items(), key=lambda item: item[1])
+    verdict = 'faster' if best > 1.05 else 'no faster' if best > 0.95 else 'slower'
+    line = f"Measured {label} speedup: {best:.2f}x with {workers} worker(s) requested, {used} used ({verdict} than serial)"
+    if all(used <= 1 for _, used in speedups):
+        line += "; every run was in process, so the parallel speedup is unverified here"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serial vs parallel tracking aggregation')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Number of synthetic events (default: 1000000)')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}), help='Worker counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, best is reported (default: 3)')
+    parser.add_argument('--precision', type=int, default=DEFAULT_HLL_PRECISION, help='HyperLogLog precision')
+
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows} synthetic events...")
+    df = synthetic_events(args.rows)
+
+    cores = os.cpu_count() or 1
+    print(f"{cores} core(s) available" + (", parallel runs fall back to in-process aggregation" if cores <= 1 else ""))
+
+    serial = timed(serial_aggregate, df, args.precision, repeat=args.repeat)
+    speedups = report('Aggregation', serial, args.rows, [
+        (workers, timed(parallel_aggregate, df, args.precision, workers, repeat=args.repeat))
+        for workers in args.workers])
+    summarise('aggregation', speedups)
+
+    serial = timed(lambda frame: SessionIndex(frame).summary(), df, repeat=args.repeat)
+    speedups = report('Sessions', serial, args.rows, [
+        (workers, timed(session_summary_parallel, df, workers, repeat=args.repeat))
+        for workers in args.workers])
+    summarise('sessions', speedups)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Headless error spike monitor for BijbelQuiz error_reports
+
+Each run reads only the error reports that arrived since the previous run, updates
+the per (app_version, error_type) EWMA baselines kept in a small state file and
+prints the buckets whose current window is a spike. Meant to run every minute from
+cron, or continuously with --loop.
+
+Usage:
+    python error_spike_monitor.py --state error_spikes.json
+    python error_spike_monitor.py --loop --interval 60 --z-threshold 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+
+from tracking_analytics import ErrorSpikeDetector
+
+
+def load_detector(path, args):
+    """Restore the detector from its state file, or start a new one from the arguments"""
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            detector = ErrorSpikeDetector.from_dict(json.load(f))
+        # Thresholds may be changed between runs without losing the baselines
+        detector.z_threshold = args.z_threshold
+        detector.min_count = args.min_count
+        return detector
+    return ErrorSpikeDetector(args.window, args.alpha, args.z_threshold, args.min_count)
+
+
+def save_detector(detector, path):
+    """Write the detector state atomically"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(detector.to_dict(), f)
+    os.replace(temp_path, path)
+
+
+def report(spikes):
+    """Print one line per spiking bucket"""
+    for spike in spikes.itertuples(index=False):
+        print(f"SPIKE app_version={spike.app_version} error_type={spike.error_type} "
+              f"window={spike.window_start:%Y-%m-%d %H:%M} count={spike.count} "
+              f"baseline={spike.baseline:.1f} z={spike.z_score:.1f}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect error report spikes per app_version and error_type')
+    parser.add_argument('--state', default='error_spikes.json', help='State file with the baselines (default: error_spikes.json)')
+    parser.add_argument('--window', type=int, default=15, help='Window length in minutes (default: 15, new state only)')
+    parser.add_argument('--alpha', type=float, default=0.1, help='EWMA smoothing factor (default: 0.1, new state only)')
+    parser.add_argument('--z-threshold', type=float, default=3.0, help='Z-score that counts as a spike (default: 3.0)')
+    parser.add_argument('--min-count', type=int, default=5, help='Minimum errors in a window to flag it (default: 5)')
+    parser.add_argument('--warmup-days', type=int, default=3, help='History read on the first run (default: 3)')
+    parser.add_argument('--loop', action='store_true', help='Keep running instead of exiting after one check')
+    parser.add_argument('--interval', type=int, default=60, help='Seconds between checks with --loop (default: 60)')
+    parser.add_argument('--fail-on-spike', action='store_true', help='Exit with status 2 when a spike is found')
+
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    url = os.getenv('SUPABASE_URL')
+    key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    if not url or not key:
+        print("Error: set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in your .env file", file=sys.stderr)
+        sys.exit(1)
+
+    client = create_client(url, key)
+    detector = load_detector(args.state, args)
+
+    while True:
+        late_rows = detector.late_rows
+        try:
+            detector.poll(client, warmup=timedelta(days=args.warmup_days))
+            save_detector(detector, args.state)
+        except Exception as e:
+            print(f"Error: failed to check error reports: {e}", file=sys.stderr)
+            if not args.loop:
+                sys.exit(1)
+        if detector.late_rows > late_rows:
+            print(f"Warning: {detector.late_rows - late_rows} error report(s) arrived after their window "
+                  f"closed and were not counted", file=sys.stderr)
+
+        spikes = detector.spikes()
+        report(spikes)
+
+        if not args.loop:
+            if args.fail_on_spike and not spikes.empty:
+                sys.exit(2)
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Streaming export of BijbelQuiz tracking data to CSV, NDJSON or Parquet
+
+Rows are written chunk by chunk, either straight from paginated Supabase reads or
+from an in-memory DataFrame, so the full result is never held in memory at once.
+
+Usage:
+    python export_tracking_data.py --format ndjson --output events.ndjson --from 2025-01-01 --to 2025-12-31
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from tracking_analytics import iter_supabase_pages, SUPABASE_PAGE_SIZE
+
+EXPORT_FORMATS = {
+    'csv': '.csv',
+    'ndjson': '.ndjson',
+    'parquet': '.parquet',
+}
+
+
+def _normalise_chunk(chunk, columns=None):
+    """Make a chunk safe to write: nested values as JSON strings and a fixed column order"""
+    chunk = chunk.copy()
+    for column in chunk.columns:
+        if chunk[column].dtype == object:
+            chunk[column] = chunk[column].map(
+                lambda value: json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+            )
+    if columns is not None:
+        chunk = chunk.reindex(columns=columns)
+    return chunk
+
+
+class CsvExportWriter:
+    """Append DataFrame chunks to a CSV file"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.header_written = False
+
+    def write(self, chunk):
+        chunk.to_csv(self.file, header=not self.header_written, index=False)
+        self.header_written = True
+
+    def close(self):
+        self.file.close()
+
+
+class NdjsonExportWriter:
+    """Append DataFrame chunks to a newline-delimited JSON file"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, chunk):
+        lines = chunk.to_json(orient='records', lines=True, date_format='iso', force_ascii=False)
+        if lines and not lines.endswith('\n'):
+            lines += '\n'
+        self.file.write(lines)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetExportWriter:
+    """Append DataFrame chunks as row groups of a Parquet file (requires pyarrow)"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.writer = None
+        self.schema = None
+
+    def write(self, chunk):
+        # Text columns are written as strings even when a chunk has only nulls in them,
+        # so every row group shares the schema of the first one
+        for column in chunk.columns:
+            if chunk[column].dtype == object:
+                chunk[column] = chunk[column].astype('string')
+        if 'timestamp' in chunk.columns:
+            chunk['timestamp'] = pd.to_datetime(chunk['timestamp'], utc=True)
+
+        table = self.pa.Table.from_pandas(chunk, preserve_index=False)
+        if self.writer is None:
+            self.schema = table.schema
+            self.writer = self.pq.ParquetWriter(self.path, self.schema)
+        else:
+            table = table.cast(self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+EXPORT_WRITERS = {
+    'csv': CsvExportWriter,
+    'ndjson': NdjsonExportWriter,
+    'parquet': ParquetExportWriter,
+}
+
+
+class ExportProgress:
+    """Track rows written and throughput"""
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.rows = 0
+        self.start = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def update(self, rows):
+        self.rows += rows
+        if self.callback:
+            self.callback(self)
+
+    def __str__(self):
+        return f"{self.rows} rows in {self.elapsed:.1f}s ({self.rows_per_second:.0f} rows/s)"
+
+
+def export_chunks(chunks, path, fmt, progress=None):
+    """Write an iterable of DataFrame chunks to path in the given format, one chunk at a time"""
+    if fmt not in EXPORT_WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    progress = progress or ExportProgress()
+    writer = EXPORT_WRITERS[fmt](path)
+    columns = None
+    try:
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            if columns is None:
+                columns = list(chunk.columns)
+            writer.write(_normalise_chunk(chunk, columns))
+            progress.update(len(chunk))
+    finally:
+        writer.close()
+    return progress
+
+
+def supabase_chunks(client, filters=None, start=None, end=None, page_size=SUPABASE_PAGE_SIZE):
+    """DataFrame chunks straight from paginated tracking_events reads"""
+    for rows in iter_supabase_pages(client, 'tracking_events', filters=filters, start=start, end=end,
+                                    page_size=page_size):
+        yield pd.DataFrame(rows)
+
+
+def frame_chunks(df, mask=None, chunk_rows=50_000):
+    """DataFrame chunks of the rows of df selected by a boolean mask, without copying the selection"""
+    positions = np.arange(len(df)) if mask is None else np.flatnonzero(np.asarray(mask))
+    for offset in range(0, len(positions), chunk_rows):
+        yield df.iloc[positions[offset:offset + chunk_rows]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream filtered tracking_events to CSV, NDJSON or Parquet')
+    parser.add_argument('--format', '-f', choices=sorted(EXPORT_FORMATS), default='csv', help='Output format (default: csv)')
+    parser.add_argument('--output', '-o', help='Output file (default: tracking_events<ext>)')
+    parser.add_argument('--feature', help='Filter by feature (event_name)')
+    parser.add_argument('--action', help='Filter by action (event_type)')
+    parser.add_argument('--platform', help='Filter by platform')
+    parser.add_argument('--from', dest='date_from', help='Start date, inclusive (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', help='End date, inclusive (YYYY-MM-DD)')
+    parser.add_argument('--page-size', type=int, default=SUPABASE_PAGE_SIZE,
+                        help=f'Rows per Supabase request (default: {SUPABASE_PAGE_SIZE})')
+
+    args = parser.parse_args()
+
+    try:
+        start = datetime.strptime(args.date_from, '%Y-%m-%d') if args.date_from else None
+        end = datetime.strptime(args.date_to, '%Y-%m-%d') + timedelta(days=1) if args.date_to else None
+    except ValueError:
+        print("Error: dates must be in YYYY-MM-DD format", file=sys.stderr)
+        sys.exit(1)
+
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    url = os.getenv('SUPABASE_URL')
+    key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    if not url or not key:
+        print("Error: set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in your .env file", file=sys.stderr)
+        sys.exit(1)
+
+    client = create_client(url, key)
+    filters = {'event_name': args.feature, 'event_type': args.action, 'platform': args.platform}
+    output = args.output or f"tracking_events{EXPORT_FORMATS[args.format]}"
+
+    def report(progress):
+        print(f"\rExported {progress}", end='', file=sys.stderr, flush=True)
+
+    try:
+        progress = export_chunks(supabase_chunks(client, filters, start, end, args.page_size),
+                                 output, args.format, ExportProgress(report))
+    except (RuntimeError, ValueError) as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"\nWrote {progress.rows} rows to {output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Feature usage charts for the BijbelQuiz admin dashboard
+Draws the four-panel feature usage figure onto any matplotlib Figure, so the same
+charts are used inside the Tk dashboard and by the headless batch renderer
+"""
+from datetime import timedelta
+
+import matplotlib
+import numpy as np
+
+from tracking_analytics import (choose_resolution, resample_counts, downsample_series, RESOLUTIONS,
+                                MAX_CHART_BARS, MAX_LINE_POINTS)
+
+FEATURE_FIGURE_SIZE = (10, 16)
+
+
+def draw_time_series(state, start, end):
+    """Draw the event type bars and activity trend for [start, end] from the daily counts in state"""
+    daily = state['daily']
+    events_ax = state['events_ax']
+    trend_ax = state['trend_ax']
+
+    # Remove what was drawn for the previous range
+    for artist in state['artists']:
+        artist.remove()
+    state['artists'] = []
+    state['range'] = (start, end)
+
+    # Bars: few enough buckets to stay readable
+    bar_freq, bar_label = choose_resolution(start, end, MAX_CHART_BARS)
+    bar_days = next(days for freq, _, days in RESOLUTIONS if freq == bar_freq)
+    event_counts = resample_counts(daily, bar_freq, start, end)
+    colors = matplotlib.colormaps['tab10'](np.arange(len(daily.columns)) % 10)
+    bottom = np.zeros(len(event_counts))
+    handles = []
+    for color, event_type in zip(colors, daily.columns):
+        if event_counts.empty:
+            break
+        values = event_counts[event_type].to_numpy()
+        bars = events_ax.bar(event_counts.index, values, width=bar_days * 0.8, bottom=bottom,
+                             color=color, align='edge', label=event_type)
+        state['artists'].append(bars)
+        handles.append(bars)
+        bottom = bottom + values
+    state.setdefault('legend_handles', handles)
+    events_ax.set_title(f'Event Types Over Time (per {bar_label})')
+
+    # Line: fine resolution, then LTTB down to a constant number of points
+    line_freq, line_label = choose_resolution(start, end, MAX_LINE_POINTS * 10)
+    trend = downsample_series(resample_counts(daily.sum(axis=1), line_freq, start, end))
+    line, = trend_ax.plot(trend.index, trend.to_numpy(), marker='o' if len(trend) <= 60 else None,
+                          color='tab:blue')
+    state['artists'].append(line)
+    trend_ax.set_title(f'Activity Trend (per {line_label}, {len(trend)} points)')
+
+    for ax in (events_ax, trend_ax):
+        ax.tick_params(axis='x', rotation=45)
+        ax.relim()
+        ax.autoscale_view(scalex=False, scaley=True)
+
+
+def _no_data(ax, title, message='No data available'):
+    ax.text(0.5, 0.5, message, horizontalalignment='center',
+            verticalalignment='center', transform=ax.transAxes)
+    ax.set_title(title)
+
+
+def draw_feature_figure(fig, feature_name, feature_daily, platform_counts, version_counts, tight_layout=True):
+    """Draw the four feature usage panels onto fig
+
+    feature_daily holds the feature's daily counts per event_type (a slice of
+    daily_event_counts); platform_counts and version_counts are value counts.
+    tight_layout=False uses fixed margins instead, which saves a full draw pass.
+    Returns the time-series state, or None when there is no daily data.
+    """
+    axes = fig.subplots(4, 1)
+    fig.suptitle(f'Feature Usage Analysis: {feature_name}', fontsize=14)
+
+    # Time-series panels (1 and 3) share the time axis and are drawn from the
+    # precomputed daily counts at a resolution that fits the visible range
+    axes[2].sharex(axes[0])
+    state = None
+    if feature_daily is not None and not feature_daily.empty:
+        state = {
+            'daily': feature_daily,
+            'events_ax': axes[0],
+            'trend_ax': axes[2],
+            'artists': [],
+            'range': None,
+        }
+        start, end = feature_daily.index.min(), feature_daily.index.max()
+        draw_time_series(state, start, end)
+
+        # Fix the x range so redraws never trigger autoscaling (and another redraw)
+        axes[0].set_xlim(start, end + timedelta(days=1))
+        axes[0].set_autoscalex_on(False)
+        axes[2].set_autoscalex_on(False)
+        axes[0].set_xlabel('Date')
+        axes[0].set_ylabel('Event Count')
+        axes[2].set_xlabel('Date')
+        axes[2].set_ylabel('Event Count')
+        axes[0].legend(handles=state['legend_handles'], title='event_type', fontsize=8)
+    else:
+        _no_data(axes[0], 'Event Types Over Time')
+        _no_data(axes[2], 'Daily Activity Trend')
+
+    # Plot 2: Platform distribution
+    if platform_counts is not None and not platform_counts.empty:
+        axes[1].pie(platform_counts.values, labels=platform_counts.index, autopct='%1.1f%%')
+        axes[1].set_title('Platform Distribution')
+    else:
+        _no_data(axes[1], 'Platform Distribution', 'No platform data')
+
+    # Plot 4: App version distribution
+    if version_counts is not None and not version_counts.empty:
+        axes[3].bar(version_counts.index, version_counts.values)
+        axes[3].set_title('App Version Distribution')
+        axes[3].set_xlabel('App Version')
+        axes[3].set_ylabel('Event Count')
+        axes[3].tick_params(axis='x', rotation=45)
+    else:
+        _no_data(axes[3], 'App Version Distribution', 'No version data')
+
+    # Adjust layout to prevent overlap
+    if tight_layout:
+        fig.tight_layout()
+    else:
+        fig.subplots_adjust(left=0.1, right=0.95, top=0.95, bottom=0.05, hspace=0.45)
+    return state
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Headless batch rendering of per-feature usage reports
+
+Renders the dashboard's four-panel feature usage chart for every feature (or the
+top N by usage) as PNG or SVG files in parallel, plus an index.html linking them.
+Charts are drawn with the Agg canvas directly, so no display is needed.
+
+Usage:
+    python render_feature_reports.py --output reports/ --top 100
+    python render_feature_reports.py --input tracking_events.ndjson --format svg
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from tracking_analytics import daily_event_counts, default_workers, iter_supabase_pages, iter_page_frames
+from feature_charts import draw_feature_figure, FEATURE_FIGURE_SIZE
+
+REPORT_COLUMNS = ['event_name', 'event_type', 'timestamp', 'platform', 'app_version']
+
+
+def load_events(path=None):
+    """Tracking events from an exported file (csv, ndjson or parquet), or from Supabase"""
+    if path:
+        if path.endswith('.parquet'):
+            df = pd.read_parquet(path, columns=REPORT_COLUMNS)
+        elif path.endswith('.ndjson') or path.endswith('.jsonl'):
+            df = pd.read_json(path, lines=True)[REPORT_COLUMNS]
+        else:
+            df = pd.read_csv(path, usecols=REPORT_COLUMNS)
+    else:
+        from dotenv import load_dotenv
+        from supabase import create_client
+
+        load_dotenv()
+        url = os.getenv('SUPABASE_URL')
+        key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+        if not url or not key:
+            raise RuntimeError("set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in your .env file")
+
+        pages = iter_supabase_pages(create_client(url, key), 'tracking_events', columns=','.join(REPORT_COLUMNS))
+        frames = list(iter_page_frames(pages, 100_000))
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=REPORT_COLUMNS)
+
+    df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
+    return df
+
+
+def feature_jobs(df, top=None):
+    """Per-feature chart inputs, computed with one groupby each instead of one filter per feature"""
+    usage = df['event_name'].value_counts()
+    if top:
+        usage = usage.head(top)
+
+    daily = daily_event_counts(df)
+    platforms = df.groupby(['event_name', 'platform']).size()
+    versions = df.groupby(['event_name', 'app_version']).size()
+
+    def counts_for(counts, feature):
+        try:
+            return counts.xs(feature).sort_values(ascending=False)
+        except KeyError:
+            return pd.Series(dtype='int64')
+
+    for feature, count in usage.items():
+        try:
+            feature_daily = daily.xs(feature)
+        except KeyError:
+            feature_daily = None
+        yield feature, int(count), feature_daily, counts_for(platforms, feature), counts_for(versions, feature)
+
+
+def _file_name(rank, feature, fmt):
+    """Safe, unique file name for a feature's chart (the usage rank keeps names distinct)"""
+    return f"{rank:04d}_{re.sub(r'[^A-Za-z0-9_.-]+', '_', str(feature))}.{fmt}"
+
+
+def render_feature(job, path, fmt, dpi):
+    """Render one feature's chart to path"""
+    feature, _, feature_daily, platform_counts, version_counts = job
+    fig = Figure(figsize=FEATURE_FIGURE_SIZE)
+    FigureCanvasAgg(fig)
+    # Fixed margins: tight_layout would cost an extra full draw per chart
+    draw_feature_figure(fig, feature, feature_daily, platform_counts, version_counts, tight_layout=False)
+    fig.savefig(path, format=fmt, dpi=dpi)
+
+
+def _render_job(args):
+    return render_feature(*args)
+
+
+def write_index(output_dir, rendered, generated_at):
+    """Write index.html listing every rendered chart, most used feature first"""
+    rows = "\n".join(
+        f'<li><a href="#{html.escape(file_name)}">{html.escape(str(feature))}</a> ({count} events)</li>'
+        for feature, count, file_name in rendered
+    )
+    charts = "\n".join(
+        f'<section id="{html.escape(file_name)}"><h2>{html.escape(str(feature))}</h2>'
+        f'<img src="{html.escape(file_name)}" alt="{html.escape(str(feature))}" loading="lazy"></section>'
+        for feature, _, file_name in rendered
+    )
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>BijbelQuiz Feature Usage Report</title>
+<style>body {{ font-family: sans-serif; margin: 2em; }} img {{ max-width: 100%; }}</style>
+</head>
+<body>
+<h1>BijbelQuiz Feature Usage Report</h1>
+<p>Generated {generated_at:%Y-%m-%d %H:%M} UTC, {len(rendered)} features.</p>
+<ul>
+{rows}
+</ul>
+{charts}
+</body>
+</html>
+""")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render feature usage charts for every feature without a display')
+    parser.add_argument('--input', '-i', help='Exported tracking events (csv, ndjson or parquet); default reads Supabase')
+    parser.add_argument('--output', '-o', default='feature_reports', help='Output directory (default: feature_reports)')
+    parser.add_argument('--format', '-f', choices=['png', 'svg'], default='png', help='Image format (default: png)')
+    parser.add_argument('--top', type=int, help='Only render the N most used features')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='Worker processes (default: one per core)')
+    parser.add_argument('--dpi', type=int, default=100, help='Resolution for PNG output (default: 100)')
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        df = load_events(args.input)
+    except (OSError, ValueError, KeyError, RuntimeError) as e:
+        print(f"Error: failed to load tracking events: {e}", file=sys.stderr)
+        sys.exit(1)
+    if df.empty:
+        print("No tracking events to report on", file=sys.stderr)
+        sys.exit(1)
+
+    os.makedirs(args.output, exist_ok=True)
+    jobs = list(feature_jobs(df, args.top))
+    print(f"Rendering {len(jobs)} features with {args.workers} workers...", file=sys.stderr)
+
+    file_names = [_file_name(rank, job[0], args.format) for rank, job in enumerate(jobs, 1)]
+    tasks = [(job, os.path.join(args.output, file_name), args.format, args.dpi)
+             for job, file_name in zip(jobs, file_names)]
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            list(pool.map(_render_job, tasks, chunksize=max(1, len(tasks) // (args.workers * 4))))
+    else:
+        for task in tasks:
+            _render_job(task)
+
+    rendered = [(job[0], job[1], file_name) for job, file_name in zip(jobs, file_names)]
+    write_index(args.output, rendered, pd.Timestamp.now(tz='UTC'))
+    print(f"Wrote {len(rendered)} charts and index.html to {args.output} in {time.perf_counter() - start:.1f}s",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import pickle
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from tracking_analytics import ErrorSpikeDetector, SessionIndex, top_rows, TrackingAggregates, UserSketches
+
+
+def make_events(n, days, features=200, users=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(n),
+        'event_name': np.char.add('feature_', rng.integers(0, features, n).astype(str)).astype(object),
+        'event_type': rng.choice(['tap', 'view', 'open'], n).astype(object),
+        'platform': rng.choice(['android', 'ios', 'web'], n).astype(object),
+        'app_version': rng.choice(['1.0', '1.1'], n).astype(object),
+        'user_id': np.char.add('user_', rng.integers(0, users, n).astype(str)).astype(object),
+        'timestamp': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, days * 86400, n), unit='s'),
+    }).sort_values('timestamp', ignore_index=True)
+
+
+def test_aggregates_memory_is_bounded_on_long_date_range():
+    # 200 features x 3 actions x 3 platforms x 365 days: far more keys than events,
+    # which a dense register row per key (16 KB at precision 14) could never hold
+    events = make_events(200_000, days=365)
+    aggregates = TrackingAggregates(precision=14, recent_rows=1000)
+
+    tracemalloc.start()
+    try:
+        for start in range(0, len(events), 20_000):
+            aggregates.add(events.iloc[start:start + 20_000])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    frame_bytes = events.memory_usage(deep=True).sum()
+    keys = len(aggregates.sketches.keys)
+    assert keys > 100_000
+    assert aggregates.sketches.nbytes < 20 * len(events)
+    assert aggregates.sketches.nbytes < keys * (1 << 14) // 100
+    assert peak < frame_bytes
+
+
+def test_sketch_reach_honours_action_filter():
+    events = make_events(20_000, days=30, features=5, users=2000)
+    sketches = UserSketches.from_frame(events, precision=14, chunk_rows=5000)
+
+    taps = events[events['event_type'] == 'tap']
+    exact = taps.groupby('event_name')['user_id'].nunique()
+    reach = sketches.reach_by_feature(actions=['tap'])
+    assert set(reach.index) == set(exact.index)
+    assert ((reach[exact.index] / exact - 1).abs() < 0.05).all()
+    assert (reach[exact.index] < events.groupby('event_name')['user_id'].nunique()[exact.index]).all()
+    assert sketches.count(actions=['missing']) == 0
+
+
+def test_sketch_save_and_load_keep_actions(tmp_path):
+    events = make_events(5000, days=10, features=4, users=500)
+    sketches = UserSketches.from_frame(events, precision=12)
+    path = tmp_path / 'sketches.npz'
+    sketches.save(path)
+    loaded = UserSketches.load(path)
+
+    for action in ['tap', 'view', 'open']:
+        assert loaded.count(actions=[action]) == sketches.count(actions=[action])
+    pd.testing.assert_frame_equal(loaded.keys, sketches.keys)
+
+
+def test_pickled_sketches_are_compact_and_merge_like_the_original():
+    events = make_events(20_000, days=30, features=20, users=2000)
+    first = UserSketches.from_frame(events.iloc[:10_000], precision=14)
+    second = UserSketches.from_frame(events.iloc[10_000:], precision=14)
+    restored = pickle.loads(pickle.dumps(second))
+
+    assert len(restored._dense) == restored._dense_count
+    assert restored.count() == second.count()
+    assert first.merge(restored).count() == UserSketches.from_frame(events, precision=14).count()
+
+
+def test_top_rows_keeps_ties_in_order_and_missing_last():
+    df = pd.DataFrame({
+        'id': [0, 1, 2, 3, 4, 5],
+        'name': ['b', None, 'A', 'a', 'B', np.nan],
+        'count': [2, np.nan, 1, 1, 2, np.nan],
+    })
+
+    assert top_rows(df, 'name', 6, descending=True)['id'].tolist() == [0, 4, 2, 3, 1, 5]
+    assert top_rows(df, 'name', 6, descending=False)['id'].tolist() == [2, 3, 0, 4, 1, 5]
+    assert top_rows(df, 'name', 3, descending=True)['id'].tolist() == [0, 4, 2]
+    assert top_rows(df, 'count', 6, descending=True)['id'].tolist() == [0, 4, 2, 3, 1, 5]
+    assert top_rows(df, 'count', 6, descending=False)['id'].tolist() == [2, 3, 0, 4, 1, 5]
+    assert top_rows(df, 'name', 6)['name'].isna().tolist() == [False] * 4 + [True] * 2
+
+
+def test_error_spike_detector_counts_late_rows():
+    start = pd.Timestamp('2025-01-01', tz='UTC')
+
+    def errors(*minutes):
+        return pd.DataFrame({'app_version': '1.0', 'error_type': 'crash',
+                             'timestamp': [start + pd.Timedelta(minutes=minute) for minute in minutes]})
+
+    detector = ErrorSpikeDetector(window_minutes=15)
+
+    detector.add(errors(0, 1, 20))
+    detector.add(errors(2, 3, 21))
+
+    assert detector.scores()['count'].tolist() == [2]
+    assert detector.late_rows == 2
+    assert ErrorSpikeDetector.from_dict(detector.to_dict()).late_rows == 2
+
+
+def test_session_summary_matches_groupby_with_tz_aware_timestamps():
+    events = make_events(5000, days=3, users=50)
+    events['timestamp'] = events['timestamp'].dt.tz_localize('UTC')
+    events['session_id'] = events['user_id'] + '-' + events['timestamp'].dt.day.astype(str)
+    events.loc[::97, 'session_id'] = None
+
+    summary = SessionIndex(events.sample(frac=1, random_state=0)).summary().set_index('session_id')
+    grouped = events.dropna(subset=['session_id']).groupby('session_id')['timestamp']
+
+    assert summary['start'].dt.tz is not None
+    assert (summary['start'] == grouped.min()[summary.index]).all()
+    assert (summary['end'] == grouped.max()[summary.index]).all()
+    assert (summary['event_count'] == grouped.size()[summary.index]).all()
+
+
+def test_aggregates_count_rows_without_event_type_as_unknown():
+    events = make_events(2000, days=5, features=3, users=100)
+    events.loc[::10, 'event_type'] = None
+    aggregates = TrackingAggregates(precision=12)
+    aggregates.add(events)
+
+    overview = aggregates.feature_overview(action='unknown')
+    assert aggregates.stats['count'].sum() == len(events)
+    assert overview['count'].sum() == events['event_type'].isna().sum()
+    assert set(aggregates.sketches.reach_by_feature(actions=['unknown']).index) == set(overview.index)
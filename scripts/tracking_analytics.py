@@ -0,0 +1,1535 @@
+"""
+Tracking analytics for the BijbelQuiz admin dashboard
+Vectorised pandas/numpy computations over tracking_events and error_reports that
+do not depend on the Tk interface, so they can also be used from headless scripts
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from typing import List, Dict, Any, Optional
+
+
+def to_epoch_ns(timestamps):
+    """Convert a datetime Series (naive or tz-aware) to int64 nanoseconds since epoch"""
+    if getattr(timestamps.dt, 'tz', None) is not None:
+        timestamps = timestamps.dt.tz_convert(None)
+    return timestamps.to_numpy(dtype='datetime64[ns]').view('int64')
+
+
+def _run_starts(codes):
+    """Boolean mask marking the first element of each run of equal values in a sorted array"""
+    mask = np.empty(len(codes), dtype=bool)
+    if len(codes):
+        mask[0] = True
+        mask[1:] = codes[1:] != codes[:-1]
+    return mask
+
+
+def _run_ends(codes):
+    """Boolean mask marking the last element of each run of equal values in a sorted array"""
+    mask = np.empty(len(codes), dtype=bool)
+    if len(codes):
+        mask[-1] = True
+        mask[:-1] = codes[1:] != codes[:-1]
+    return mask
+
+
+class SessionIndex:
+    """Tracking events sorted once by (session, timestamp) for vectorised per-session analysis
+
+    Sessions are contiguous runs in the sorted frame, so every per-session value is
+    computed from run boundaries (diff/cumsum) instead of looping over sessions.
+    Sessions are numbered in order of first appearance, which is also the order of
+    session_ids and of the summary rows.
+    """
+
+    def __init__(self, df):
+        events = df[df['session_id'].notna()]
+        # Sort on integer session codes and epoch nanoseconds rather than the string columns
+        codes, self.session_ids = pd.factorize(events['session_id'])
+        times = to_epoch_ns(events['timestamp']) if len(events) else np.empty(0, dtype='int64')
+        order = np.lexsort((times, codes))
+        self.events = events.iloc[order].reset_index(drop=True)
+        self.codes = codes[order]
+        self.times = times[order]
+        self.starts = np.flatnonzero(_run_starts(self.codes))
+        self.ends = np.flatnonzero(_run_ends(self.codes))
+
+    def __len__(self):
+        return len(self.session_ids)
+
+    def _first_last_screens(self):
+        """Return entry and exit screen per session from the rows that have a screen_name"""
+        entry = np.full(len(self), None, dtype=object)
+        exit_ = np.full(len(self), None, dtype=object)
+        if 'screen_name' not in self.events:
+            return entry, exit_
+
+        screens = self.events['screen_name'].to_numpy(dtype=object)
+        positions = np.flatnonzero(pd.notna(screens))
+        screen_codes = self.codes[positions]
+
+        first = _run_starts(screen_codes)
+        last = _run_ends(screen_codes)
+        entry[screen_codes[first]] = screens[positions[first]]
+        exit_[screen_codes[last]] = screens[positions[last]]
+        return entry, exit_
+
+    def summary(self):
+        """Per-session length, event count and entry/exit screen"""
+        if not len(self):
+            return pd.DataFrame(columns=['session_id', 'user_id', 'platform', 'start', 'end',
+                                         'duration_seconds', 'event_count', 'entry_screen', 'exit_screen'])
+
+        entry, exit_ = self._first_last_screens()
+        # Take from the column arrays directly: to_numpy() on tz-aware timestamps builds one
+        # Timestamp object per row
+        timestamps = self.events['timestamp'].array
+        return pd.DataFrame({
+            'session_id': self.session_ids,
+            'user_id': self.events['user_id'].array[self.starts],
+            'platform': self.events['platform'].array[self.starts] if 'platform' in self.events else None,
+            'start': timestamps[self.starts],
+            'end': timestamps[self.ends],
+            'duration_seconds': (self.times[self.ends] - self.times[self.starts]) / 1e9,
+            'event_count': self.ends - self.starts + 1,
+            'entry_screen': entry,
+            'exit_screen': exit_,
+        })
+
+    def _step_mask(self, step):
+        """Rows matching a funnel step, either by event_name or by screen_name"""
+        mask = self.events['event_name'] == step
+        if 'screen_name' in self.events:
+            mask |= self.events['screen_name'] == step
+        return mask.to_numpy(dtype=bool)
+
+    def funnel(self, steps: List[str]):
+        """Ordered funnel: sessions reaching each step after having reached all previous steps
+
+        Each step is matched against event_name or screen_name. The loop runs over the
+        steps only; the per-session work is vectorised.
+        """
+        columns = ['Step', 'Sessions', 'FromStart', 'FromPrevious', 'MedianSecondsFromPrevious']
+        if not len(self) or not steps:
+            return pd.DataFrame(columns=columns)
+
+        n_sessions = len(self)
+        # Position in the sorted frame at which each session reached the previous step
+        reached = np.full(n_sessions, -1, dtype=np.int64)
+        alive = np.ones(n_sessions, dtype=bool)
+
+        rows = []
+        first_count = None
+        previous_count = None
+        for step in steps:
+            candidates = np.flatnonzero(self._step_mask(step))
+            candidate_codes = self.codes[candidates]
+            valid = alive[candidate_codes] & (candidates > reached[candidate_codes])
+            candidates = candidates[valid]
+            candidate_codes = candidate_codes[valid]
+
+            # Candidates are sorted by position, so the first per session is the earliest match
+            first = _run_starts(candidate_codes)
+            hit_codes = candidate_codes[first]
+            hit_positions = candidates[first]
+
+            if previous_count is None:
+                median_gap = np.nan
+            else:
+                gaps = self.times[hit_positions] - self.times[reached[hit_codes]]
+                median_gap = float(np.median(gaps)) / 1e9 if len(gaps) else np.nan
+
+            alive = np.zeros(n_sessions, dtype=bool)
+            alive[hit_codes] = True
+            reached[hit_codes] = hit_positions
+
+            count = len(hit_codes)
+            if first_count is None:
+                first_count = count
+            rows.append({
+                'Step': step,
+                'Sessions': count,
+                'FromStart': (count / first_count * 100) if first_count else 0.0,
+                'FromPrevious': (count / previous_count * 100) if previous_count else (100.0 if previous_count is None else 0.0),
+                'MedianSecondsFromPrevious': median_gap,
+            })
+            previous_count = count
+
+        return pd.DataFrame(rows, columns=columns)
+
+
+DAY_NS = 86400 * 10**9
+
+
+def week_index(epoch_ns):
+    """Index of the Monday-starting week containing each timestamp (1970-01-01 was a Thursday)"""
+    return (np.floor_divide(epoch_ns, DAY_NS) + 3) // 7
+
+
+def week_start(index):
+    """Monday date of a week index returned by week_index"""
+    return pd.Timestamp(0) + pd.Timedelta(days=int(index) * 7 - 3)
+
+
+def filter_events(df, platform=None, app_version=None):
+    """Restrict events to a platform and/or app version ('All' or empty means no filter)"""
+    if platform and platform != 'All':
+        df = df[df['platform'] == platform]
+    if app_version and app_version != 'All':
+        df = df[df['app_version'] == app_version]
+    return df
+
+
+def iter_time_chunks(df, max_rows: int, columns: Optional[List[str]] = None):
+    """Yield consecutive time-range slices of a frame holding roughly max_rows rows each
+
+    The frame is not sorted or copied as a whole; each chunk is selected by a time
+    window, so intermediate results are bounded by the chunk size.
+    """
+    if df.empty:
+        return
+    if columns is not None:
+        df = df[columns]
+    if len(df) <= max_rows:
+        yield df
+        return
+
+    times = to_epoch_ns(df['timestamp'])
+    n_chunks = -(-len(df) // max_rows)
+    # Integer edges: float linspace loses nanoseconds at epoch scale and could drop the last rows
+    first, stop = int(times.min()), int(times.max()) + 1
+    edges = [first + (stop - first) * i // n_chunks for i in range(n_chunks + 1)]
+    for lower, upper in zip(edges[:-1], edges[1:]):
+        chunk = df[(times >= lower) & (times < upper)]
+        if not chunk.empty:
+            yield chunk
+
+
+class RetentionCohorts:
+    """Weekly retention cohorts keyed on user_id, folded chunk by chunk
+
+    Each chunk is reduced to its distinct (user_id, week) activity pairs, which is all
+    the cohort matrix needs, so memory is bounded by users x active weeks rather than
+    by the number of events.
+    """
+
+    # Compact the pending pair frames once this many have been added
+    COMPACT_EVERY = 16
+
+    def __init__(self):
+        self._pairs = []
+
+    def add(self, events):
+        """Fold a chunk of tracking events into the activity pairs"""
+        events = events[events['user_id'].notna()]
+        if events.empty:
+            return
+        pairs = pd.DataFrame({
+            'user_id': events['user_id'].to_numpy(),
+            'week': week_index(to_epoch_ns(events['timestamp'])).astype('int32'),
+        }).drop_duplicates()
+        self._pairs.append(pairs)
+        if len(self._pairs) >= self.COMPACT_EVERY:
+            self._pairs = [pd.concat(self._pairs, ignore_index=True).drop_duplicates()]
+
+    @property
+    def empty(self):
+        return not self._pairs
+
+    def merge(self, other):
+        """Fold the activity pairs of another set of cohorts into this one"""
+        self._pairs.extend(other._pairs)
+        return self
+
+    @classmethod
+    def from_frame(cls, df, chunk_rows: int = 1_000_000):
+        """Build cohorts from an in-memory frame, chunking it by time range"""
+        cohorts = cls()
+        for chunk in iter_time_chunks(df, chunk_rows, columns=['user_id', 'timestamp']):
+            cohorts.add(chunk)
+        return cohorts
+
+    def matrix(self, max_weeks: Optional[int] = None):
+        """Return (sizes, retention) indexed by cohort week start
+
+        retention[W][k] is the fraction of users first seen in week W that were active
+        in week W + k. Offsets that lie beyond the last observed week are NaN.
+        """
+        if not self._pairs:
+            return pd.Series(dtype='int64'), pd.DataFrame()
+
+        pairs = pd.concat(self._pairs, ignore_index=True).drop_duplicates()
+        self._pairs = [pairs]
+
+        first_week = pairs.groupby('user_id', sort=False)['week'].transform('min').to_numpy()
+        offsets = pairs['week'].to_numpy() - first_week
+
+        cohort_weeks, cohort_codes = np.unique(first_week, return_inverse=True)
+        n_offsets = int(offsets.max()) + 1
+        if max_weeks is not None:
+            n_offsets = min(n_offsets, max_weeks + 1)
+            keep = offsets < n_offsets
+            cohort_codes, offsets = cohort_codes[keep], offsets[keep]
+
+        # Sparse (cohort, offset) pairs counted into a dense weeks x weeks grid
+        counts = np.bincount(cohort_codes * n_offsets + offsets,
+                             minlength=len(cohort_weeks) * n_offsets).reshape(len(cohort_weeks), n_offsets)
+
+        index = pd.Index([week_start(w) for w in cohort_weeks], name='cohort')
+        sizes = pd.Series(counts[:, 0], index=index, name='users')
+        retention = counts / counts[:, [0]]
+
+        # Weeks that have not happened yet for a cohort are unknown, not zero
+        last_week = int(pairs['week'].max())
+        observable = (cohort_weeks[:, None] + np.arange(n_offsets)[None, :]) <= last_week
+        retention = np.where(observable, retention, np.nan)
+
+        return sizes, pd.DataFrame(retention, index=index, columns=pd.RangeIndex(n_offsets, name='week'))
+
+
+# HyperLogLog sketches for approximate distinct-user counts
+DEFAULT_HLL_PRECISION = 14
+_UINT64 = np.uint64
+
+
+def precision_for_error(relative_error: float):
+    """Smallest HyperLogLog precision whose standard error (1.04 / sqrt(2^p)) is within relative_error"""
+    precision = int(np.ceil(np.log2((1.04 / relative_error) ** 2)))
+    return min(max(precision, 4), 18)
+
+
+def hash_values(values):
+    """Stable 64-bit hashes of identifiers (hashed as strings, so '42' and 42 collide on purpose)"""
+    series = pd.Series(values, copy=False)
+    return pd.util.hash_pandas_object(series.astype(str), index=False).to_numpy(dtype=_UINT64)
+
+
+def _leading_zeros(values):
+    """Count leading zero bits of each uint64 by binary search over shifts"""
+    values = values.copy()
+    zeros = np.zeros(len(values), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        top_empty = values < (_UINT64(1) << _UINT64(64 - shift))
+        zeros += np.where(top_empty, shift, 0).astype(np.uint8)
+        values = np.where(top_empty, values << _UINT64(shift), values)
+    zeros += (values == 0).astype(np.uint8)
+    return zeros
+
+
+def hll_index_rank(hashes, precision: int):
+    """Register index and rank (position of the first 1 bit) for each hash"""
+    index = (hashes >> _UINT64(64 - precision)).astype(np.int64)
+    remainder = hashes << _UINT64(precision)
+    rank = np.minimum(_leading_zeros(remainder), 64 - precision) + 1
+    return index, rank.astype(np.uint8)
+
+
+def _hll_estimate(m: int, harmonic, empty):
+    """Cardinality estimate from the sum of 2^-register and the number of empty registers"""
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    estimate = alpha * m * m / harmonic
+
+    # Small-range correction: linear counting while empty registers remain
+    linear = m * np.log(m / np.maximum(empty, 1))
+    return np.where((estimate <= 2.5 * m) & (empty > 0), linear, estimate)
+
+
+def hll_estimate(registers):
+    """Cardinality estimate for one register array, or for each row of a 2D stack"""
+    registers = np.asarray(registers)
+    harmonic = np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    return _hll_estimate(registers.shape[-1], harmonic, np.sum(registers == 0, axis=-1))
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch"""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def add(self, values):
+        """Add identifiers to the sketch"""
+        index, rank = hll_index_rank(hash_values(values), self.precision)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        """Union with another sketch of the same precision"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def count(self):
+        return int(round(float(hll_estimate(self.registers))))
+
+
+class UserSketches:
+    """HyperLogLog sketches of distinct user_ids per (feature, action, day, platform)
+
+    Sketches are built while loading and merged by register-wise max, so the number
+    of unique users over any combination of features, actions, date range and
+    platforms is a union of stored sketches instead of a nunique over the raw events.
+
+    Most keys see only a few users, so sketches are stored sparsely: one sorted
+    array of slots (key code << precision | register) with the rank of each
+    non-empty register. A key moves to a dense row of registers only once its
+    sparse entries would take more room than the row. Memory therefore follows the
+    number of distinct (key, register) pairs and never exceeds one dense row per key.
+    New entries are buffered and compacted once the buffer is as large as the
+    store, so folding in chunks costs amortised O(n log n).
+    """
+
+    KEY_COLUMNS = ['feature', 'action', 'day', 'platform']
+    # An int64 slot plus a uint8 rank per sparse entry
+    SPARSE_ENTRY_BYTES = 9
+    # Dense rows are copied in blocks of this many when reducing, to bound temporaries
+    DENSE_BLOCK_ROWS = 1024
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        self.precision = precision
+        self._codes = {}
+        self._key_rows = []
+        self._keys = None
+        self._slots = np.empty(0, dtype=np.int64)
+        self._ranks = np.empty(0, dtype=np.uint8)
+        self._pending = []
+        self._pending_size = 0
+        # Key code -> row of self._dense, or -1 while the key is sparse
+        self._dense_row = np.empty(0, dtype=np.int64)
+        self._dense = np.zeros((0, 1 << precision), dtype=np.uint8)
+        self._dense_count = 0
+
+    def __getstate__(self):
+        """Pickle only compacted entries and the dense rows in use (e.g. for process pool partials)"""
+        self._compact()
+        state = self.__dict__.copy()
+        state.update(_codes=None, _keys=None, _dense=self._dense[:self._dense_count],
+                     _dense_row=self._dense_row[:len(self._key_rows)])
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._codes = {key: code for code, key in enumerate(self._key_rows)}
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(1 << self.precision)
+
+    @property
+    def keys(self):
+        """The stored (feature, action, day, platform) keys, in key code order"""
+        if self._keys is None:
+            columns = list(zip(*self._key_rows)) if self._key_rows else [(), (), (), ()]
+            self._keys = pd.DataFrame({
+                'feature': pd.Series(columns[0], dtype=object),
+                'action': pd.Series(columns[1], dtype=object),
+                'day': np.asarray(columns[2], dtype=np.int64).view('datetime64[ns]'),
+                'platform': pd.Series(columns[3], dtype=object),
+            })
+        return self._keys
+
+    @property
+    def nbytes(self):
+        """Memory held by the sketch registers (sparse entries, pending entries and dense rows)"""
+        return (self._slots.nbytes + self._ranks.nbytes + self._dense.nbytes + self._dense_row.nbytes
+                + sum(slots.nbytes + ranks.nbytes for slots, ranks in self._pending))
+
+    @classmethod
+    def from_frame(cls, df, precision: int = DEFAULT_HLL_PRECISION, chunk_rows: int = 1_000_000):
+        """Build sketches from an in-memory frame, chunk by chunk"""
+        sketches = cls(precision)
+        columns = ['event_name', 'event_type', 'platform', 'user_id', 'timestamp']
+        for chunk in iter_time_chunks(df, chunk_rows, columns=columns):
+            sketches.add(chunk)
+        return sketches
+
+    def _key_codes(self, keys):
+        """Codes of key tuples, registering keys not seen before"""
+        codes = np.empty(len(keys), dtype=np.int64)
+        for position, key in enumerate(keys):
+            code = self._codes.get(key)
+            if code is None:
+                code = self._codes[key] = len(self._key_rows)
+                self._key_rows.append(key)
+                self._keys = None
+            codes[position] = code
+        return codes
+
+    def add(self, events):
+        """Fold a chunk of tracking events into the sketches"""
+        events = events[events['user_id'].notna()]
+        if events.empty:
+            return
+
+        keys = pd.DataFrame({
+            'feature': events['event_name'].to_numpy(dtype=object),
+            'action': events['event_type'].fillna('unknown').to_numpy(dtype=object),
+            'day': to_epoch_ns(events['timestamp']) // DAY_NS * DAY_NS,
+            'platform': events['platform'].fillna('unknown').to_numpy(dtype=object),
+        })
+        local_codes = keys.groupby(self.KEY_COLUMNS, sort=False, dropna=False).ngroup().to_numpy()
+        first_rows = pd.Series(np.arange(len(local_codes))).groupby(local_codes).first().to_numpy()
+        group_keys = keys.iloc[first_rows]
+        codes = self._key_codes(list(zip(*(group_keys[column].tolist() for column in self.KEY_COLUMNS))))
+
+        index, rank = hll_index_rank(hash_values(events['user_id'].to_numpy()), self.precision)
+        self._append((codes[local_codes] << self.precision) | index, rank)
+
+    def _append(self, slots, ranks):
+        self._pending.append((slots, ranks))
+        self._pending_size += len(slots)
+        # Compacting once the buffer matches the store keeps the total work amortised
+        if self._pending_size >= max(len(self._slots), 1 << 16):
+            self._compact()
+
+    def _dense_rows_for(self, codes):
+        """Allocate dense rows for keys, growing the dense matrix geometrically"""
+        needed = self._dense_count + len(codes)
+        if needed > len(self._dense):
+            grown = np.zeros((max(needed, 2 * len(self._dense), 16), 1 << self.precision), dtype=np.uint8)
+            grown[:self._dense_count] = self._dense[:self._dense_count]
+            self._dense = grown
+        rows = np.arange(self._dense_count, needed)
+        self._dense_row[codes] = rows
+        self._dense_count = needed
+        return rows
+
+    def _compact(self):
+        """Fold pending entries into the store: dedupe by max rank and promote full keys to dense rows"""
+        if len(self._dense_row) < len(self._key_rows):
+            grown = np.full(max(len(self._key_rows), 2 * len(self._dense_row)), -1, dtype=np.int64)
+            grown[:len(self._dense_row)] = self._dense_row
+            self._dense_row = grown
+        if not self._pending:
+            return
+
+        slots = np.concatenate([self._slots] + [slots for slots, _ in self._pending])
+        ranks = np.concatenate([self._ranks] + [ranks for _, ranks in self._pending])
+        self._pending = []
+        self._pending_size = 0
+        mask = np.int64((1 << self.precision) - 1)
+
+        # Entries of keys that are already dense go straight into their rows
+        rows = self._dense_row[slots >> self.precision]
+        dense = rows >= 0
+        if dense.any():
+            np.maximum.at(self._dense, (rows[dense], slots[dense] & mask), ranks[dense])
+            slots, ranks = slots[~dense], ranks[~dense]
+
+        # Highest rank per slot: sort by (slot, rank) and keep the end of each run
+        order = np.lexsort((ranks, slots))
+        slots, ranks = slots[order], ranks[order]
+        keep = _run_ends(slots)
+        slots, ranks = slots[keep], ranks[keep]
+
+        # Keys whose sparse entries outgrow a dense row become dense
+        key_codes = slots >> self.precision
+        counts = np.bincount(key_codes, minlength=len(self._key_rows)) if len(slots) else np.zeros(0, dtype=np.int64)
+        full = np.flatnonzero(counts * self.SPARSE_ENTRY_BYTES >= (1 << self.precision))
+        if len(full):
+            self._dense_rows_for(full)
+            rows = self._dense_row[key_codes]
+            promoted = rows >= 0
+            self._dense[rows[promoted], slots[promoted] & mask] = ranks[promoted]
+            slots, ranks = slots[~promoted], ranks[~promoted]
+
+        self._slots, self._ranks = slots, ranks
+
+    def merge(self, other):
+        """Merge another store (e.g. from an incremental load) into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        other._compact()
+        codes = self._key_codes(other._key_rows)
+        self._compact()
+
+        if len(other._slots):
+            index = other._slots & np.int64((1 << self.precision) - 1)
+            self._pending.append(((codes[other._slots >> self.precision] << self.precision) | index, other._ranks))
+            self._pending_size += len(other._slots)
+        other_dense = np.flatnonzero(other._dense_row[:len(other._key_rows)] >= 0)
+        if len(other_dense):
+            targets = codes[other_dense]
+            new = targets[self._dense_row[targets] < 0]
+            if len(new):
+                self._dense_rows_for(new)
+            for block in range(0, len(other_dense), self.DENSE_BLOCK_ROWS):
+                source = other._dense_row[other_dense[block:block + self.DENSE_BLOCK_ROWS]]
+                target = self._dense_row[targets[block:block + self.DENSE_BLOCK_ROWS]]
+                self._dense[target] = np.maximum(self._dense[target], other._dense[source])
+        # Also moves this store's sparse entries of newly dense keys into their rows
+        self._pending.append((np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)))
+        self._compact()
+        return self
+
+    def _select(self, features=None, start=None, end=None, platforms=None, actions=None):
+        """Mask of stored sketches matching the features, [start, end) day range, platforms and actions"""
+        keys = self.keys
+        mask = np.ones(len(keys), dtype=bool)
+        if features is not None:
+            mask &= keys['feature'].isin(list(features)).to_numpy()
+        if actions is not None:
+            mask &= keys['action'].isin(list(actions)).to_numpy()
+        if platforms is not None:
+            mask &= keys['platform'].isin(list(platforms)).to_numpy()
+        if start is not None:
+            mask &= (keys['day'] >= _naive_day(start)).to_numpy()
+        if end is not None:
+            mask &= (keys['day'] < _naive_day(end)).to_numpy()
+        return mask
+
+    def union(self, features=None, start=None, end=None, platforms=None, actions=None):
+        """Single sketch covering every matching (feature, action, day, platform)"""
+        self._compact()
+        mask = self._select(features, start, end, platforms, actions)
+        registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        if not mask.any():
+            return HyperLogLog(self.precision, registers)
+
+        dense_rows = self._dense_row[:len(mask)][mask]
+        dense_rows = dense_rows[dense_rows >= 0]
+        for block in range(0, len(dense_rows), self.DENSE_BLOCK_ROWS):
+            np.maximum(registers, self._dense[dense_rows[block:block + self.DENSE_BLOCK_ROWS]].max(axis=0),
+                       out=registers)
+        selected = mask[self._slots >> self.precision]
+        np.maximum.at(registers, self._slots[selected] & np.int64(len(registers) - 1), self._ranks[selected])
+        return HyperLogLog(self.precision, registers)
+
+    def count(self, features=None, start=None, end=None, platforms=None, actions=None):
+        """Approximate number of distinct users matching the selection"""
+        return self.union(features, start, end, platforms, actions).count()
+
+    def _group_estimates(self, groups, n_groups: int):
+        """Estimate distinct users per group, given each key's group code (-1 to skip the key)
+
+        Groups with a dense key are reduced into dense rows; all other groups are
+        estimated straight from their sparse entries, without building registers.
+        """
+        m = 1 << self.precision
+        estimates = np.zeros(n_groups)
+        entry_groups = groups[self._slots >> self.precision]
+        selected = entry_groups >= 0
+        entry_groups = entry_groups[selected]
+        registers = self._slots[selected] & np.int64(m - 1)
+        ranks = self._ranks[selected]
+
+        dense_keys = np.flatnonzero((self._dense_row[:len(groups)] >= 0) & (groups >= 0))
+        if len(dense_keys):
+            dense_groups, positions = np.unique(groups[dense_keys], return_inverse=True)
+            merged = np.zeros((len(dense_groups), m), dtype=np.uint8)
+            for block in range(0, len(dense_keys), self.DENSE_BLOCK_ROWS):
+                keys = dense_keys[block:block + self.DENSE_BLOCK_ROWS]
+                np.maximum.at(merged, positions[block:block + self.DENSE_BLOCK_ROWS], self._dense[self._dense_row[keys]])
+            in_dense = np.isin(entry_groups, dense_groups)
+            np.maximum.at(merged, (np.searchsorted(dense_groups, entry_groups[in_dense]), registers[in_dense]),
+                          ranks[in_dense])
+            estimates[dense_groups] = hll_estimate(merged)
+            entry_groups, registers, ranks = entry_groups[~in_dense], registers[~in_dense], ranks[~in_dense]
+
+        # Sparse groups: highest rank per (group, register), then the estimate from those entries
+        slots = (entry_groups << self.precision) | registers
+        order = np.lexsort((ranks, slots))
+        keep = order[_run_ends(slots[order])]
+        entry_groups, ranks = entry_groups[keep], ranks[keep]
+        sparse_groups = np.unique(entry_groups)
+        filled = np.bincount(entry_groups, minlength=n_groups)[sparse_groups]
+        harmonic = np.bincount(entry_groups, weights=np.exp2(-ranks.astype(np.float64)), minlength=n_groups)
+        estimates[sparse_groups] = _hll_estimate(m, harmonic[sparse_groups] + (m - filled), m - filled)
+        return estimates
+
+    def _grouped_estimates(self, mask, group_values):
+        """Estimate distinct users per group of the selected sketches"""
+        self._compact()
+        if not mask.any():
+            return pd.Series(dtype='int64')
+        codes, uniques = pd.factorize(group_values[mask], sort=True)
+        groups = np.full(len(mask), -1, dtype=np.int64)
+        groups[mask] = codes
+        estimates = self._group_estimates(groups, len(uniques))
+        return pd.Series(np.round(estimates).astype('int64'), index=uniques)
+
+    def reach_by_feature(self, start=None, end=None, platforms=None, features=None, actions=None):
+        """Approximate distinct users per feature"""
+        mask = self._select(features, start, end, platforms, actions)
+        return self._grouped_estimates(mask, self.keys['feature'].to_numpy(dtype=object))
+
+    def active_users(self, freq: str = 'D', features=None, platforms=None, actions=None):
+        """Distinct users per calendar period: 'D' (DAU), 'W' (WAU) or 'M' (MAU)"""
+        mask = self._select(features, None, None, platforms, actions)
+        periods = self.keys['day'].dt.to_period(freq).dt.start_time.to_numpy()
+        return self._grouped_estimates(mask, periods)
+
+    def save(self, path):
+        """Persist the sketches so later loads can merge into them"""
+        self._compact()
+        keys = self.keys
+        dense_keys = np.flatnonzero(self._dense_row[:len(keys)] >= 0)
+        np.savez_compressed(path, precision=self.precision, slots=self._slots, ranks=self._ranks,
+                            dense_keys=dense_keys, dense=self._dense[self._dense_row[dense_keys]],
+                            feature=keys['feature'].to_numpy(dtype=str),
+                            action=keys['action'].to_numpy(dtype=str),
+                            day=keys['day'].to_numpy(dtype='datetime64[ns]').view('int64'),
+                            platform=keys['platform'].to_numpy(dtype=str))
+
+    @classmethod
+    def load(cls, path):
+        """Load sketches written by save()
+
+        Files in the older formats (one dense row per key, keys without an action)
+        still load; their sketches get the action 'unknown'.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            sketches = cls(int(data['precision']))
+            actions = data['action'].astype(object) if 'action' in data else ['unknown'] * len(data['feature'])
+            sketches._key_codes(list(zip(data['feature'].astype(object), actions, data['day'].tolist(),
+                                         data['platform'].astype(object))))
+            sketches._compact()
+            if 'registers' in data:
+                dense_keys, dense = np.arange(len(sketches._key_rows)), data['registers']
+            else:
+                sketches._slots, sketches._ranks = data['slots'], data['ranks']
+                dense_keys, dense = data['dense_keys'], data['dense']
+            if len(dense_keys):
+                rows = sketches._dense_rows_for(dense_keys)
+                sketches._dense[rows] = dense
+        return sketches
+
+
+def _naive_day(value):
+    """Midnight (UTC, timezone-naive) of a date, datetime or string"""
+    value = pd.Timestamp(value)
+    if value.tzinfo is not None:
+        value = value.tz_convert(None)
+    return value.normalize()
+
+
+# Time-series resolution selection and downsampling for long date ranges
+MAX_CHART_BARS = 60
+MAX_LINE_POINTS = 500
+
+# (pandas frequency, label, approximate days per bucket), finest first
+RESOLUTIONS = [('D', 'day', 1), ('W-MON', 'week', 7), ('MS', 'month', 30.44)]
+
+
+def daily_event_counts(df):
+    """Event counts per (event_name, day), one column per event_type
+
+    Computed once per load; every chart range and resolution is derived from it.
+    """
+    days = pd.Series((to_epoch_ns(df['timestamp']) // DAY_NS * DAY_NS).view('datetime64[ns]'), index=df.index)
+    counts = df.groupby([df['event_name'], days, df['event_type'].fillna('unknown')]).size().unstack(fill_value=0)
+    counts.index.names = ['event_name', 'day']
+    return counts
+
+
+def choose_resolution(start, end, max_points: int):
+    """Finest resolution that keeps the [start, end] range within max_points buckets"""
+    span_days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    for freq, label, days in RESOLUTIONS:
+        if span_days / days <= max_points:
+            return freq, label
+    return RESOLUTIONS[-1][:2]
+
+
+def resample_counts(counts, freq: str, start=None, end=None):
+    """Sum daily counts (indexed by day) into buckets of the given frequency within [start, end]"""
+    if start is not None:
+        counts = counts[counts.index >= pd.Timestamp(start)]
+    if end is not None:
+        counts = counts[counts.index <= pd.Timestamp(end)]
+    if counts.empty:
+        return counts
+    return counts.resample(freq, label='left', closed='left').sum()
+
+
+def lttb_indices(x, y, threshold: int):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last point and, for each of threshold - 2 buckets, the point
+    forming the largest triangle with the previously kept point and the average of
+    the next bucket, which preserves peaks and dips far better than averaging.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        lower, upper = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_lower, next_upper = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_lower, next_upper = n - 1, n
+        avg_x = x[next_lower:next_upper].mean()
+        avg_y = y[next_lower:next_upper].mean()
+
+        areas = np.abs((x[previous] - avg_x) * (y[lower:upper] - y[previous])
+                       - (x[previous] - x[lower:upper]) * (avg_y - y[previous]))
+        previous = lower + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def downsample_series(series, threshold: int = MAX_LINE_POINTS):
+    """LTTB-downsample a Series indexed by datetime to at most threshold points"""
+    if len(series) <= threshold:
+        return series
+    x = series.index.to_numpy(dtype='datetime64[ns]').view('int64')
+    return series.iloc[lttb_indices(x, series.to_numpy(), threshold)]
+
+
+# Paginated Supabase reads
+SUPABASE_PAGE_SIZE = 1000
+
+
+def apply_query_filters(query, filters: Optional[Dict[str, Any]] = None):
+    """Apply equality filters ({column: value}, None values skipped) to a Supabase query"""
+    for column, value in (filters or {}).items():
+        if value is not None and value != '' and value != 'All':
+            query = query.eq(column, value)
+    return query
+
+
+def fetch_time_bounds(client, table: str, filters: Optional[Dict[str, Any]] = None, time_column: str = 'timestamp'):
+    """Return (first, last) timestamps of the matching rows, or (None, None) if there are none"""
+    bounds = []
+    for desc in (False, True):
+        query = apply_query_filters(client.table(table).select(time_column), filters)
+        rows = query.order(time_column, desc=desc).limit(1).execute().data
+        if not rows:
+            return None, None
+        bounds.append(pd.Timestamp(rows[0][time_column]))
+    return bounds[0], bounds[1]
+
+
+def iter_supabase_pages(client, table: str, columns: str = '*', filters: Optional[Dict[str, Any]] = None,
+                        start=None, end=None, page_size: int = SUPABASE_PAGE_SIZE,
+                        window: timedelta = None, time_column: str = 'timestamp'):
+    """Yield pages of rows from a Supabase table in time order, within [start, end)
+
+    The range is walked in time windows and paged with offsets inside each window, so
+    offsets stay small however large the table is. Only one page is held at a time.
+    """
+    window = window or timedelta(days=1)
+    if start is None or end is None:
+        first, last = fetch_time_bounds(client, table, filters, time_column)
+        if first is None:
+            return
+        start = start if start is not None else first
+        end = end if end is not None else last + timedelta(microseconds=1)
+    start, end = _utc(start), _utc(end)
+
+    window_start = start
+    while window_start < end:
+        window_end = min(window_start + window, end)
+        offset = 0
+        while True:
+            query = apply_query_filters(client.table(table).select(columns), filters)
+            query = query.gte(time_column, window_start.isoformat()).lt(time_column, window_end.isoformat())
+            rows = query.order(time_column).order('id').range(offset, offset + page_size - 1).execute().data
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                break
+            offset += len(rows)
+        window_start = window_end
+
+
+def iter_page_frames(pages, chunk_rows: int):
+    """Concatenate pages of rows into DataFrames of about chunk_rows rows each"""
+    buffer = []
+    for rows in pages:
+        buffer.extend(rows)
+        if len(buffer) >= chunk_rows:
+            yield pd.DataFrame(buffer)
+            buffer = []
+    if buffer:
+        yield pd.DataFrame(buffer)
+
+
+def _utc(value):
+    """Timezone-aware UTC Timestamp (naive values are taken to be UTC)"""
+    value = pd.Timestamp(value)
+    return value.tz_localize('UTC') if value.tzinfo is None else value.tz_convert('UTC')
+
+
+# Out-of-core aggregation for tracking histories that do not fit in memory
+DEFAULT_RECENT_ROWS = 200_000
+
+
+class TrackingAggregates:
+    """Running aggregates over a stream of tracking event chunks
+
+    Each chunk is folded into per (event_name, event_type, day) counts, user sketches
+    and retention activity pairs, then dropped. Only the newest recent_rows events are
+    kept as raw rows for record-level drilldown, so peak memory is set by the chunk
+    size and recent_rows rather than by the size of the table.
+    """
+
+    STAT_KEYS = ['event_name', 'event_type', 'day']
+    # Compact the pending stat frames once this many have been added
+    COMPACT_EVERY = 16
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION, recent_rows: int = DEFAULT_RECENT_ROWS):
+        self.recent_rows = recent_rows
+        self.rows = 0
+        self.sketches = UserSketches(precision)
+        self.cohorts = {}
+        self._stats = []
+        self._recent = []
+        self._recent_count = 0
+
+    def add(self, events):
+        """Fold a chunk of tracking events (with parsed timestamps) into the aggregates"""
+        if events.empty:
+            return
+        self.rows += len(events)
+        self.sketches.add(events)
+
+        days = pd.Series((to_epoch_ns(events['timestamp']) // DAY_NS * DAY_NS).view('datetime64[ns]'),
+                         index=events.index)
+        # Missing event types count as 'unknown', the action the user sketches file them under
+        stats = events.groupby([events['event_name'], events['event_type'].fillna('unknown'), days]).agg(
+            count=('timestamp', 'size'), last_seen=('timestamp', 'max'))
+        stats.index.names = self.STAT_KEYS
+        self._stats.append(stats)
+        if len(self._stats) >= self.COMPACT_EVERY:
+            self._compact_stats()
+
+        # Retention cohorts per (platform, app_version), unioned when no filter is set
+        segments = events.groupby([events['platform'].fillna('unknown'), events['app_version'].fillna('unknown')],
+                                  sort=False)
+        for key, segment in segments:
+            self.cohorts.setdefault(key, RetentionCohorts()).add(segment)
+
+        self._add_recent(events)
+
+    def merge(self, other):
+        """Fold the aggregates of another stream (e.g. a parallel partition) into this one"""
+        self.rows += other.rows
+        self.sketches.merge(other.sketches)
+        self._stats.extend(other._stats)
+        if len(self._stats) >= self.COMPACT_EVERY:
+            self._compact_stats()
+        for key, cohorts in other.cohorts.items():
+            self.cohorts.setdefault(key, RetentionCohorts()).merge(cohorts)
+        for events in other._recent:
+            self._add_recent(events)
+        return self
+
+    def _compact_stats(self):
+        if len(self._stats) > 1:
+            combined = pd.concat(self._stats)
+            self._stats = [combined.groupby(level=self.STAT_KEYS).agg({'count': 'sum', 'last_seen': 'max'})]
+        return self._stats[0] if self._stats else None
+
+    def _add_recent(self, events):
+        """Keep only the newest recent_rows events (chunks arrive in time order)"""
+        self._recent.append(events)
+        self._recent_count += len(events)
+        while self._recent and self._recent_count - len(self._recent[0]) >= self.recent_rows:
+            self._recent_count -= len(self._recent.pop(0))
+
+    @property
+    def recent(self):
+        """The newest recent_rows raw events, newest first"""
+        if not self._recent:
+            return pd.DataFrame()
+        recent = pd.concat(self._recent, ignore_index=True)
+        recent = recent.sort_values('timestamp', ascending=False, kind='mergesort').head(self.recent_rows)
+        return recent.reset_index(drop=True)
+
+    @property
+    def stats(self):
+        """Count and last_seen per (event_name, event_type, day)"""
+        stats = self._compact_stats()
+        if stats is None:
+            return pd.DataFrame(columns=['count', 'last_seen'],
+                                index=pd.MultiIndex.from_arrays([[], [], []], names=self.STAT_KEYS))
+        return stats
+
+    def daily_counts(self):
+        """Daily counts in the layout of daily_event_counts()"""
+        counts = self.stats['count'].unstack('event_type', fill_value=0)
+        return counts.sort_index()
+
+    def feature_overview(self, feature=None, action=None, start=None, end=None):
+        """Usage count and last use per feature within the filters and [start, end) day range"""
+        stats = self.stats.reset_index()
+        if feature and feature != 'All':
+            stats = stats[stats['event_name'] == feature]
+        if action and action != 'All':
+            stats = stats[stats['event_type'] == action]
+        if start is not None:
+            stats = stats[stats['day'] >= _naive_day(start)]
+        if end is not None:
+            stats = stats[stats['day'] < _naive_day(end)]
+        return stats.groupby('event_name').agg(count=('count', 'sum'), last_seen=('last_seen', 'max'))
+
+    def retention(self, platform=None, app_version=None):
+        """Retention cohorts for a platform and/or app version ('All' or empty means no filter)"""
+        combined = RetentionCohorts()
+        for (segment_platform, segment_version), cohorts in self.cohorts.items():
+            if platform and platform != 'All' and segment_platform != platform:
+                continue
+            if app_version and app_version != 'All' and segment_version != app_version:
+                continue
+            combined.merge(cohorts)
+        return combined
+
+    def options(self):
+        """Distinct features, actions, platforms and app versions seen so far"""
+        index = self.stats.index
+        return {
+            'features': sorted(index.get_level_values('event_name').unique()),
+            'actions': sorted(index.get_level_values('event_type').unique()),
+            'platforms': sorted({platform for platform, _ in self.cohorts}),
+            'app_versions': sorted({version for _, version in self.cohorts}),
+        }
+
+
+# Parallel aggregation across a process pool
+AGGREGATE_COLUMNS = ['event_name', 'event_type', 'user_id', 'timestamp', 'platform', 'app_version']
+
+
+def default_workers():
+    """Number of worker processes to use (ANALYTICS_WORKERS, or one per core), never more than the cores"""
+    cores = os.cpu_count() or 1
+    return min(int(os.getenv('ANALYTICS_WORKERS', '0')) or cores, cores)
+
+
+def partition_by_hash(df, column: str, n_parts: int):
+    """Split a frame into n_parts by a hash of column, so equal keys share a partition"""
+    parts = pd.util.hash_pandas_object(df[column].astype(str), index=False).to_numpy() % np.uint64(n_parts)
+    return [df[parts == part] for part in range(n_parts)]
+
+
+def _aggregate_partition(events, precision):
+    aggregates = TrackingAggregates(precision, recent_rows=0)
+    aggregates.add(events)
+    return aggregates
+
+
+def _summarise_sessions(events):
+    return SessionIndex(events).summary()
+
+
+def parallel_workers(rows: int, workers: Optional[int] = None) -> int:
+    """Worker processes the parallel helpers actually use for rows events (1 means in process)"""
+    workers = workers or default_workers()
+    if (os.cpu_count() or 1) <= 1 or rows < 2 * workers:
+        return 1
+    return workers
+
+
+def aggregate_parallel(df, precision: int = DEFAULT_HLL_PRECISION, workers: Optional[int] = None):
+    """Build TrackingAggregates for a frame on equal time-range partitions across a process pool
+
+    Partition edges can fall inside a day; the partials still combine exactly, since
+    counts add up, last_seen takes the max and sketches union, so the result is the
+    same as a serial TrackingAggregates over the whole frame. Partials come back with
+    sparse sketches, so shipping them to the parent costs about as much as the events
+    they summarise; on a single core the frame is aggregated in process instead.
+    """
+    columns = [column for column in AGGREGATE_COLUMNS if column in df.columns]
+    events = df[columns]
+    workers = parallel_workers(len(events), workers)
+    if workers <= 1:
+        return _aggregate_partition(events, precision)
+
+    parts = list(iter_time_chunks(events, -(-len(events) // workers)))
+    result = TrackingAggregates(precision, recent_rows=0)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_aggregate_partition, parts, [precision] * len(parts)):
+            result.merge(partial)
+    return result
+
+
+def session_summary_parallel(df, workers: Optional[int] = None):
+    """SessionIndex(df).summary() computed on session_id-hash partitions across a process pool"""
+    workers = parallel_workers(len(df), workers)
+    if workers <= 1:
+        return SessionIndex(df).summary()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        summaries = list(pool.map(_summarise_sessions, partition_by_hash(df, 'session_id', workers)))
+    return pd.concat(summaries, ignore_index=True).sort_values('session_id', kind='mergesort', ignore_index=True)
+
+
+# Per-user lookups
+class UserIndex:
+    """user_id -> row positions of a frame, each user's rows in chronological order
+
+    Built once with a single lexsort; looking up a user is a hash lookup plus a slice,
+    so a user's k rows come back in O(k) however large the frame is.
+    """
+
+    def __init__(self, df, column: str = 'user_id', time_column: str = 'timestamp'):
+        codes, self.user_ids = pd.factorize(df[column])
+        times = to_epoch_ns(df[time_column]) if len(df) else np.empty(0, dtype='int64')
+        # Rows without a user (code -1) sort first and are never returned
+        self.order = np.lexsort((times, codes))
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.user_ids))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]) + np.count_nonzero(codes < 0)
+        self._sorted_ids = np.sort(self.user_ids.astype(str).to_numpy())
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def __contains__(self, user_id):
+        return user_id in self.user_ids
+
+    def positions(self, user_id):
+        """Row positions (for .iloc) of a user's rows, oldest first"""
+        try:
+            code = self.user_ids.get_loc(user_id)
+        except KeyError:
+            return np.empty(0, dtype=np.intp)
+        return self.order[self.offsets[code]:self.offsets[code + 1]]
+
+    def matching(self, prefix: str, limit: int = 20):
+        """Up to limit user_ids starting with prefix, in sorted order"""
+        start = np.searchsorted(self._sorted_ids, prefix, side='left')
+        matches = self._sorted_ids[start:start + limit]
+        return [user_id for user_id in matches if user_id.startswith(prefix)]
+
+
+TIMELINE_COLUMNS = ['timestamp', 'source', 'type', 'name', 'details']
+
+
+def user_timeline(user_id, events=None, event_index=None, errors=None, error_index=None):
+    """One chronological timeline of a user's tracking events and error reports
+
+    Both inputs come out of their indexes already in time order, so combining them is
+    a merge of two sorted runs rather than a filter over the full frames.
+    """
+    parts = []
+    if events is not None and event_index is not None:
+        rows = events.iloc[event_index.positions(user_id)]
+        parts.append(pd.DataFrame({
+            'timestamp': rows['timestamp'].reset_index(drop=True),
+            'source': 'event',
+            'type': rows['event_type'].to_numpy(),
+            'name': rows['event_name'].to_numpy(),
+            'details': rows['properties'].to_numpy() if 'properties' in rows else None,
+        }))
+    if errors is not None and error_index is not None:
+        rows = errors.iloc[error_index.positions(user_id)]
+        parts.append(pd.DataFrame({
+            'timestamp': rows['timestamp'].reset_index(drop=True),
+            'source': 'error',
+            'type': rows['error_type'].to_numpy(),
+            'name': rows['question_id'].to_numpy() if 'question_id' in rows else None,
+            'details': rows['error_message'].to_numpy() if 'error_message' in rows else None,
+        }))
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame(columns=TIMELINE_COLUMNS)
+
+    timeline = pd.concat(parts, ignore_index=True)
+    # Stable sort of two sorted runs: timsort merges them in linear time
+    times = pd.to_datetime(timeline['timestamp'], utc=True)
+    return timeline.iloc[np.argsort(to_epoch_ns(times), kind='stable')].reset_index(drop=True)
+
+
+def top_rows(df, column: str, k: int, descending: bool = True):
+    """The first k rows of df ordered by column, without sorting the whole frame
+
+    Numeric and datetime columns use nlargest/nsmallest (a partial sort); other
+    columns fall back to a stable argsort of their case-insensitive sort codes. Ties
+    keep their order in df either way, and missing values always come last.
+    """
+    values = df[column]
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+        present = df[values.notna()]
+        rows = present.nlargest(k, column) if descending else present.nsmallest(k, column)
+        if len(rows) < k:
+            rows = pd.concat([rows, df[values.isna()].head(k - len(rows))])
+        return rows
+
+    missing = values.isna().to_numpy()
+    codes = np.full(len(values), -1, dtype=np.int64)
+    codes[~missing], uniques = pd.factorize(values[~missing].astype(str).str.lower(), sort=True)
+    if descending:
+        order = np.argsort(-codes, kind='stable')
+    else:
+        codes[missing] = len(uniques)
+        order = np.argsort(codes, kind='stable')
+    return df.iloc[order[:k]]
+
+
+# Incremental reads of append-only tables
+class TableCursor:
+    """Remembers the newest row read from a table, so later reads fetch only newer rows
+
+    Rows are read from the watermark timestamp inclusive and the ids already seen at
+    exactly that timestamp are dropped, so no row is returned twice.
+    """
+
+    def __init__(self, table: str, columns: str = '*', time_column: str = 'timestamp'):
+        self.table = table
+        self.columns = columns
+        self.time_column = time_column
+        self.watermark = None
+        self.watermark_ids = []
+
+    def read(self, client, start=None, end=None):
+        """Yield DataFrames of rows newer than the watermark (or from start on the first read)"""
+        start = self.watermark if self.watermark is not None else start
+        for rows in iter_supabase_pages(client, self.table, self.columns, start=start, end=end,
+                                        time_column=self.time_column):
+            frame = pd.DataFrame(rows)
+            frame[self.time_column] = pd.to_datetime(frame[self.time_column], utc=True)
+            if self.watermark is not None:
+                frame = frame[~((frame[self.time_column] == self.watermark) & frame['id'].isin(self.watermark_ids))]
+            if frame.empty:
+                continue
+
+            newest = frame[self.time_column].max()
+            if self.watermark is None or newest > self.watermark:
+                self.watermark = newest
+                self.watermark_ids = []
+            self.watermark_ids += frame.loc[frame[self.time_column] == self.watermark, 'id'].tolist()
+            yield frame
+
+    def to_dict(self):
+        return {
+            'table': self.table,
+            'columns': self.columns,
+            'time_column': self.time_column,
+            'watermark': self.watermark.isoformat() if self.watermark is not None else None,
+            'watermark_ids': self.watermark_ids,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        cursor = cls(data['table'], data['columns'], data['time_column'])
+        cursor.watermark = pd.Timestamp(data['watermark']) if data.get('watermark') else None
+        cursor.watermark_ids = data.get('watermark_ids', [])
+        return cursor
+
+
+# Error spike detection over error_reports
+SPIKE_BUCKET_COLUMNS = ['app_version', 'error_type']
+
+
+class ErrorSpikeDetector:
+    """Flag (app_version, error_type) buckets whose error count in the current time
+    window is far above their own exponentially weighted baseline
+
+    Each bucket keeps only an EWMA mean and variance of its per-window counts plus the
+    count of the window in progress. New rows are folded in by timestamp, and polls
+    read through a TableCursor, so each run reads only rows that arrived since the
+    previous one and history is never rescanned. Rows for a window the bucket has
+    already closed cannot be folded into the baseline any more; they are counted in
+    late_rows instead.
+    """
+
+    def __init__(self, window_minutes: int = 15, alpha: float = 0.1, z_threshold: float = 3.0,
+                 min_count: int = 5, min_std: float = 1.0):
+        self.window_ns = int(window_minutes) * 60 * 10**9
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_count = min_count
+        self.min_std = min_std
+        self.buckets = {}
+        self.late_rows = 0
+        self.cursor = TableCursor('error_reports', 'id,app_version,error_type,timestamp')
+
+    def _fold(self, state, value):
+        """EWMA update of a bucket's mean and variance with one closed window's count"""
+        diff = value - state['mean']
+        increment = self.alpha * diff
+        state['mean'] += increment
+        state['var'] = (1 - self.alpha) * (state['var'] + diff * increment)
+        state['windows'] += 1
+
+    def _advance(self, state, window: int):
+        """Close the bucket's windows before window, counting quiet windows as zero"""
+        if window <= state['window']:
+            return
+        self._fold(state, state['count'])
+        # After this many empty windows the baseline has decayed to noise anyway
+        for _ in range(min(window - state['window'] - 1, int(10 / self.alpha))):
+            self._fold(state, 0)
+        state['window'] = window
+        state['count'] = 0
+
+    def add(self, errors):
+        """Fold new error_reports rows (app_version, error_type, timestamp), oldest first"""
+        if not errors.empty:
+            times = to_epoch_ns(pd.to_datetime(errors['timestamp'], utc=True))
+            buckets = errors[SPIKE_BUCKET_COLUMNS].fillna('unknown')
+            counts = buckets.groupby([buckets['app_version'], buckets['error_type'], times // self.window_ns]).size()
+            for (app_version, error_type, window), count in counts.sort_index(level=2).items():
+                state = self.buckets.setdefault((app_version, error_type), {
+                    'mean': 0.0, 'var': 0.0, 'windows': 0, 'window': int(window), 'count': 0})
+                self._advance(state, int(window))
+                if window == state['window']:
+                    state['count'] += int(count)
+                else:
+                    self.late_rows += int(count)
+
+    def advance_to(self, now=None):
+        """Close every bucket's finished windows, including buckets with no new rows"""
+        now_window = _utc(now or pd.Timestamp.now(tz='UTC')).value // self.window_ns
+        for state in self.buckets.values():
+            self._advance(state, int(now_window))
+
+    def update(self, errors, now=None):
+        """Fold new rows in and move every bucket on to the window containing now"""
+        self.add(errors)
+        self.advance_to(now)
+
+    def scores(self):
+        """Current window count, baseline and z-score per bucket, highest z first"""
+        rows = []
+        for (app_version, error_type), state in self.buckets.items():
+            std = max(np.sqrt(state['var']), self.min_std)
+            z_score = (state['count'] - state['mean']) / std
+            rows.append({
+                'app_version': app_version,
+                'error_type': error_type,
+                'window_start': pd.Timestamp(state['window'] * self.window_ns, tz='UTC'),
+                'count': state['count'],
+                'baseline': state['mean'],
+                'std': std,
+                'z_score': z_score,
+                'spike': z_score >= self.z_threshold and state['count'] >= self.min_count,
+            })
+        columns = ['app_version', 'error_type', 'window_start', 'count', 'baseline', 'std', 'z_score', 'spike']
+        return pd.DataFrame(rows, columns=columns).sort_values('z_score', ascending=False, ignore_index=True)
+
+    def spikes(self):
+        """Buckets currently over the z-score threshold"""
+        scores = self.scores()
+        return scores[scores['spike']].reset_index(drop=True)
+
+    def poll(self, client, warmup: timedelta = timedelta(days=3), now=None):
+        """Read error_reports rows that arrived since the last poll from Supabase and update
+
+        The first poll reads the warmup period to seed the baselines.
+        """
+        now = _utc(now or pd.Timestamp.now(tz='UTC'))
+        for errors in self.cursor.read(client, start=now - warmup, end=now + timedelta(microseconds=1)):
+            self.add(errors)
+        self.advance_to(now)
+
+    def to_dict(self):
+        return {
+            'window_minutes': self.window_ns // (60 * 10**9),
+            'alpha': self.alpha,
+            'z_threshold': self.z_threshold,
+            'min_count': self.min_count,
+            'min_std': self.min_std,
+            'cursor': self.cursor.to_dict(),
+            'late_rows': self.late_rows,
+            'buckets': [[app_version, error_type, state] for (app_version, error_type), state in self.buckets.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        detector = cls(data['window_minutes'], data['alpha'], data['z_threshold'], data['min_count'], data['min_std'])
+        detector.cursor = TableCursor.from_dict(data['cursor'])
+        detector.late_rows = data.get('late_rows', 0)
+        detector.buckets = {(app_version, error_type): state for app_version, error_type, state in data['buckets']}
+        return detector
+
+
+# Release health: error rates per app_version/build_number/platform
+RELEASE_KEYS = ['app_version', 'build_number', 'platform']
+
+
+class ReleaseHealth:
+    """Errors per session and per user for each (app_version, build_number, platform)
+
+    Distinct sessions and users per release are HyperLogLog sketches, and error counts
+    are running sums, so both sides can be updated with new rows only. error_reports
+    has no platform column; each error takes the platform last seen for its user_id,
+    looked up in a user_id -> platform hash map (a single hash join, no nested loop).
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.sessions = {}
+        self.users = {}
+        self.error_users = {}
+        self.errors = pd.Series(dtype='int64')
+        self.user_platforms = pd.Series(dtype=object)
+        self.event_cursor = TableCursor('tracking_events', 'id,user_id,session_id,app_version,build_number,platform,timestamp')
+        self.error_cursor = TableCursor('error_reports', 'id,user_id,app_version,build_number,timestamp')
+
+    def _sketch(self, store, key):
+        if key not in store:
+            store[key] = HyperLogLog(self.precision)
+        return store[key]
+
+    def add_events(self, events):
+        """Fold tracking events (user_id, session_id, release columns, timestamp) in"""
+        if events.empty:
+            return
+        keys = events[RELEASE_KEYS].fillna('unknown')
+        for key, group in events.groupby([keys[column] for column in RELEASE_KEYS], sort=False):
+            sessions = group['session_id'].dropna()
+            if not sessions.empty:
+                self._sketch(self.sessions, key).add(sessions)
+            users = group['user_id'].dropna()
+            if not users.empty:
+                self._sketch(self.users, key).add(users)
+
+        # Latest platform per user, for attributing error reports
+        latest = events.sort_values('timestamp', kind='mergesort').dropna(subset=['user_id', 'platform'])
+        latest = latest.drop_duplicates('user_id', keep='last').set_index('user_id')['platform']
+        self.user_platforms = pd.concat([self.user_platforms[~self.user_platforms.index.isin(latest.index)], latest])
+
+    def add_errors(self, errors):
+        """Fold error reports (user_id, app_version, build_number) in"""
+        if errors.empty:
+            return
+        keys = pd.DataFrame({
+            'app_version': errors['app_version'].to_numpy(),
+            'build_number': errors['build_number'].to_numpy(),
+            'platform': errors['user_id'].map(self.user_platforms).to_numpy(),
+        }, index=errors.index).fillna('unknown')
+        grouped = errors.groupby([keys[column] for column in RELEASE_KEYS], sort=False)
+        counts = grouped.size()
+        self.errors = counts if self.errors.empty else self.errors.add(counts, fill_value=0).astype('int64')
+        for key, group in grouped:
+            users = group['user_id'].dropna()
+            if not users.empty:
+                self._sketch(self.error_users, key).add(users)
+
+    def poll(self, client, warmup: timedelta = timedelta(days=7), now=None):
+        """Read tracking events and error reports added since the last poll from Supabase
+
+        The first poll reads only the warmup period, not the whole history.
+        """
+        start = _utc(now or pd.Timestamp.now(tz='UTC')) - warmup
+        for events in self.event_cursor.read(client, start=start):
+            self.add_events(events)
+        for errors in self.error_cursor.read(client, start=start):
+            self.add_errors(errors)
+
+    def table(self):
+        """Release health table, newest app versions first"""
+        keys = set(self.sessions) | set(self.users) | set(self.errors.index)
+        columns = RELEASE_KEYS + ['sessions', 'users', 'errors', 'error_users',
+                                  'errors_per_session', 'errors_per_user', 'users_with_errors_pct']
+        if not keys:
+            return pd.DataFrame(columns=columns)
+
+        index = pd.MultiIndex.from_tuples(sorted(keys, key=str), names=RELEASE_KEYS)
+        table = pd.DataFrame({
+            'sessions': [self.sessions[key].count() if key in self.sessions else 0 for key in index],
+            'users': [self.users[key].count() if key in self.users else 0 for key in index],
+            'errors': self.errors.reindex(index, fill_value=0).to_numpy(),
+            'error_users': [self.error_users[key].count() if key in self.error_users else 0 for key in index],
+        }, index=index)
+        table['errors_per_session'] = table['errors'] / table['sessions'].where(table['sessions'] > 0)
+        table['errors_per_user'] = table['errors'] / table['users'].where(table['users'] > 0)
+        table['users_with_errors_pct'] = (100 * table['error_users'] / table['users'].where(table['users'] > 0)).clip(upper=100)
+        return table.reset_index().sort_values(['app_version', 'build_number'], ascending=False,
+                                               ignore_index=True)[columns]
+
+
+# Question-level error report aggregation against the question bank
+QUESTION_BANK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app', 'assets',
+                                  'questions-nl-sv.json')
+UNCATEGORISED = 'Uncategorised'
+
+
+def question_bank_frame(records):
+    """Question bank records (app JSON or questions table rows) as a frame indexed by id"""
+    frame = pd.DataFrame({
+        'id': [str(record['id']) for record in records],
+        'question': [record.get('vraag', '') for record in records],
+        'difficulty': [record.get('moeilijkheidsgraad') for record in records],
+        'type': [record.get('type') for record in records],
+        'categories': [list(record.get('categories') or []) for record in records],
+        'reference': [record.get('biblicalReference', record.get('biblical_reference')) for record in records],
+    })
+    frame = frame.drop_duplicates('id').set_index('id')
+    frame['category'] = frame['categories'].map(lambda categories: ', '.join(categories) or UNCATEGORISED)
+    return frame
+
+
+def load_question_bank(path: str = QUESTION_BANK_PATH):
+    """Question bank from the app's questions JSON asset"""
+    import json
+    with open(path, 'r', encoding='utf-8') as f:
+        return question_bank_frame(json.load(f))
+
+
+def fetch_question_bank(client):
+    """Question bank from the Supabase questions table"""
+    records = []
+    for rows in iter_supabase_pages(client, 'questions', 'id,vraag,moeilijkheidsgraad,type,categories,biblical_reference,created_at',
+                                    time_column='created_at'):
+        records.extend(rows)
+    return question_bank_frame(records)
+
+
+def question_problems(errors, bank):
+    """Error reports per question_id joined with the question bank, most reported first
+
+    The join is a single lookup of the reported ids in the bank's id index, so its
+    cost depends on the number of reported questions, not on the size of the bank.
+    """
+    columns = ['reports', 'reporters', 'report_share', 'last_reported', 'top_error_type',
+               'question', 'category', 'categories', 'difficulty', 'type', 'in_bank']
+    errors = errors[errors['question_id'].notna()]
+    errors = errors[errors['question_id'].astype(str).str.strip() != '']
+    if errors.empty:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name='question_id'))
+
+    question_ids = errors['question_id'].astype(str).rename('question_id')
+    grouped = errors.groupby(question_ids)
+    table = pd.DataFrame({
+        'reports': grouped.size(),
+        'reporters': grouped['user_id'].nunique(),
+        'last_reported': grouped['timestamp'].max(),
+    })
+    table['report_share'] = 100 * table['reports'] / table['reports'].sum()
+
+    # Most frequent error type per question without a per-group Python callback
+    by_type = errors.groupby([question_ids, errors['error_type'].rename('top_error_type')]).size()
+    top_types = by_type.sort_values(ascending=False, kind='mergesort').reset_index().drop_duplicates('question_id')
+    table['top_error_type'] = top_types.set_index('question_id')['top_error_type']
+
+    table = table.join(bank[['question', 'category', 'categories', 'difficulty', 'type']], how='left')
+    table['in_bank'] = table.index.isin(bank.index)
+    table['category'] = table['category'].fillna(UNCATEGORISED)
+    table['categories'] = table['categories'].map(lambda categories: categories if isinstance(categories, list) else [])
+    return table.sort_values('reports', ascending=False, kind='mergesort')[columns]
+
+
+def question_problem_heatmap(problems):
+    """Report counts per (category, difficulty); questions in several categories count in each"""
+    if problems.empty:
+        return pd.DataFrame()
+    cells = pd.DataFrame({
+        'category': problems['categories'].map(lambda categories: categories or [UNCATEGORISED]),
+        'difficulty': problems['difficulty'],
+        'reports': problems['reports'],
+    }).explode('category')
+    cells = cells[cells['difficulty'].notna()]
+    if cells.empty:
+        return pd.DataFrame()
+    cells['difficulty'] = cells['difficulty'].astype(int)
+    return cells.pivot_table(index='category', columns='difficulty', values='reports', aggfunc='sum', fill_value=0)